@@ -41,7 +41,8 @@ extensions = [
 
 intersphinx_mapping = {
   'python': ('https://docs.python.org/3', None),
-  'msgpack': ('http://pythonhosted.org/msgpack-python', None)
+  'msgpack': ('http://pythonhosted.org/msgpack-python', None),
+  'h5py': ('https://docs.h5py.org/en/stable', None)
   }
 
 # Add any paths that contain templates here, relative to this directory.
@@ -29,7 +29,8 @@ setup(
     author='Dominik Gresch',
     author_email='greschd@gmx.ch',
     description='Reading, creating and modifying tight-binding models.',
-    install_requires=['numpy', 'scipy', 'fsc.export'],
+    install_requires=['numpy', 'scipy', 'fsc.export', 'decorator'],
+    extras_require={'msgpack': ['msgpack'], 'hdf5': ['h5py']},
     long_description=readme,
     classifiers=[
         'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
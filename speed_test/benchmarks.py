@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark suite for TBmodels. Each benchmark is a function which does the setup and returns the callable that is timed. The results are stored as JSON (by default in ``results/<commit>.json``), and can be compared to a previous run to detect regressions.
+
+Usage::
+
+    python benchmarks.py [--quick] [--filter PATTERN] [--output FILE] [--compare FILE]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import pickle
+import argparse
+import platform
+import itertools
+import subprocess
+import collections
+
+import numpy as np
+import scipy
+import tbmodels
+
+from model_generators import random_model, random_hoppings, full_hoppings
+
+BENCHMARKS = collections.OrderedDict()
+
+def benchmark(**params):
+    """
+    Registers a benchmark for all combinations of the given parameter values.
+    """
+    def inner(func):
+        names = sorted(params.keys())
+        for values in itertools.product(*(params[n] for n in names)):
+            kwargs = dict(zip(names, values))
+            name = func.__name__ + ''.join('[{}={}]'.format(n, kwargs[n]) for n in names)
+            BENCHMARKS[name] = (func, kwargs)
+        return func
+    return inner
+
+SIZES = [10, 100]
+SPARSE = [False, True]
+KPT = [[0.1, 0.2, 0.3]]
+
+#------------------------------- IMPORT -------------------------------#
+
+@benchmark(statement=['import tbmodels', 'import tbmodels; tbmodels.Model'])
+def import_time(statement):
+    # the import is timed in a fresh interpreter, including its startup
+    command = [sys.executable, '-c', statement]
+    return lambda: subprocess.check_call(command)
+
+#-------------------------------- I/O ---------------------------------#
+
+@benchmark(size=SIZES)
+def from_hr(size):
+    hr_string = random_model(size, 20).to_hr()
+    return lambda: tbmodels.Model.from_hr(hr_string)
+
+@benchmark(size=SIZES)
+def to_hr(size):
+    model = random_model(size, 20)
+    return model.to_hr
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def to_json(size, sparse):
+    model = random_model(size, 20, sparse=sparse)
+    return model.to_json
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def from_json(size, sparse):
+    json_string = random_model(size, 20, sparse=sparse).to_json()
+    return lambda: tbmodels.Model.from_json(json_string)
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def to_msgpack(size, sparse):
+    model = random_model(size, 20, sparse=sparse)
+    return model.to_msgpack
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def from_msgpack(size, sparse):
+    msgpack_data = random_model(size, 20, sparse=sparse).to_msgpack()
+    return lambda: tbmodels.Model.from_msgpack(msgpack_data)
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def hdf5_roundtrip(size, sparse):
+    import io
+    import h5py
+    model = random_model(size, 20, sparse=sparse)
+
+    def run():
+        with h5py.File(io.BytesIO(), 'w') as f:
+            model.to_hdf5(f)
+            tbmodels.Model.from_hdf5(f)
+    return run
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def pickle_roundtrip(size, sparse):
+    model = random_model(size, 20, sparse=sparse)
+    return lambda: pickle.loads(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+#---------------------------- CONSTRUCTORS ----------------------------#
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def constructor(size, sparse):
+    hop = random_hoppings(size, 20)
+    return lambda: tbmodels.Model(hop=hop, contains_cc=False, sparse=sparse)
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def constructor_reduce_hop(size, sparse):
+    hop = full_hoppings(random_hoppings(size, 20))
+    return lambda: tbmodels.Model(hop=hop, contains_cc=True, sparse=sparse)
+
+@benchmark(size=[10, 50])
+def constructor_map_to_uc(size):
+    hop = random_hoppings(size, 20)
+    pos = np.random.RandomState(0).uniform(-1, 2, size=(size, 3))
+    return lambda: tbmodels.Model(hop=hop, pos=pos, contains_cc=False)
+
+@benchmark(size=SIZES, density=[0.05, 1.])
+def from_hop_list(size, density):
+    model = random_model(size, 20, density=density)
+    hop_list = []
+    for R, mat in model.hop.items():
+        hop_list.extend(tbmodels.helpers.matrix_to_hop(np.array(mat), R=R))
+    hop_list = [h for h in hop_list if h[0] != 0]
+    return lambda: tbmodels.Model.from_hop_list(hop_list=hop_list, size=size, contains_cc=False)
+
+@benchmark(size=SIZES, density=[0.05, 1.])
+def from_hop_array(size, density):
+    model = random_model(size, 20, density=density)
+    hop_array = np.concatenate([
+        tbmodels.helpers.matrix_to_hop_array(np.array(mat), R=R)
+        for R, mat in model.hop.items()
+    ])
+    return lambda: tbmodels.Model.from_hop_list(hop_list=hop_array, size=size, contains_cc=False)
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def add_hops(size, sparse):
+    random_state = np.random.RandomState(0)
+    num_hops = 10 * size
+    args = (
+        random_state.uniform(size=num_hops),
+        random_state.randint(size, size=num_hops),
+        random_state.randint(size, size=num_hops),
+        random_state.randint(-2, 3, size=(num_hops, 3))
+    )
+    def run():
+        model = tbmodels.Model(size=size, dim=3, sparse=sparse)
+        model.add_hops(*args)
+    return run
+
+#----------------------------- ARITHMETIC -----------------------------#
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def add(size, sparse):
+    model1 = random_model(size, 20, sparse=sparse, seed=0)
+    model2 = random_model(size, 20, sparse=sparse, seed=1, pos=model1.pos, uc=model1.uc)
+    return lambda: model1 + model2
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def mul(size, sparse):
+    model = random_model(size, 20, sparse=sparse)
+    return lambda: 2. * model
+
+#--------------------------- DERIVED MODELS ---------------------------#
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def slice_orbitals(size, sparse):
+    model = random_model(size, 20, sparse=sparse)
+    orbitals = np.arange(0, size, 2)
+    return lambda: model.slice_orbitals(orbitals)
+
+@benchmark(size=SIZES)
+def downfold(size):
+    model = random_model(size, 20)
+    orbitals = np.arange(0, size, 2)
+    return lambda: model.downfold(orbitals, (4, 4, 4), energy=100.)
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def add_spin(size, sparse):
+    model = random_model(size, 20, sparse=sparse, density=0.05)
+    return model.add_spin
+
+@benchmark(size=[10, 50], sparse=SPARSE)
+def magnetic_field_sweep(size, sparse):
+    model = random_model(size, 20, sparse=sparse, density=0.1)
+    return lambda: [model.with_magnetic_field(flux, supercell_size=8) for flux in np.arange(1, 8) / 8]
+
+@benchmark(size=SIZES, sparse=SPARSE)
+def compress(size, sparse):
+    model = random_model(size, 100, sparse=sparse)
+    return lambda: model.compress(abs_tol=0.5, max_distance=3.)
+
+#----------------------------- EVALUATION -----------------------------#
+
+@benchmark(size=SIZES, num_R=[10, 100], density=[0.05, 1.], sparse=SPARSE)
+def hamilton(size, num_R, density, sparse):
+    model = random_model(size, num_R, density=density, sparse=sparse)
+    return lambda: model.hamilton(KPT[0])
+
+@benchmark(size=SIZES, num_R=[10, 100], sparse=SPARSE)
+def eigenval(size, num_R, sparse):
+    model = random_model(size, num_R, sparse=sparse)
+    return lambda: model.eigenval(KPT[0])
+
+@benchmark(size=SIZES, num_R=[10, 100], sparse=SPARSE, num_threads=[1, 4])
+def hamilton_batch(size, num_R, sparse, num_threads):
+    model = random_model(size, num_R, density=0.1, sparse=sparse)
+    kpoints = np.random.RandomState(0).uniform(size=(100, 3))
+    return lambda: model.hamilton_batch(kpoints, num_threads=num_threads)
+
+@benchmark(size=SIZES, eigenvectors=[False, True])
+def eigenval_mesh_to_file(size, eigenvectors):
+    import tempfile
+    model = random_model(size, 20, density=0.1)
+    directory = tempfile.mkdtemp()
+    return lambda: model.eigenval_mesh_to_file(
+        (6, 6, 6), directory, eigenvectors=eigenvectors, resume=False
+    )
+
+#------------------------------ RUNNER --------------------------------#
+
+def measure(func, repeat=5, min_time=0.05):
+    """
+    Returns the minimum and median time per call, and the number of calls per repetition.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(np.ceil(min_time / elapsed)))
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return dict(min=min(times), median=float(np.median(times)), number=number)
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run(pattern=None, repeat=5, min_time=0.05):
+    results = collections.OrderedDict()
+    for name, (func, kwargs) in BENCHMARKS.items():
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        res = measure(func(**kwargs), repeat=repeat, min_time=min_time)
+        results[name] = res
+        print('{:<70} {:>12.3e} s'.format(name, res['median']))
+    return dict(
+        commit=get_commit(),
+        date=time.strftime('%Y-%m-%d %H:%M:%S'),
+        machine=platform.node(),
+        python=platform.python_version(),
+        numpy=np.__version__,
+        scipy=scipy.__version__,
+        tbmodels=tbmodels.__version__,
+        results=results
+    )
+
+def compare(old, new, threshold=0.2):
+    """
+    Prints the ratio of the median times for the benchmarks contained in both runs, and returns the names of the benchmarks which became slower by more than ``threshold``.
+    """
+    regressions = []
+    print('\nComparison to commit {}:'.format(old.get('commit', 'unknown')))
+    for name, res in new['results'].items():
+        if name not in old['results']:
+            continue
+        ratio = res['median'] / old['results'][name]['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            flag = '  improvement'
+        print('{:<70} {:>8.2f}x{}'.format(name, ratio, flag))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the TBmodels benchmarks.')
+    parser.add_argument('--filter', help='Regular expression selecting the benchmarks to run.')
+    parser.add_argument('--output', help='Output file for the results. Defaults to results/<commit>.json.')
+    parser.add_argument('--compare', help='Results file of a previous run to compare to.')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown which is reported as regression.')
+    parser.add_argument('--quick', action='store_true', help='Use fewer repetitions and shorter timings.')
+    args = parser.parse_args()
+
+    if args.quick:
+        new = run(args.filter, repeat=1, min_time=0.)
+    else:
+        new = run(args.filter)
+
+    output = args.output
+    if output is None:
+        output = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            'results',
+            new['commit'][:10] + '.json'
+        )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(new, f, indent=4)
+    print('Results written to {}'.format(output))
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as f:
+            old = json.load(f)
+        if compare(old, new, threshold=args.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
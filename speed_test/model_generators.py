@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Generators for synthetic tight-binding models of controllable size, number of lattice vectors and sparsity, used in the benchmarks.
+"""
+
+import itertools
+
+import numpy as np
+import tbmodels
+
+def random_R_vectors(num_R, dim=3):
+    """
+    Returns ``num_R`` distinct lattice vectors with a positive first non-zero index, ordered by their distance from the origin.
+    """
+    R_list = []
+    max_R = 1
+    while len(R_list) < num_R:
+        candidates = [
+            R for R in itertools.product(range(-max_R, max_R + 1), repeat=dim)
+            if any(R) and R[np.nonzero(R)[0][0]] > 0
+        ]
+        candidates.sort(key=lambda R: (np.dot(R, R), R))
+        R_list = candidates
+        max_R += 1
+    return R_list[:num_R]
+
+def random_hoppings(size, num_R, density=1., dim=3, seed=0):
+    """
+    Returns a dictionary of random hopping matrices (without the complex conjugate terms) for the R=0 vector and ``num_R - 1`` other lattice vectors.
+
+    :param size:    Number of orbitals.
+    :param num_R:   Number of lattice vectors, including R=0.
+    :param density: Fraction of non-zero entries in each hopping matrix.
+    :param seed:    Seed of the random number generator.
+    """
+    rng = np.random.RandomState(seed)
+    hop = dict()
+    for R in [(0,) * dim] + random_R_vectors(num_R - 1, dim=dim):
+        mat = rng.normal(size=(size, size)) + 1j * rng.normal(size=(size, size))
+        mat *= rng.uniform(size=(size, size)) < density
+        hop[tuple(R)] = mat
+    zero = (0,) * dim
+    hop[zero] = 0.5 * (hop[zero] + hop[zero].conjugate().T)
+    return hop
+
+def full_hoppings(hop):
+    """
+    Adds the complex conjugate terms to a dictionary of hopping matrices, as needed for ``contains_cc=True``.
+    """
+    res = dict()
+    for R, mat in hop.items():
+        if any(R):
+            res[R] = mat
+            res[tuple(-x for x in R)] = mat.conjugate().T
+        else:
+            res[R] = mat + mat.conjugate().T
+    return res
+
+def random_model(size, num_R, density=1., dim=3, sparse=False, seed=0, **kwargs):
+    """
+    Returns a random :class:`tbmodels.Model` with the given size, number of lattice vectors and density of the hopping matrices. The remaining keyword arguments are passed to the model constructor.
+    """
+    rng = np.random.RandomState(seed + 1)
+    kwargs.setdefault('pos', rng.uniform(size=(size, dim)))
+    kwargs.setdefault('uc', np.eye(dim) + 0.1 * rng.uniform(size=(dim, dim)))
+    kwargs.setdefault('occ', size // 2)
+    return tbmodels.Model(
+        hop=random_hoppings(size, num_R, density=density, dim=dim, seed=seed),
+        contains_cc=False,
+        sparse=sparse,
+        **kwargs
+    )
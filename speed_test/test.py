@@ -11,28 +11,29 @@ import tbmodels
 import numpy as np
 from tbmodels._ptools.monitoring import Timer
 
+from model_generators import random_model
+
 k_list = list(itertools.product(np.linspace(0, 1, 5), repeat=3))
 
 print('dense model')
 
-model2 = tbmodels.Model.from_hr_file('data/dense_hr.dat', sparse=False)
-with Timer('dense'):
+model2 = random_model(size=50, num_R=100, sparse=False)
+with Timer('dense', verbose=True):
     for k in k_list:
         model2.hamilton(k)
 
-model1 = tbmodels.Model.from_hr_file('data/dense_hr.dat', sparse=True)
-with Timer('sparse'):
+model1 = random_model(size=50, num_R=100, sparse=True)
+with Timer('sparse', verbose=True):
     for k in k_list:
         model1.hamilton(k)
         
-# For the sparse model a supercell or TRS model should be used
-#~ print('sparse model')
-#~ model2 = tbmodels.Model.from_hr_file('data/sparse_hr.dat', sparse=False)
-#~ with Timer('dense'):
-    #~ for k in k_list:
-        #~ model2.hamilton(k)
-
-#~ model1 = tbmodels.Model.from_hr_file('data/sparse_hr.dat', sparse=True)
-#~ with Timer('sparse'):
-    #~ for k in k_list:
-        #~ model1.hamilton(k)
+print('sparse model')
+model2 = random_model(size=50, num_R=100, density=0.02, sparse=False)
+with Timer('dense', verbose=True):
+    for k in k_list:
+        model2.hamilton(k)
+
+model1 = random_model(size=50, num_R=100, density=0.02, sparse=True)
+with Timer('sparse', verbose=True):
+    for k in k_list:
+        model1.hamilton(k)
@@ -9,9 +9,54 @@ r"""
 TBModels is a tool for creating / loading and manipulating tight-binding models.
 """
 
+import sys
+import importlib
+
 from ._version import __version__
 
-# import order is important due to circular imports
-from . import helpers
-from ._tb_model import Model
+__all__ = [
+    'helpers',
+    'monitoring',
+    'parallel',
+    'Model',
+    'FrozenModel',
+    'SymmetryOperation',
+    'monkhorst_pack',
+    'irreducible_kpoints',
+    'SharedModel',
+    'DisorderEnsemble',
+]
+
+# The submodules are imported on first access, s.t. 'import tbmodels' is fast.
+# Values are the module and (for objects defined in it) the attribute name.
+_LAZY_ATTRIBUTES = {
+    'helpers': ('.helpers', None),
+    'monitoring': ('._ptools.monitoring', None),
+    'parallel': ('._ptools.parallel', None),
+    'Model': ('._tb_model', 'Model'),
+    'FrozenModel': ('._frozen_model', 'FrozenModel'),
+    'SymmetryOperation': ('._symmetry', 'SymmetryOperation'),
+    'monkhorst_pack': ('._symmetry', 'monkhorst_pack'),
+    'irreducible_kpoints': ('._symmetry', 'irreducible_kpoints'),
+    'SharedModel': ('._shared_memory', 'SharedModel'),
+    'DisorderEnsemble': ('._disorder', 'DisorderEnsemble'),
+}
+
+def __getattr__(name):
+    try:
+        module_name, attr_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    res = importlib.import_module(module_name, __name__)
+    if attr_name is not None:
+        res = getattr(res, attr_name)
+    globals()[name] = res
+    return res
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
+# module-level __getattr__ is supported only for Python 3.7 and newer
+if sys.version_info < (3, 7):
+    for _name in __all__:
+        __getattr__(_name)
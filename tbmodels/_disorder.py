@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Defines ensembles of disordered models, which share the hopping terms of a clean model.
+"""
+
+import numpy as np
+from fsc.export import export
+
+from ._ptools import parallel
+from ._tb_model import Model
+
+@export
+class DisorderEnsemble:
+    """
+    Ensemble of disorder realizations of a model. Each realization adds random on-site energies and / or random changes of the hopping strengths (bond disorder) to a fixed clean model. The Hamiltonians and eigenvalues are evaluated for all realizations at once, without creating a :class:`.Model` for each realization.
+
+    :param model:   Clean model.
+    :type model:    Model
+
+    :param on_site: On-site energies which are added to the orbitals, given as an array of shape ``(num_realizations, size)``.
+    :type on_site:  array
+
+    :param bond:    Changes of the hopping strengths, given as an array of shape ``(num_realizations, len(bonds))``. The hoppings are listed in the attribute :attr:`bonds`, and each entry is added to the corresponding hopping as in :meth:`.Model.add_hop`.
+    :type bond:     array
+
+    :ivar bonds:    Array of shape ``(num_bonds, dim + 2)`` listing the hoppings of the clean model, where each row contains the lattice vector :math:`R` followed by the indices of the two orbitals. Hoppings within the home unit cell are listed once, with the first orbital index smaller than the second.
+    """
+    def __init__(self, model, *, on_site=None, bond=None):
+        self.model = model
+        self.bonds = self.get_bonds(model)
+
+        if on_site is None and bond is None:
+            raise ValueError('At least one of on_site and bond disorder must be given.')
+        num_realizations = len(on_site) if on_site is not None else len(bond)
+        self.num_realizations = num_realizations
+
+        if on_site is None:
+            self.on_site = None
+        else:
+            self.on_site = np.array(on_site, dtype=float)
+            if self.on_site.shape != (num_realizations, model.size):
+                raise ValueError('The on-site disorder must have shape {}, but has shape {}.'.format((num_realizations, model.size), self.on_site.shape))
+        if bond is None:
+            self.bond = None
+        else:
+            self.bond = np.array(bond, dtype=complex)
+            if self.bond.shape != (num_realizations, len(self.bonds)):
+                raise ValueError('The bond disorder must have shape {}, but has shape {}.'.format((num_realizations, len(self.bonds)), self.bond.shape))
+
+    @classmethod
+    def anderson(cls, model, strength, num_realizations, *, seed=None):
+        """
+        Creates an ensemble with Anderson disorder, where the on-site energies are drawn uniformly from the interval :math:`[-W/2, W/2]`.
+
+        :param model:   Clean model.
+        :type model:    Model
+
+        :param strength:    Disorder strength :math:`W`.
+        :type strength:     float
+
+        :param num_realizations:    Number of disorder realizations.
+        :type num_realizations:     int
+
+        :param seed:    Seed of the random number generator.
+        :type seed:     int
+        """
+        random_state = np.random.RandomState(seed)
+        on_site = random_state.uniform(-strength / 2., strength / 2., size=(num_realizations, model.size))
+        return cls(model, on_site=on_site)
+
+    @staticmethod
+    def get_bonds(model):
+        """
+        Returns the list of hoppings of a model which can be changed by bond disorder, as described for the attribute :attr:`bonds`.
+        """
+        R_array, hop_array = model._get_hop_stack()
+        R_idx, orbital_1, orbital_2 = np.nonzero(hop_array)
+        is_zero = np.all(R_array[R_idx] == 0, axis=1)
+        # hoppings within the home unit cell are stored twice, and on-site energies are excluded
+        valid = ~is_zero | (orbital_1 < orbital_2)
+        return np.concatenate([
+            R_array[R_idx[valid]],
+            orbital_1[valid, None],
+            orbital_2[valid, None]
+        ], axis=1).reshape(-1, model.dim + 2)
+
+    def hamilton(self, k, *, realizations=slice(None)):
+        """
+        Returns the Hamilton matrices of the realizations at a given k-point.
+
+        :param k:   k-point
+        :type k:    list
+
+        :param realizations:    Index of the realizations which are evaluated. By default, all realizations are used.
+        :type realizations:     slice
+
+        :returns:   Array of shape ``(num_realizations, size, size)``.
+        """
+        model = self.model
+        size = model.size
+        realizations = np.arange(self.num_realizations)[realizations]
+        H = np.empty((len(realizations), size, size), dtype=model.dtype)
+        H[...] = model.hamilton(k)
+        if self.on_site is not None:
+            diag_idx = np.arange(size)
+            H[:, diag_idx, diag_idx] += self.on_site[realizations]
+        if self.bond is not None and len(self.bonds):
+            R_array = self.bonds[:, :-2]
+            orbital_1 = self.bonds[:, -2]
+            orbital_2 = self.bonds[:, -1]
+            phases = np.exp(2j * np.pi * np.dot(R_array, k))
+            values = self.bond[realizations] * phases
+            np.add.at(H, (slice(None), orbital_1, orbital_2), values)
+            np.add.at(H, (slice(None), orbital_2, orbital_1), values.conjugate())
+        return H
+
+    def eigenval(self, k, *, num_threads=None):
+        """
+        Returns the eigenvalues of all realizations at a given k-point. The realizations are split into blocks, which are diagonalized in parallel threads.
+
+        :param k:   k-point
+        :type k:    list
+
+        :param num_threads: Number of threads. Defaults to the value set by :func:`tbmodels.parallel.set_num_threads`.
+        :type num_threads:  int
+
+        :returns:   Array of shape ``(num_realizations, size)``.
+        """
+        res = np.empty((self.num_realizations, self.model.size), dtype=np.finfo(self.model.dtype).dtype)
+
+        def evaluate(block):
+            res[block] = np.linalg.eigvalsh(self.hamilton(k, realizations=block))
+
+        num_threads = parallel.get_num_threads() if num_threads is None else num_threads
+        per_block = max(1, self.model.BATCH_BLOCK_SIZE // max(1, self.model.size**2))
+        num_blocks = max(num_threads, -(-self.num_realizations // per_block))
+        parallel.thread_map(
+            evaluate,
+            parallel.chunk_slices(self.num_realizations, num_blocks),
+            num_threads=num_threads
+        )
+        return res
+
+    def dos(self, energies, kpoints=None, *, weights=None, broadening=0.01, num_threads=None):
+        """
+        Returns the density of states averaged over all realizations, with a Gaussian broadening of the eigenvalues. The result is normalized per orbital, such that its integral over all energies is one.
+
+        :param energies:    Energies at which the density of states is evaluated.
+        :type energies:     array
+
+        :param kpoints:     List of k-points which are used. Defaults to the Gamma point.
+        :type kpoints:      list
+
+        :param weights:     Weights of the k-points. By default, all k-points have the same weight.
+        :type weights:      list
+
+        :param broadening:  Standard deviation of the Gaussian broadening.
+        :type broadening:   float
+
+        :param num_threads: Number of threads. Defaults to the value set by :func:`tbmodels.parallel.set_num_threads`.
+        :type num_threads:  int
+        """
+        energies = np.array(energies, dtype=float)
+        if kpoints is None:
+            kpoints = [np.zeros(self.model.dim)]
+        kpoints = [np.array(k, dtype=float).reshape(self.model.dim) for k in kpoints]
+        if weights is None:
+            weights = np.ones(len(kpoints)) / len(kpoints)
+        else:
+            weights = np.array(weights, dtype=float) / np.sum(weights)
+        res = np.zeros(energies.shape)
+        norm = 1. / (np.sqrt(2 * np.pi) * broadening * self.num_realizations * self.model.size)
+        for k, weight in zip(kpoints, weights):
+            eigenvals = self.eigenval(k, num_threads=num_threads).reshape(-1)
+            # limit the size of the intermediate array
+            num_chunks = -(-eigenvals.size * energies.size // 2**22)
+            for block in parallel.chunk_slices(len(eigenvals), num_chunks):
+                delta = (energies[..., None] - eigenvals[block]) / broadening
+                res += weight * norm * np.sum(np.exp(-0.5 * delta**2), axis=-1)
+        return res
+
+    def get_model(self, index):
+        """
+        Returns a single realization as a :class:`.Model`.
+
+        :param index:   Index of the realization.
+        :type index:    int
+        """
+        # a regular model is created, s.t. frozen or shared clean models can be used
+        res = Model._from_arrays(*self.model._to_arrays())
+        if self.on_site is not None:
+            res.add_on_site(self.on_site[index])
+        if self.bond is not None:
+            for bond, value in zip(self.bonds, self.bond[index]):
+                res.add_hop(value, bond[-2], bond[-1], bond[:-2])
+        return res
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Defines an immutable variant of the :class:`.Model` class.
+"""
+
+import types
+import threading
+
+import numpy as np
+from fsc.export import export
+
+from ._ptools import sparse_matrix as sp
+from ._ptools.locker import ConstLocker
+from ._ptools.lru_cache import LRUCache
+from ._tb_model import Model
+
+@export
+class FrozenModel(Model, metaclass=ConstLocker):
+    """
+    Immutable variant of :class:`.Model`, which is usually created with :meth:`.Model.freeze`. The attributes of the model cannot be changed, and the hopping matrices, positions and unit cell are read-only. Because the model cannot change, derived data such as the stacked hopping matrices and the :meth:`fingerprint` are computed only once and then re-used. A frozen model can safely be shared between threads.
+
+    :param model:   Model whose content is used.
+    :type model:    Model
+
+    :param copy:    Determines whether the hopping matrices are copied. If ``copy=False``, the matrices of the given model are used directly, and the given model must not be modified afterwards.
+    :type copy:     bool
+
+    .. note :: Derived models, e.g. from arithmetic operations or :meth:`symmetrize`, are regular (mutable) models.
+    """
+    def __init__(self, model, *, copy=True):
+        self.dtype = model.dtype
+        self.size = model.size
+        self.dim = model.dim
+        self._zero_vec = model._zero_vec
+        self.occ = model.occ
+        self.pos = self._read_only_array(model.pos, copy=copy)
+        self.uc = None if model.uc is None else self._read_only_array(model.uc, copy=copy)
+        self.symmetries = list(model.symmetries)
+
+        self._sparse = model._sparse
+        self._sparse_auto = getattr(model, '_sparse_auto', False)
+        self._matrix_type = model._matrix_type
+        self.hop = types.MappingProxyType({
+            R: self._read_only_matrix(mat, copy=copy)
+            for R, mat in model.hop.items()
+        })
+
+        if model._k_cache is None:
+            self._k_cache = None
+        else:
+            self._k_cache = LRUCache(model._k_cache.maxsize)
+            self._k_cache_decimals = model._k_cache_decimals
+
+        # models created from shared memory must keep the buffer alive
+        if not copy:
+            self._shared_buffer = getattr(model, '_shared_buffer', None)
+        self._read_only = True
+        self._derived_data = dict()
+        self._derived_lock = threading.RLock()
+
+    def _read_only_array(self, arr, copy):
+        """
+        Returns a read-only array with the same content as the given one.
+        """
+        arr = np.array(arr) if copy else np.asarray(arr)
+        arr.flags.writeable = False
+        return arr
+
+    def _read_only_matrix(self, mat, copy):
+        """
+        Returns a read-only hopping matrix, in the format of the model.
+        """
+        if self._sparse:
+            mat = sp.csr(mat, copy=copy)
+            for arr in (mat.data, mat.indices, mat.indptr):
+                arr.flags.writeable = False
+            return mat
+        return self._read_only_array(mat, copy=copy)
+
+    def _get_derived(self, key, compute):
+        """
+        Returns the derived data for the given key, calling ``compute()`` only if it has not been computed before.
+        """
+        with self._derived_lock:
+            try:
+                return self._derived_data[key]
+            except KeyError:
+                res = compute()
+                self._derived_data[key] = res
+                return res
+
+    def _clear_derived(self):
+        # the model cannot change, s.t. the derived data remains valid
+        pass
+
+    def freeze(self):
+        """
+        Returns the model itself, since it is already immutable.
+        """
+        return self
+
+    def fingerprint(self, decimals=10):
+        return self._get_derived(
+            ('fingerprint', decimals),
+            lambda: super(FrozenModel, self).fingerprint(decimals=decimals)
+        )
+    fingerprint.__doc__ = Model.fingerprint.__doc__
+
+    def _get_hop_stack(self, full=False):
+        return self._get_derived(
+            ('hop_stack', full),
+            lambda: self._read_only_result(super(FrozenModel, self)._get_hop_stack(full=full))
+        )
+
+    def _compute_sparse_scatter(self):
+        return self._read_only_result(super(FrozenModel, self)._compute_sparse_scatter())
+
+    def _get_dense_stack(self):
+        """
+        Returns the (sorted) lattice vectors and the stacked dense hopping matrices, in the data type of the model.
+        """
+        def compute():
+            R_array, hop_array = self._get_hop_stack()
+            return self._read_only_result((R_array, hop_array.astype(self.dtype)))
+        return self._get_derived('dense_stack', compute)
+
+    def _get_batch_operator(self):
+        return self._get_derived('batch_operator', super(FrozenModel, self)._get_batch_operator)
+
+    def _hamilton_dense(self, k):
+        R_array, hop_array = self._get_dense_stack()
+        phases = np.exp(2j * np.pi * np.dot(R_array, k)).astype(self.dtype)
+        return np.tensordot(phases, hop_array, axes=1)
+
+    @staticmethod
+    def _read_only_result(arrays):
+        """
+        Sets the given arrays to read-only, such that the cached data cannot be modified accidentally.
+        """
+        for arr in arrays:
+            arr.flags.writeable = False
+        return arrays
+
+    @classmethod
+    def _from_arrays(cls, arrays, metadata):
+        return cls(Model._from_arrays(arrays, metadata), copy=False)
+
+    @classmethod
+    def from_shared_memory(cls, shared_model):
+        return cls(Model.from_shared_memory(shared_model), copy=False)
+    from_shared_memory.__func__.__doc__ = Model.from_shared_memory.__doc__
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functions for storing models and results in HDF5 files, using the optional `h5py <http://www.h5py.org>`_ package. A model is stored in a HDF5 group, such that many models can be stored in the same file.
+
+The group contains the sorted lattice vectors in the dataset ``R``. Dense hopping matrices are stored as one dataset ``hop`` of shape ``(len(R), size, size)``, which is chunked s.t. each chunk contains the matrix for one lattice vector. Sparse hopping matrices are stored as the concatenated CSR arrays ``data`` and ``indices``, together with the index pointers ``indptr`` and the ``offsets`` of each matrix. The positions, unit cell and symmetries are stored as separate datasets, and the remaining attributes as attributes of the group.
+"""
+
+import numpy as np
+
+from ._symmetry import SymmetryOperation
+
+# format version, stored in the attributes of the group
+_FORMAT_VERSION = 1
+
+def _import_h5py():
+    """
+    Imports the optional :py:mod:`h5py` module.
+    """
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError('The h5py package is needed for the HDF5 storage. It can be installed with "pip install h5py".')
+    return h5py
+
+def write_model(group, arrays, metadata, *, compression=None):
+    """
+    Writes a model, given by the output of :meth:`.Model._to_arrays`, into a HDF5 group.
+    """
+    group.attrs['tbmodels_format'] = _FORMAT_VERSION
+    for key in ['size', 'dim', 'sparse', 'sparse_auto', 'dtype']:
+        group.attrs[key] = metadata[key]
+    if metadata['occ'] is not None:
+        group.attrs['occ'] = metadata['occ']
+    if metadata['k_cache'] is not None:
+        group.attrs['k_cache_maxsize'] = metadata['k_cache']['maxsize']
+        group.attrs['k_cache_decimals'] = metadata['k_cache']['decimals']
+
+    group.create_dataset('pos', data=metadata['pos'])
+    if metadata['uc'] is not None:
+        group.create_dataset('uc', data=metadata['uc'])
+    sym_group = group.create_group('symmetries')
+    for i, sym in enumerate(metadata['symmetries']):
+        sym_subgroup = sym_group.create_group(str(i))
+        sym_subgroup.create_dataset('rotation_matrix', data=sym.rotation_matrix)
+        sym_subgroup.create_dataset('repr_matrix', data=sym.repr_matrix)
+        sym_subgroup.create_dataset('translation_vector', data=sym.translation_vector)
+        sym_subgroup.attrs['repr_has_cc'] = sym.repr_has_cc
+
+    for key, arr in arrays.items():
+        if arr.size == 0 or key in ('R', 'indptr', 'offsets'):
+            group.create_dataset(key, data=arr)
+        elif key == 'hop':
+            # one chunk for each lattice vector, s.t. single matrices can be read
+            group.create_dataset(key, data=arr, chunks=(1, ) + arr.shape[1:], compression=compression)
+        else:
+            group.create_dataset(key, data=arr, chunks=True, compression=compression)
+
+def read_model(group, *, R=None, orbitals=None):
+    """
+    Reads a model from a HDF5 group, and returns it as a tuple ``(arrays, metadata)`` in the format of :meth:`.Model._to_arrays`. Only the selected lattice vectors and orbitals are read from the file.
+    """
+    if 'tbmodels_format' not in group.attrs:
+        raise ValueError('The HDF5 group {} does not contain a tight-binding model.'.format(group.name))
+    attrs = group.attrs
+    size = int(attrs['size'])
+    dim = int(attrs['dim'])
+    sparse = bool(attrs['sparse'])
+    pos = group['pos'][()]
+    occ = int(attrs['occ']) if 'occ' in attrs else None
+    symmetries = [
+        SymmetryOperation(
+            rotation_matrix=sym_group['rotation_matrix'][()],
+            repr_matrix=sym_group['repr_matrix'][()],
+            translation_vector=sym_group['translation_vector'][()],
+            repr_has_cc=bool(sym_group.attrs['repr_has_cc'])
+        )
+        for _, sym_group in sorted(group['symmetries'].items(), key=lambda x: int(x[0]))
+    ]
+
+    R_array = group['R'][()].reshape(-1, dim)
+    if R is None:
+        selected = np.arange(len(R_array))
+    else:
+        R = np.array(R, dtype=int).reshape(-1, dim)
+        if len(R_array) == 0:
+            selected = np.zeros(0, dtype=int)
+        else:
+            # only one of R and -R is stored
+            R_keys = {tuple(x) for x in R.tolist()} | {tuple(x) for x in (-R).tolist()}
+            selected = np.array(
+                [i for i, vec in enumerate(R_array.tolist()) if tuple(vec) in R_keys],
+                dtype=int
+            )
+    if orbitals is not None:
+        orbitals = np.array(orbitals, dtype=int).reshape(-1)
+        if np.any(orbitals < 0) or np.any(orbitals >= size):
+            raise ValueError('Invalid orbital indices {}, the model has {} orbitals.'.format(orbitals.tolist(), size))
+        pos = pos[orbitals]
+        # the occupation number and symmetries are not valid for a subset of orbitals
+        occ = None
+        symmetries = []
+        new_size = len(orbitals)
+    else:
+        new_size = size
+
+    arrays = dict(R=R_array[selected])
+    if sparse:
+        arrays.update(_read_sparse(group, selected, orbitals, size))
+    else:
+        hop = group['hop']
+        if orbitals is None:
+            if len(selected) == len(R_array):
+                arrays['hop'] = hop[()]
+            else:
+                arrays['hop'] = np.array([hop[i] for i in selected], dtype=hop.dtype).reshape(len(selected), size, size)
+        else:
+            arrays['hop'] = np.array(
+                [hop[i][np.ix_(orbitals, orbitals)] for i in selected],
+                dtype=hop.dtype
+            ).reshape(len(selected), new_size, new_size)
+
+    if 'k_cache_maxsize' in attrs:
+        k_cache = dict(maxsize=int(attrs['k_cache_maxsize']), decimals=int(attrs['k_cache_decimals']))
+    else:
+        k_cache = None
+    metadata = dict(
+        size=new_size,
+        dim=dim,
+        occ=occ,
+        pos=pos,
+        uc=group['uc'][()] if 'uc' in group else None,
+        symmetries=symmetries,
+        sparse=sparse,
+        sparse_auto=bool(attrs['sparse_auto']),
+        dtype=str(attrs['dtype']),
+        k_cache=k_cache
+    )
+    return arrays, metadata
+
+def _read_sparse(group, selected, orbitals, size):
+    """
+    Reads the CSR arrays of the selected sparse hopping matrices.
+    """
+    from ._ptools import sparse_matrix as sp
+
+    offsets = group['offsets'][()]
+    indptr = group['indptr'][()].reshape(-1, size + 1)
+    data_ds, indices_ds = group['data'], group['indices']
+    matrices = []
+    for i in selected:
+        mat = sp.csr(
+            (data_ds[offsets[i]:offsets[i + 1]], indices_ds[offsets[i]:offsets[i + 1]], indptr[i]),
+            shape=(size, size)
+        )
+        if orbitals is not None:
+            mat = sp.csr(mat[orbitals][:, orbitals])
+        matrices.append(mat)
+    new_size = size if orbitals is None else len(orbitals)
+    index_dtype = indices_ds.dtype
+    return dict(
+        data=np.concatenate([mat.data for mat in matrices] + [np.zeros(0, dtype=data_ds.dtype)]),
+        indices=np.concatenate([mat.indices for mat in matrices] + [np.zeros(0, dtype=index_dtype)]).astype(index_dtype),
+        indptr=np.array([mat.indptr for mat in matrices], dtype=index_dtype).reshape(len(matrices), new_size + 1),
+        offsets=np.concatenate([[0], np.cumsum([mat.nnz for mat in matrices], dtype=int)])
+    )
+
+def append_dataset(group, name, data, *, compression=None):
+    """
+    Appends data along the first axis of a resizable dataset, which is created if it does not exist.
+    """
+    data = np.asarray(data)
+    if name not in group:
+        group.create_dataset(
+            name,
+            data=data,
+            maxshape=(None, ) + data.shape[1:],
+            chunks=True,
+            compression=compression
+        )
+        return
+    dataset = group[name]
+    if dataset.shape[1:] != data.shape[1:]:
+        raise ValueError('The shape {} of the data does not match the shape {} of the existing dataset {}.'.format(data.shape, dataset.shape, dataset.name))
+    start = dataset.shape[0]
+    dataset.resize(start + len(data), axis=0)
+    dataset[start:] = data
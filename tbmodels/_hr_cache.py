@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Defines an on-disk cache for models loaded from ``hr.dat`` files.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+import contextlib
+
+class HrCache:
+    """
+    Cache which stores parsed models in binary (pickle) format. The entries are identified by the path, size and modification time (or optionally the content) of the input file, together with the parameters used for parsing. When the total size of the cache exceeds the size limit, the least recently used entries are removed.
+
+    :param cache_dir:   Directory where the cache entries are stored. It is created if it does not exist.
+    :type cache_dir:    str
+
+    :param size_limit:  Maximum total size of the cache entries, in bytes. By default, the size is not limited.
+    :type size_limit:   int
+    """
+    suffix = '.tbmodel.pickle'
+
+    def __init__(self, cache_dir, size_limit=None):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.size_limit = size_limit
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, hr_file, *, hash_content=False, **parameters):
+        """
+        Returns the cache key for a given input file and parsing parameters.
+        """
+        from .helpers import encode
+        hr_file = os.path.abspath(hr_file)
+        stat = os.stat(hr_file)
+        if hash_content:
+            content_hash = hashlib.sha256()
+            with open(hr_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(2**24), b''):
+                    content_hash.update(chunk)
+            file_id = dict(size=stat.st_size, sha256=content_hash.hexdigest())
+        else:
+            file_id = dict(path=hr_file, size=stat.st_size, mtime=stat.st_mtime_ns)
+        key_str = json.dumps(
+            dict(file=file_id, parameters=parameters),
+            default=encode,
+            sort_keys=True
+        )
+        return hashlib.sha256(key_str.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def load(self, key):
+        """
+        Returns the cached object for a given key, or ``None`` if no (valid) entry exists.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                res = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # corrupt or incompatible entry
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            return None
+        # mark the entry as recently used
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return res
+
+    def store(self, key, obj):
+        """
+        Stores an object in the cache, and removes old entries if the size limit is exceeded.
+        """
+        # write to a temporary file first, such that concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+        self._evict(keep=key)
+
+    def _evict(self, keep=None):
+        """
+        Removes the least recently used entries until the total size is below the size limit. The entry given by ``keep`` is never removed.
+        """
+        if self.size_limit is None:
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.suffix):
+                continue
+            with contextlib.suppress(OSError):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_size <= self.size_limit:
+                break
+            if keep is not None and name == keep + self.suffix:
+                continue
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self.cache_dir, name))
+                total_size -= size
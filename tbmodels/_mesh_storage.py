@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Storage of the results of :meth:`.Model.eigenval_mesh_to_file`, either as memory-mapped ``.npy`` files or as HDF5 datasets. The results are stored as arrays over the flat index of the k-points, together with the number of k-points which are completed. Since the number of completed k-points is updated only after the results are written, an interrupted calculation can be resumed.
+"""
+
+import os
+import json
+
+import numpy as np
+
+def get_storage(target):
+    """
+    Returns the storage for a target, which is either a HDF5 group or the name of a directory.
+    """
+    # HDF5 groups are detected without importing h5py
+    if hasattr(target, 'create_dataset'):
+        return Hdf5Storage(target)
+    return NpyStorage(target)
+
+def _normalize(metadata):
+    """
+    Converts the metadata to the form it has after reading it from JSON, s.t. it can be compared.
+    """
+    return json.loads(json.dumps(metadata))
+
+class NpyStorage:
+    """
+    Stores the results as ``<name>.npy`` files in a directory, and the number of completed k-points in the file ``progress.json``.
+    """
+    PROGRESS_FILE = 'progress.json'
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self.arrays = dict()
+
+    def open(self, metadata, shapes, dtypes, *, resume, compression=None):
+        """
+        Opens or creates the arrays, and returns the number of completed k-points.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        metadata = _normalize(metadata)
+        progress_file = os.path.join(self.directory, self.PROGRESS_FILE)
+        if resume and os.path.isfile(progress_file):
+            with open(progress_file, 'r') as f:
+                progress = json.load(f)
+            if progress['metadata'] != metadata:
+                raise ValueError('The existing results in {} were computed with different parameters.'.format(self.directory))
+            for name in shapes:
+                self.arrays[name] = np.load(self._filename(name), mmap_mode='r+')
+            self.metadata = metadata
+            return progress['num_completed']
+        # the progress file is removed first, s.t. it never refers to incomplete arrays
+        if os.path.isfile(progress_file):
+            os.remove(progress_file)
+        for name, shape in shapes.items():
+            self.arrays[name] = np.lib.format.open_memmap(
+                self._filename(name), mode='w+', dtype=dtypes[name], shape=shape
+            )
+        self.metadata = metadata
+        self._set_progress(0)
+        return 0
+
+    def write(self, start, results):
+        """
+        Writes the results for the k-points starting at index ``start``, and updates the number of completed k-points.
+        """
+        for name, values in results.items():
+            arr = self.arrays[name]
+            arr[start:start + len(values)] = values
+            arr.flush()
+        self._set_progress(start + len(values))
+
+    def close(self):
+        for arr in self.arrays.values():
+            arr.flush()
+        self.arrays = dict()
+
+    def _filename(self, name):
+        return os.path.join(self.directory, name + '.npy')
+
+    def _set_progress(self, num_completed):
+        # the file is replaced atomically, s.t. it is never left incomplete
+        progress_file = os.path.join(self.directory, self.PROGRESS_FILE)
+        tmp_file = progress_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(dict(metadata=self.metadata, num_completed=num_completed), f)
+        os.replace(tmp_file, progress_file)
+
+class Hdf5Storage:
+    """
+    Stores the results as datasets of a HDF5 group, and the number of completed k-points in the ``num_completed`` attribute of the group.
+    """
+    def __init__(self, group):
+        self.group = group
+        self.datasets = dict()
+
+    def open(self, metadata, shapes, dtypes, *, resume, compression=None):
+        """
+        Opens or creates the datasets, and returns the number of completed k-points.
+        """
+        group = self.group
+        metadata = _normalize(metadata)
+        if resume and 'num_completed' in group.attrs:
+            if json.loads(group.attrs['mesh_metadata']) != metadata:
+                raise ValueError('The existing results in the HDF5 group {} were computed with different parameters.'.format(group.name))
+            for name in shapes:
+                self.datasets[name] = group[name]
+            return int(group.attrs['num_completed'])
+        if 'num_completed' in group.attrs:
+            del group.attrs['num_completed']
+        for name, shape in shapes.items():
+            if name in group:
+                del group[name]
+            self.datasets[name] = group.create_dataset(
+                name,
+                shape=shape,
+                dtype=dtypes[name],
+                chunks=True if shape[0] else None,
+                compression=compression if shape[0] else None
+            )
+        group.attrs['mesh_metadata'] = json.dumps(metadata)
+        group.attrs['num_completed'] = 0
+        return 0
+
+    def write(self, start, results):
+        """
+        Writes the results for the k-points starting at index ``start``, and updates the number of completed k-points.
+        """
+        for name, values in results.items():
+            self.datasets[name][start:start + len(values)] = values
+        self.group.file.flush()
+        self.group.attrs['num_completed'] = start + len(values)
+        self.group.file.flush()
+
+    def close(self):
+        self.group.file.flush()
+        self.datasets = dict()
@@ -1,2 +1 @@
-import os
-__all__ = [f[:-3] for f in [os.path.basename(g) for g in os.listdir(os.path.dirname(os.path.abspath(__file__)))] if (not f.startswith(('_', '.'))) and f.endswith('.py')]
+__all__ = ['locker', 'lru_cache', 'monitoring', 'parallel', 'replace', 'sparse_matrix']
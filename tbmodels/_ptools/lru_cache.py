@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A thread-safe least-recently-used cache, which stores the results of :meth:`.Model.hamilton` and :meth:`.Model.eigenval` for the k-points which were evaluated most recently.
+
+In contrast to :func:`functools.lru_cache`, the cache is attached to a single model and can be cleared when the model is modified.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+__all__ = ['CacheInfo', 'LRUCache']
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class LRUCache:
+    """
+    Bounded mapping which discards the least recently used entries, and keeps track of the number of hits and misses. The cache can be used from multiple threads, but a value which is missing may be computed more than once.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """
+        Returns the value for the given key, calling ``compute()`` to create it if it is not in the cache.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return value
+        # the lock is not held during the computation
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        """
+        Removes all entries from the cache. The statistics are not reset.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        """
+        Returns the statistics of the cache as a named tuple ``(hits, misses, maxsize, currsize)``.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
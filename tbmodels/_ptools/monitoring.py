@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tools for measuring where time is spent: a :class:`Timer` context manager / decorator, and call counters with cumulative timings for registered methods.
+
+The instrumentation of registered methods is switched on with :func:`enable` and off with :func:`disable`. When disabled, the original methods are restored, so there is no overhead.
+"""
+
+import time
+import functools
+import threading
+from collections import namedtuple
+
+__all__ = ['Timer', 'enable', 'disable', 'is_enabled', 'register', 'record', 'reset', 'get_statistics', 'report']
+
+Statistics = namedtuple('Statistics', ['calls', 'total_time'])
+
+_lock = threading.Lock()
+_statistics = {}
+_registered = []
+_originals = {}
+_enabled = False
+
+class Timer:
+    """
+    Measures the time spent in a block of code (when used as a context manager) or in a function (when used as a decorator). The timing is added to the statistics under the given name.
+
+    :param name:    Name under which the timing is recorded.
+    :type name:     str
+
+    :param verbose: If set, the elapsed time is also printed at the end of each measurement.
+    :type verbose:  bool
+    """
+    def __init__(self, name, *, verbose=False):
+        self.name = name
+        self.verbose = verbose
+        self.elapsed = None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.elapsed = time.perf_counter() - self._start
+        record(self.name, self.elapsed)
+        if self.verbose:
+            print('{}: {:.6f} s'.format(self.name, self.elapsed))
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            # use a new instance s.t. recursive calls are timed correctly
+            with Timer(self.name, verbose=self.verbose):
+                return func(*args, **kwargs)
+        return inner
+
+def record(name, elapsed):
+    """
+    Adds a call with the given duration to the statistics.
+    """
+    with _lock:
+        calls, total_time = _statistics.get(name, (0, 0.))
+        _statistics[name] = Statistics(calls + 1, total_time + elapsed)
+
+def reset():
+    """
+    Clears the recorded statistics.
+    """
+    with _lock:
+        _statistics.clear()
+
+def get_statistics():
+    """
+    Returns a dictionary containing the number of calls and the cumulative time (in seconds) for each recorded name.
+    """
+    with _lock:
+        return dict(_statistics)
+
+def report(file=None):
+    """
+    Returns a summary of the recorded statistics as a string, sorted by the cumulative time. If a ``file`` is given, the summary is also written to it.
+    """
+    statistics = sorted(get_statistics().items(), key=lambda x: -x[1].total_time)
+    name_width = max([len('name')] + [len(name) for name, _ in statistics])
+    lines = ['{:<{}} {:>10} {:>14} {:>14}'.format('name', name_width, 'calls', 'total [s]', 'per call [s]')]
+    for name, stat in statistics:
+        lines.append('{:<{}} {:>10} {:>14.6f} {:>14.6e}'.format(
+            name, name_width, stat.calls, stat.total_time, stat.total_time / stat.calls
+        ))
+    res = '\n'.join(lines)
+    if file is not None:
+        print(res, file=file)
+    return res
+
+def _timed_method(func, name):
+    @functools.wraps(func)
+    def inner(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - start)
+    return inner
+
+def register(cls, method_names):
+    """
+    Registers methods of a class for instrumentation. The methods are timed only while the monitoring is enabled.
+
+    :param cls: Class containing the methods.
+    :type cls:  type
+
+    :param method_names:    Names of the methods, which can also be class- or static methods.
+    :type method_names:     list(str)
+    """
+    with _lock:
+        for name in method_names:
+            _registered.append((cls, name))
+            if _enabled:
+                _instrument(cls, name)
+
+def _instrument(cls, name):
+    original = cls.__dict__[name]
+    full_name = '{}.{}'.format(cls.__name__, name)
+    if isinstance(original, (classmethod, staticmethod)):
+        wrapped = type(original)(_timed_method(original.__func__, full_name))
+    else:
+        wrapped = _timed_method(original, full_name)
+    _originals[(cls, name)] = original
+    setattr(cls, name, wrapped)
+
+def enable():
+    """
+    Enables the timing of all registered methods.
+    """
+    global _enabled
+    with _lock:
+        if _enabled:
+            return
+        for cls, name in _registered:
+            _instrument(cls, name)
+        _enabled = True
+
+def disable():
+    """
+    Disables the timing of the registered methods, restoring the original methods.
+    """
+    global _enabled
+    with _lock:
+        for (cls, name), original in _originals.items():
+            setattr(cls, name, original)
+        _originals.clear()
+        _enabled = False
+
+def is_enabled():
+    """
+    Returns whether the timing of registered methods is enabled.
+    """
+    return _enabled
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tools for evaluating functions in parallel threads. This gives a speedup for functions which spend most of their time in NumPy / BLAS operations that release the GIL, and works also in environments where process pools cannot be used.
+
+The number of threads is set globally with :func:`set_num_threads`, and defaults to one (serial evaluation). While the threads are running, the number of BLAS threads is reduced s.t. the total number of threads does not exceed the number of CPUs. This requires the optional `threadpoolctl <https://github.com/joblib/threadpoolctl>`_ package.
+"""
+
+import os
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ['set_num_threads', 'get_num_threads', 'limit_blas_threads', 'thread_map', 'chunk_slices']
+
+_num_threads = 1
+
+def set_num_threads(num_threads):
+    """
+    Sets the default number of threads.
+
+    :param num_threads: Number of threads. If ``None``, the number of CPUs is used.
+    :type num_threads:  int
+    """
+    global _num_threads
+    _num_threads = _check_num_threads(num_threads)
+
+def get_num_threads():
+    """
+    Returns the default number of threads.
+    """
+    return _num_threads
+
+def _check_num_threads(num_threads):
+    """
+    Converts the number of threads to a positive integer, where ``None`` stands for the number of CPUs.
+    """
+    if num_threads is None:
+        return os.cpu_count() or 1
+    if int(num_threads) != num_threads or num_threads < 1:
+        raise ValueError('Invalid number of threads {}, must be a positive integer.'.format(num_threads))
+    return int(num_threads)
+
+@contextlib.contextmanager
+def limit_blas_threads(num_threads):
+    """
+    Context manager which limits the number of BLAS threads, s.t. ``num_threads`` threads each calling BLAS routines do not use more threads than there are CPUs. Has no effect if ``threadpoolctl`` is not installed.
+    """
+    if num_threads <= 1:
+        yield
+        return
+    # threadpoolctl is imported only when it is needed, since it inspects the loaded libraries
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        yield
+        return
+    with threadpool_limits(limits=max(1, (os.cpu_count() or 1) // num_threads), user_api='blas'):
+        yield
+
+def thread_map(func, iterable, num_threads=None):
+    """
+    Applies a function to each element of an iterable, using a pool of threads. The results are returned as a list, in the same order as the input.
+
+    :param num_threads: Number of threads. Defaults to the value set by :func:`set_num_threads`.
+    :type num_threads:  int
+    """
+    num_threads = get_num_threads() if num_threads is None else _check_num_threads(num_threads)
+    items = list(iterable)
+    if num_threads == 1 or len(items) <= 1:
+        return [func(x) for x in items]
+    num_threads = min(num_threads, len(items))
+    with limit_blas_threads(num_threads):
+        with ThreadPoolExecutor(num_threads) as executor:
+            return list(executor.map(func, items))
+
+def chunk_slices(length, num_chunks):
+    """
+    Splits the range ``0, ..., length - 1`` into at most ``num_chunks`` contiguous slices of nearly equal size.
+    """
+    num_chunks = max(1, min(num_chunks, length))
+    bounds = [(i * length) // num_chunks for i in range(num_chunks + 1)]
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
@@ -5,39 +5,65 @@
 # Date:    06.10.2015 17:35:33 CEST
 # File:    sparse_matrix.py
 
-import numpy as np
-import scipy.sparse as sp
-
-class ArrayConvertible(object):
-    def __array__(self):
-        return self.toarray()
-
-    # Because transpose / conjugate return scipy sparse arrays.
-    def transpose(self):
-        return self.__class__(super(ArrayConvertible, self).transpose())
-
-    def conjugate(self):
-        return self.__class__(super(ArrayConvertible, self).conjugate())
-    
-
-class csr(ArrayConvertible, sp.csr_matrix):
-    def __repr__(self):
-        res = (
-            'csr((' +
-            '[' + ', '.join(str(x) for x in self.data) + '], ' +
-            '[' + ', '.join(str(x) for x in self.indices) + '], ' +
-            '[' + ', '.join(str(x) for x in self.indptr) + ']), ' +
-            'shape={0.shape}, dtype=np.{0.dtype})'.format(self)
-        )
-        return res
-
-    # This is here because scipy throws NotImplementedError
-    # Is not needed for newer versions of scipy
-    def __iadd__(self, other):
-        return self + other
-    
-class coo(ArrayConvertible, sp.coo_matrix):
-    pass
-
-class lil(ArrayConvertible, sp.lil_matrix):
-    pass
+import sys
+import threading
+
+__all__ = ['csr', 'coo', 'lil']
+
+_lock = threading.Lock()
+
+# The classes are created on first access, s.t. importing this module does not import scipy.sparse.
+def _create_classes():
+    import scipy.sparse as sp
+
+    class ArrayConvertible(object):
+        def __array__(self):
+            return self.toarray()
+
+        # Because transpose / conjugate return scipy sparse arrays.
+        def transpose(self):
+            return self.__class__(super(ArrayConvertible, self).transpose())
+
+        def conjugate(self):
+            return self.__class__(super(ArrayConvertible, self).conjugate())
+
+
+    class csr(ArrayConvertible, sp.csr_matrix):
+        def __repr__(self):
+            res = (
+                'csr((' +
+                '[' + ', '.join(str(x) for x in self.data) + '], ' +
+                '[' + ', '.join(str(x) for x in self.indices) + '], ' +
+                '[' + ', '.join(str(x) for x in self.indptr) + ']), ' +
+                'shape={0.shape}, dtype=np.{0.dtype})'.format(self)
+            )
+            return res
+
+        # This is here because scipy throws NotImplementedError
+        # Is not needed for newer versions of scipy
+        def __iadd__(self, other):
+            return self + other
+
+    class coo(ArrayConvertible, sp.coo_matrix):
+        pass
+
+    class lil(ArrayConvertible, sp.lil_matrix):
+        pass
+
+    classes = dict(ArrayConvertible=ArrayConvertible, csr=csr, coo=coo, lil=lil)
+    for name, cls in classes.items():
+        # needed to pickle the matrices
+        cls.__qualname__ = name
+    globals().update(classes)
+
+def __getattr__(name):
+    if name in ('ArrayConvertible', 'csr', 'coo', 'lil'):
+        with _lock:
+            if name not in globals():
+                _create_classes()
+        return globals()[name]
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+# module-level __getattr__ is supported only for Python 3.7 and newer
+if sys.version_info < (3, 7):
+    _create_classes()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Defines a handle for sharing the hopping terms of a :class:`.Model` between processes, through shared memory or a memory-mapped file.
+"""
+
+import os
+import sys
+import contextlib
+
+import numpy as np
+from fsc.export import export
+
+# alignment (in bytes) of the arrays within the shared buffer
+_ALIGNMENT = 64
+
+@export
+class SharedModel:
+    """
+    Handle to the hopping terms of a model which are stored in shared memory (:mod:`multiprocessing.shared_memory`) or in a memory-mapped file. The handle itself is lightweight and can be passed to worker processes, where :meth:`.Model.from_shared_memory` creates a read-only model referencing the shared buffer without copying it.
+
+    The handle is created with :meth:`.Model.to_shared_memory`. The process which created it is responsible for releasing the buffer with :meth:`unlink` once the workers are done, which is also done when the handle is used as a context manager.
+
+    :param arrays:  Arrays which are stored in the shared buffer, given as a dictionary with the array names as keys.
+    :type arrays:   dict
+
+    :param metadata:    Additional (small) data which is stored in the handle itself.
+    :type metadata:     dict
+
+    :param filename:    Path of the memory-mapped file used to store the arrays. By default, a shared memory block is used.
+    :type filename:     str
+    """
+    def __init__(self, arrays, metadata, *, filename=None):
+        self.metadata = dict(metadata)
+        self.filename = None if filename is None else os.path.abspath(filename)
+        self.name = None
+        self._shm = None
+
+        self._layout = []
+        offset = 0
+        for key, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+            self._layout.append((key, arr.dtype.str, arr.shape, offset))
+            offset += arr.nbytes
+        # zero-size buffers are not allowed
+        self.nbytes = max(offset, 1)
+
+        if self.filename is None:
+            shared_memory = _import_shared_memory()
+            self._shm = shared_memory.SharedMemory(create=True, size=self.nbytes)
+            self.name = self._shm.name
+            buffer = self._shm.buf
+        else:
+            buffer = np.memmap(self.filename, dtype=np.uint8, mode='w+', shape=(self.nbytes,))
+        try:
+            for (key, dtype, shape, offset) in self._layout:
+                target = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+                target[...] = arrays[key]
+                del target
+            if self.filename is not None:
+                buffer.flush()
+        finally:
+            del buffer
+
+    def get_arrays(self):
+        """
+        Returns a tuple ``(buffer, arrays)`` of the attached buffer and a dictionary of read-only arrays referencing it. The buffer must be kept alive as long as the arrays are used.
+        """
+        if self.filename is None:
+            shared_memory = _import_shared_memory()
+            if sys.version_info >= (3, 13):
+                buffer = shared_memory.SharedMemory(name=self.name, track=False)
+            else:
+                buffer = shared_memory.SharedMemory(name=self.name)
+            data = buffer.buf
+        else:
+            buffer = np.memmap(self.filename, dtype=np.uint8, mode='r', shape=(self.nbytes,))
+            data = buffer
+        arrays = dict()
+        for (key, dtype, shape, offset) in self._layout:
+            arr = np.ndarray(shape, dtype=dtype, buffer=data, offset=offset)
+            arr.flags.writeable = False
+            arrays[key] = arr
+        return buffer, arrays
+
+    def close(self):
+        """
+        Closes the access of the creating process to the shared memory block, without releasing it.
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def unlink(self):
+        """
+        Releases the shared memory block (or removes the memory-mapped file). Models which are attached to it remain valid, but no new models can be created from the handle.
+        """
+        if self.filename is None:
+            if self._shm is None:
+                shared_memory = _import_shared_memory()
+                self._shm = shared_memory.SharedMemory(name=self.name)
+            self._shm.unlink()
+            self.close()
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.unlink()
+
+    def __getstate__(self):
+        # the buffer of the creating process is not passed on
+        state = self.__dict__.copy()
+        state['_shm'] = None
+        return state
+
+    def __repr__(self):
+        location = 'filename={!r}'.format(self.filename) if self.filename is not None else 'name={!r}'.format(self.name)
+        return '<SharedModel {}, nbytes={}>'.format(location, self.nbytes)
+
+def _import_shared_memory():
+    """
+    Imports the :mod:`multiprocessing.shared_memory` module, which is available only for Python 3.8 and newer.
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise ImportError('Shared memory is supported only for Python 3.8 and newer. Use a memory-mapped file instead, by passing a filename.')
+    return shared_memory
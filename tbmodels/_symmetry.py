@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Defines the symmetry operations which can be attached to a :class:`.Model`, and functions for reducing k-point meshes to their irreducible part.
+"""
+
+import numpy as np
+from fsc.export import export
+
+@export
+class SymmetryOperation:
+    """
+    Describes a symmetry operation of a tight-binding model, given by its action on real space and its representation on the orbitals.
+
+    :param rotation_matrix: Rotation part of the operation, acting on real-space vectors in reduced coordinates. Since the operation must map the lattice onto itself, this is an integer ``dim`` x ``dim`` matrix.
+    :type rotation_matrix:  array
+
+    :param repr_matrix: Representation of the operation on the orbitals, given as a unitary ``size`` x ``size`` matrix. The column ``i`` contains the image of orbital ``i``.
+    :type repr_matrix:  array
+
+    :param translation_vector: Fractional translation of the operation, in reduced coordinates. Defaults to zero.
+    :type translation_vector:  array
+
+    :param repr_has_cc: Specifies whether the operation contains a complex conjugation (as for time-reversal symmetry).
+    :type repr_has_cc:  bool
+    """
+    def __init__(self, rotation_matrix, repr_matrix, *, translation_vector=None, repr_has_cc=False):
+        self.rotation_matrix = np.array(rotation_matrix)
+        if not np.allclose(self.rotation_matrix, np.round(self.rotation_matrix)):
+            raise ValueError('The rotation matrix must be integer in reduced coordinates, but is\n{}'.format(self.rotation_matrix))
+        self.rotation_matrix = np.array(np.round(self.rotation_matrix), dtype=int)
+        dim = self.rotation_matrix.shape[0]
+        if self.rotation_matrix.shape != (dim, dim):
+            raise ValueError('The rotation matrix must be square, but has shape {}.'.format(self.rotation_matrix.shape))
+
+        self.repr_matrix = np.array(repr_matrix, dtype=complex)
+        size = self.repr_matrix.shape[0]
+        if self.repr_matrix.shape != (size, size):
+            raise ValueError('The representation matrix must be square, but has shape {}.'.format(self.repr_matrix.shape))
+
+        if translation_vector is None:
+            self.translation_vector = np.zeros(dim)
+        else:
+            self.translation_vector = np.array(translation_vector, dtype=float)
+            if self.translation_vector.shape != (dim,):
+                raise ValueError('The length of the translation vector {} does not match the dimension of the rotation matrix ({}).'.format(self.translation_vector, dim))
+        self.repr_has_cc = bool(repr_has_cc)
+
+    @property
+    def k_matrix(self):
+        """
+        Matrix describing the action of the operation on k-points in reduced coordinates. The sign is flipped for operations containing a complex conjugation.
+        """
+        res = np.linalg.inv(self.rotation_matrix).T
+        if self.repr_has_cc:
+            res = -res
+        return res
+
+    def __matmul__(self, other):
+        """
+        Returns the product of two symmetry operations, where ``other`` is applied first.
+        """
+        if not isinstance(other, SymmetryOperation):
+            return NotImplemented
+        other_repr = other.repr_matrix.conjugate() if self.repr_has_cc else other.repr_matrix
+        return SymmetryOperation(
+            rotation_matrix=np.dot(self.rotation_matrix, other.rotation_matrix),
+            repr_matrix=np.dot(self.repr_matrix, other_repr),
+            translation_vector=np.dot(self.rotation_matrix, other.translation_vector) + self.translation_vector,
+            repr_has_cc=(self.repr_has_cc != other.repr_has_cc)
+        )
+
+    def _is_equivalent(self, other):
+        """
+        Checks whether two operations act in the same way on a model, i.e. whether they are equal up to a lattice translation and a global phase of the representation.
+        """
+        if self.repr_has_cc != other.repr_has_cc:
+            return False
+        if not np.all(self.rotation_matrix == other.rotation_matrix):
+            return False
+        delta_t = self.translation_vector - other.translation_vector
+        if not np.allclose(delta_t, np.round(delta_t)):
+            return False
+        overlap = np.vdot(other.repr_matrix, self.repr_matrix)
+        if abs(overlap) < 1e-8:
+            return False
+        phase = overlap / abs(overlap)
+        return np.allclose(self.repr_matrix, phase * other.repr_matrix)
+
+    def __eq__(self, other):
+        if not isinstance(other, SymmetryOperation):
+            return NotImplemented
+        return (
+            self.repr_has_cc == other.repr_has_cc and
+            self.rotation_matrix.shape == other.rotation_matrix.shape and
+            self.repr_matrix.shape == other.repr_matrix.shape and
+            np.allclose(self.rotation_matrix, other.rotation_matrix) and
+            np.allclose(self.translation_vector, other.translation_vector) and
+            np.allclose(self.repr_matrix, other.repr_matrix)
+        )
+
+    def __repr__(self):
+        return ' '.join('tbmodels.SymmetryOperation(rotation_matrix={0.rotation_matrix!r}, repr_matrix={0.repr_matrix!r}, translation_vector={0.translation_vector!r}, repr_has_cc={0.repr_has_cc})'.format(self).replace('\n', ' ').replace('array', 'np.array').split())
+
+def _generate_group(generators, max_order=1000):
+    """
+    Returns the full group generated by the given symmetry operations. Operations which are equal up to a lattice translation and a global phase of the representation are counted only once.
+    """
+    generators = list(generators)
+    group = list(generators)
+    new_elements = list(generators)
+    while new_elements:
+        products = [g @ h for g in new_elements for h in generators]
+        new_elements = []
+        for op in products:
+            if not any(op._is_equivalent(g) for g in group):
+                group.append(op)
+                new_elements.append(op)
+        if len(group) > max_order:
+            raise ValueError('The group generated by the symmetry operations has more than {} elements.'.format(max_order))
+    return group
+
+@export
+def monkhorst_pack(mesh, *, shift=None):
+    """
+    Returns the k-points of a regular mesh in reduced coordinates. The k-points are given by :math:`k_i = (n_i + s_i) / N_i`, where :math:`N_i` is the mesh size and :math:`s_i` the shift in direction :math:`i`.
+
+    :param mesh:    Number of k-points in each direction.
+    :type mesh:     list(int)
+
+    :param shift:   Shift of the mesh, in units of the mesh spacing. By default, the mesh is Gamma-centered. A shift of ``0.5`` gives the offset Monkhorst-Pack mesh.
+    :type shift:    list(float)
+
+    :returns:   Array of shape ``(prod(mesh), len(mesh))``.
+    """
+    mesh, shift = _check_mesh(mesh, shift)
+    idx = np.indices(mesh).reshape(len(mesh), -1).T
+    return (idx + shift) / mesh
+
+@export
+def irreducible_kpoints(mesh, symmetry_operations=(), *, shift=None):
+    """
+    Reduces a regular k-point mesh (see :func:`monkhorst_pack`) to its irreducible part w.r.t. the given symmetry operations. K-points which are mapped onto each other by the operations (or any product of them) are combined into a single representative.
+
+    :param mesh:    Number of k-points in each direction.
+    :type mesh:     list(int)
+
+    :param symmetry_operations: Symmetries which are used to reduce the mesh. It is sufficient to give the generators of the symmetry group.
+    :type symmetry_operations:  list(SymmetryOperation)
+
+    :param shift:   Shift of the mesh, in units of the mesh spacing.
+    :type shift:    list(float)
+
+    :returns:   A tuple ``(kpoints, weights)``, where the weights sum to one.
+    """
+    mesh, shift = _check_mesh(mesh, shift)
+    kpoints = monkhorst_pack(mesh, shift=shift)
+    num_k = len(kpoints)
+
+    rows = [np.arange(num_k)]
+    cols = [np.arange(num_k)]
+    for op in symmetry_operations:
+        if op.rotation_matrix.shape != (len(mesh), len(mesh)):
+            raise ValueError('The dimension of the symmetry operation ({}) does not match the dimension of the mesh ({}).'.format(len(op.rotation_matrix), len(mesh)))
+        new_idx = np.dot(kpoints, op.k_matrix.T) * mesh - shift
+        new_idx_int = np.round(new_idx)
+        # k-points which are not mapped onto the mesh are not reduced
+        valid = np.all(np.abs(new_idx - new_idx_int) < 1e-6, axis=1)
+        new_idx_int = np.array(new_idx_int[valid], dtype=int) % mesh
+        rows.append(np.arange(num_k)[valid])
+        cols.append(np.ravel_multi_index(new_idx_int.T, mesh))
+
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    import scipy.sparse as sparse
+    from scipy.sparse.csgraph import connected_components
+
+    graph = sparse.coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(num_k, num_k))
+    num_irred, labels = connected_components(graph, directed=False)
+
+    representative = np.full(num_irred, num_k)
+    np.minimum.at(representative, labels, np.arange(num_k))
+    weights = np.bincount(labels, minlength=num_irred) / num_k
+    order = np.argsort(representative)
+    return kpoints[representative[order]], weights[order]
+
+def _check_mesh(mesh, shift):
+    """
+    Converts the mesh and shift to arrays and checks their consistency.
+    """
+    mesh = np.array(mesh, dtype=int)
+    if mesh.ndim != 1 or np.any(mesh <= 0):
+        raise ValueError('Invalid mesh {}: The mesh must be given as a list of positive integers.'.format(mesh))
+    if shift is None:
+        shift = np.zeros(len(mesh))
+    else:
+        shift = np.array(shift, dtype=float)
+        if shift.shape != mesh.shape:
+            raise ValueError('The length of the shift {} does not match the length of the mesh {}.'.format(shift, mesh))
+    return mesh, shift
@@ -11,14 +11,21 @@ from __future__ import division, print_function
 import copy
 import json
 import time
+import pickle
+import hashlib
+import fractions
 import contextlib
 import collections as co
 
 import numpy as np
-import scipy.linalg as la
 from fsc.export import export
 
 from ._ptools import sparse_matrix as sp
+from ._ptools import monitoring
+from ._ptools import parallel
+from ._ptools.lru_cache import LRUCache
+from ._symmetry import SymmetryOperation, irreducible_kpoints, _generate_group
+from ._shared_memory import SharedModel
 
 @export
 class Model:
@@ -49,8 +56,14 @@ class Model:
     :param contains_cc: Specifies whether the hopping matrices and on-site energies are given fully (``contains_cc=True``), such that the complex conjugate should be added for each term to obtain the full model. The on-site energies are not affected by this.
     :type contains_cc:  bool
 
-    :param sparse:      Specifies whether the hopping matrices should be saved in sparse format.
-    :type sparse:       bool
+    :param sparse:      Specifies whether the hopping matrices should be saved in sparse format. With ``sparse='auto'``, the format is chosen based on the size of the system and the density of the hopping matrices (see :meth:`set_sparse`).
+    :type sparse:       bool or str
+
+    :param symmetries:  Symmetry operations of the model. These are used to reduce k-point meshes to their irreducible part.
+    :type symmetries:   list(SymmetryOperation)
+
+    :param dtype:       Data type of the hopping matrices and the Hamiltonian, either ``complex128`` (the default) or ``complex64``. Single precision halves the memory usage and uses the single precision LAPACK routines for the eigenvalues.
+    :type dtype:        numpy.dtype
     """
     def __init__(
         self,
@@ -63,11 +76,16 @@ class Model:
         pos=None,
         uc=None,
         contains_cc=True,
-        sparse=False
+        sparse=False,
+        symmetries=None,
+        dtype=complex
     ):
         if hop is None:
             hop = dict()
 
+        self.dtype = self._check_dtype(dtype)
+
+        self._k_cache = None
         self.set_sparse(sparse)
 
         # ---- SIZE ----
@@ -96,11 +114,25 @@ class Model:
         # ---- OCCUPATION NR ----
         self.occ = None if (occ is None) else int(occ)
 
+        # ---- SYMMETRIES ----
+        self.symmetries = [] if symmetries is None else list(symmetries)
+        self._check_symmetries()
+
         # ---- SPARSITY ----
         self._sparse = True
         self.set_sparse(sparse)
 
     #---------------- INIT HELPER FUNCTIONS --------------------------------#
+    @staticmethod
+    def _check_dtype(dtype):
+        """
+        Checks that the given data type is one of the supported complex types.
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in (np.dtype(np.complex64), np.dtype(np.complex128)):
+            raise ValueError("Invalid dtype '{}', must be 'complex64' or 'complex128'.".format(dtype))
+        return dtype
+
     def _init_size(self, size, on_site, hop):
         """
         Sets the size of the system (number of orbitals).
@@ -135,7 +167,7 @@ class Model:
         """
         # The double-constructor is needed to avoid a double-constructor in the sparse to-array
         # but still allow for the dtype argument.
-        hop = {tuple(key): self._matrix_type(self._matrix_type(value), dtype=complex) for key, value in hop.items()}
+        hop = {tuple(key): self._matrix_type(self._matrix_type(value), dtype=self.dtype) for key, value in hop.items()}
 
         # positions
         if pos is None:
@@ -162,7 +194,7 @@ class Model:
         if on_site is not None:
             if len(on_site) != self.size:
                 raise ValueError('The number of on-site energies {0} does not match the size of the system {1}'.format(len(on_site), self.size))
-            self.hop[self._zero_vec] += 0.5 * self._matrix_type(np.diag(on_site))
+            self.hop[self._zero_vec] += 0.5 * self._matrix_type(np.diag(on_site), dtype=self.dtype)
 
     # helpers for _init_hop_pos
     def _map_to_uc(self, pos, hop):
@@ -176,7 +208,7 @@ class Model:
 
         # ---- uncommon case: handle mapping ----
         new_pos = [np.array(p) % 1 for p in pos]
-        new_hop = co.defaultdict(lambda: np.zeros((self.size, self.size), dtype=complex))
+        new_hop = co.defaultdict(lambda: np.zeros((self.size, self.size), dtype=self.dtype))
         for R, hop_mat in hop.items():
             hop_mat = np.array(hop_mat)
             for i0, row in enumerate(hop_mat):
@@ -194,7 +226,7 @@ class Model:
         """
         # Consistency checks
         for R, mat in hop.items():
-            if la.norm(
+            if np.linalg.norm(
                 mat -
                 hop.get(tuple(-x for x in R), np.zeros(mat.shape)).T.conjugate()
             ) > 1e-12:
@@ -249,6 +281,16 @@ class Model:
             if self.uc.shape != (self.dim, self.dim):
                 raise ValueError('Inconsistend dimension of the unit cell: {0}, does not match the dimensionality of the system ({1})'.format(self.uc.shape, self.dim))
 
+    def _check_symmetries(self):
+        """Consistency check for the dimension and size of the symmetry operations."""
+        for op in self.symmetries:
+            if not isinstance(op, SymmetryOperation):
+                raise ValueError('Invalid type {} for symmetry operation, must be SymmetryOperation.'.format(type(op)))
+            if op.rotation_matrix.shape != (self.dim, self.dim):
+                raise ValueError('The rotation matrix of shape {0} does not match the dimensionality of the system ({1})'.format(op.rotation_matrix.shape, self.dim))
+            if op.repr_matrix.shape != (self.size, self.size):
+                raise ValueError('The representation matrix of shape {0} does not match the size of the system ({1})'.format(op.repr_matrix.shape, self.size))
+
     #----------------ALTERNATE CONSTRUCTORS---------------------------------#
 
     @classmethod
@@ -264,6 +306,8 @@ class Model:
             * ``orbital_2``: index of the second involved orbital
             * ``R``: lattice vector of the unit cell containing the second orbital.
 
+            The hopping terms can also be given as a structured array with the fields ``t``, ``orbital_1``, ``orbital_2`` and ``R`` (see :func:`.helpers.hop_array` and :func:`.helpers.matrix_to_hop_array`), which is converted without iterating over the terms.
+
         :param size:    Number of states. Defaults to the length of the on-site energies given, if such are given.
         :type size:     int
 
@@ -275,33 +319,42 @@ class Model:
             except KeyError:
                 raise ValueError('No on-site energies and no size given. The size of the system cannot be determined.')
 
-        class _hop(object):
-            """
-            POD for hoppings
-            """
-            def __init__(self):
-                self.data = []
-                self.row_idx = []
-                self.col_idx = []
-
-            def append(self, data, row_idx, col_idx):
-                self.data.append(data)
-                self.row_idx.append(row_idx)
-                self.col_idx.append(col_idx)
-
-        # create data, row_idx, col_idx for setting up the CSR matrices
-        hop_list_dict = co.defaultdict(_hop)
-        for t, i, j, R in hop_list:
-            R_vec = tuple(R)
-            hop_list_dict[R_vec].append(t, i, j)
-
+        t, orbital_1, orbital_2, R_array = cls._hop_list_to_arrays(hop_list)
         # creating CSR matrices
-        hop_dict = dict()
-        for key, val in hop_list_dict.items():
-            hop_dict[key] = sp.csr((val.data, (val.row_idx, val.col_idx)), dtype=complex, shape=(size, size))
-
+        hop_dict = {
+            R: sp.csr((t[idx], (orbital_1[idx], orbital_2[idx])), dtype=complex, shape=(size, size))
+            for R, idx in cls._group_by_R(R_array)
+        }
         return cls(size=size, hop=hop_dict, **kwargs)
 
+    @staticmethod
+    def _hop_list_to_arrays(hop_list):
+        """
+        Converts a list of hopping terms (or a structured array) into the arrays ``(t, orbital_1, orbital_2, R_array)``.
+        """
+        if isinstance(hop_list, np.ndarray) and hop_list.dtype.names is not None:
+            return (
+                np.asarray(hop_list['t'], dtype=complex),
+                np.asarray(hop_list['orbital_1'], dtype=int),
+                np.asarray(hop_list['orbital_2'], dtype=int),
+                np.asarray(hop_list['R'], dtype=int).reshape(len(hop_list), -1)
+            )
+        hop_list = list(hop_list)
+        if len(hop_list) == 0:
+            return (
+                np.zeros(0, dtype=complex),
+                np.zeros(0, dtype=int),
+                np.zeros(0, dtype=int),
+                np.zeros((0, 0), dtype=int)
+            )
+        t, orbital_1, orbital_2, R_array = zip(*hop_list)
+        return (
+            np.array(t, dtype=complex),
+            np.array(orbital_1, dtype=int),
+            np.array(orbital_2, dtype=int),
+            np.array(R_array, dtype=int).reshape(len(hop_list), -1)
+        )
+
     @classmethod
     def from_hr(cls, hr_string, *, h_cutoff=0., **kwargs):
         """
@@ -325,15 +378,49 @@ class Model:
 
 
     @classmethod
-    def from_hr_file(cls, hr_file, *, h_cutoff=0., **kwargs):
+    def from_hr_file(
+        cls,
+        hr_file,
+        *,
+        h_cutoff=0.,
+        cache_dir=None,
+        cache_size_limit=None,
+        cache_hash_content=False,
+        **kwargs
+    ):
         """
         Create a :class:`.Model` instance from a file in Wannier90's ``hr.dat`` format. The keyword arguments are the same as for :meth:`.from_hr`.
 
         :param hr_file:     Path of the input file.
         :type hr_file:      str
+
+        :param cache_dir:   Directory of an on-disk cache for the parsed models. If given, the model is stored in binary format after parsing, and subsequent calls with the same file and arguments load it from the cache instead. By default, no cache is used.
+        :type cache_dir:    str
+
+        :param cache_size_limit:    Maximum total size (in bytes) of the cache. The least recently used entries are removed when it is exceeded. By default, the size is not limited.
+        :type cache_size_limit:     int
+
+        :param cache_hash_content:  Determines whether the cache entry is identified by a hash of the file content. By default, the file path, size and modification time are used.
+        :type cache_hash_content:   bool
         """
-        with open(hr_file, 'r') as file_handle:
-            return cls._from_hr_iterator(file_handle, h_cutoff=h_cutoff, **kwargs)
+        if cache_dir is None:
+            with open(hr_file, 'r') as file_handle:
+                return cls._from_hr_iterator(file_handle, h_cutoff=h_cutoff, **kwargs)
+
+        from ._hr_cache import HrCache
+        cache = HrCache(cache_dir, size_limit=cache_size_limit)
+        key = cache.get_key(
+            hr_file,
+            hash_content=cache_hash_content,
+            cls=cls.__module__ + '.' + cls.__qualname__,
+            h_cutoff=h_cutoff,
+            **kwargs
+        )
+        model = cache.load(key)
+        if model is None:
+            model = cls.from_hr_file(hr_file, h_cutoff=h_cutoff, **kwargs)
+            cache.store(key, model)
+        return model
 
     @classmethod
     def _from_hr_iterator(cls, hr_iterator, *, h_cutoff=0., **kwargs):
@@ -410,6 +497,85 @@ class Model:
         with open(json_file, 'r') as f:
             return json.load(f, object_hook=decode)
 
+    @classmethod
+    def from_msgpack(cls, msgpack_data):
+        """
+        Create a ``Model`` instance from bytes which contain a msgpack - serialized model, as created by :meth:`to_msgpack`. This requires the optional ``msgpack`` package.
+
+        :param msgpack_data:    Input data
+        :type msgpack_data:     bytes
+        """
+        from .helpers import decode, msgpack_ext_hook, _import_msgpack
+        msgpack = _import_msgpack()
+        return msgpack.unpackb(
+            msgpack_data,
+            object_hook=decode,
+            ext_hook=msgpack_ext_hook,
+            raw=False
+        )
+
+    @classmethod
+    def from_msgpack_file(cls, msgpack_file):
+        """
+        Create a ``Model`` instance from a file containing a msgpack - serialized model.
+
+        :param msgpack_file:    Path of the input file
+        :type msgpack_file:     str
+        """
+        with open(msgpack_file, 'rb') as f:
+            return cls.from_msgpack(f.read())
+
+    @classmethod
+    def from_hdf5(cls, hdf5_group, *, R=None, orbitals=None):
+        """
+        Create a ``Model`` instance from a HDF5 group, as written by :meth:`to_hdf5`. Only the selected lattice vectors and orbitals are read, s.t. parts of large models can be loaded without reading the whole model. This requires the optional ``h5py`` package.
+
+        :param hdf5_group:  HDF5 group (or file) containing the model.
+        :type hdf5_group:   h5py.Group
+
+        :param R:   Lattice vectors of the hopping matrices which are read. Since the hoppings for ``R`` and ``-R`` are related by Hermitian conjugation, selecting either of them gives both. By default, all hoppings are read.
+        :type R:    list
+
+        :param orbitals:    Indices of the orbitals which are read. The resulting model contains only the hoppings between these orbitals, in the given order, and has no occupation number or symmetries. By default, all orbitals are read.
+        :type orbitals:     list
+        """
+        from ._hdf5 import read_model
+        arrays, metadata = read_model(hdf5_group, R=R, orbitals=orbitals)
+        return cls._from_arrays(arrays, metadata)
+
+    @classmethod
+    def from_hdf5_file(cls, hdf5_file, *, name='/', **kwargs):
+        """
+        Create a ``Model`` instance from a HDF5 file. The keyword arguments are passed to :meth:`from_hdf5`.
+
+        :param hdf5_file:   Path of the input file
+        :type hdf5_file:    str
+
+        :param name:    Name of the group in the file which contains the model. By default, the model is read from the root group.
+        :type name:     str
+        """
+        from ._hdf5 import _import_h5py
+        h5py = _import_h5py()
+        with h5py.File(hdf5_file, 'r') as f:
+            return cls.from_hdf5(f[name], **kwargs)
+
+    @classmethod
+    def from_shared_memory(cls, shared_model):
+        """
+        Create a read-only ``Model`` instance whose hopping matrices reference the buffer of a :class:`.SharedModel` handle, without copying them. This is intended to be used in worker processes, where the handle is passed instead of the full model.
+
+        :param shared_model:    Handle created by :meth:`to_shared_memory`.
+        :type shared_model:     SharedModel
+
+        .. note :: The returned model cannot be modified. Derived models (e.g. from arithmetic operations) are regular models containing a copy of the hoppings.
+        """
+        buffer, arrays = shared_model.get_arrays()
+        res = cls._from_arrays(arrays, shared_model.metadata)
+        # keep the buffer alive as long as the model exists
+        res._shared_buffer = buffer
+        res._read_only = True
+        return res
+
     #------------------SERIALIZATION TO DIFFERENT FORMATS---------------#
 
     def to_hr(self):
@@ -494,6 +660,73 @@ class Model:
         with open(json_file, 'w') as f:
             json.dump(self, f, default=encode)
 
+    def to_msgpack(self):
+        """
+        Serializes the model instance to bytes in the binary msgpack format. The arrays containing the hopping matrices are stored as raw buffers, which makes this much faster than :meth:`to_json`. This requires the optional ``msgpack`` package.
+
+        :returns:   bytes
+        """
+        from .helpers import msgpack_default, _import_msgpack
+        msgpack = _import_msgpack()
+        return msgpack.packb(self, default=msgpack_default, use_bin_type=True)
+
+    def to_msgpack_file(self, msgpack_file):
+        """
+        Saves the model instance to a file, using the msgpack format.
+
+        :param msgpack_file:    Path to the output file.
+        :type msgpack_file:     str
+        """
+        with open(msgpack_file, 'wb') as f:
+            f.write(self.to_msgpack())
+
+    def to_hdf5(self, hdf5_group, *, compression=None):
+        """
+        Writes the model to a HDF5 group. The hopping matrices are stored in chunks, s.t. selected lattice vectors or orbitals can be read with :meth:`from_hdf5` without loading the whole model. This requires the optional ``h5py`` package.
+
+        :param hdf5_group:  Empty HDF5 group (or file) to which the model is written. To store multiple models in one file, a separate group must be used for each model.
+        :type hdf5_group:   h5py.Group
+
+        :param compression: Compression filter for the hopping matrices, e.g. ``'gzip'`` or ``'lzf'``. By default, the data is not compressed.
+        :type compression:  str
+        """
+        from ._hdf5 import write_model
+        arrays, metadata = self._to_arrays()
+        write_model(hdf5_group, arrays, metadata, compression=compression)
+
+    def to_hdf5_file(self, hdf5_file, *, name=None, compression=None):
+        """
+        Saves the model instance to a HDF5 file.
+
+        :param hdf5_file:   Path to the output file.
+        :type hdf5_file:    str
+
+        :param name:    Name of the group in which the model is stored. If a name is given, the model is added to the file (which may already contain other models). Otherwise, the file is overwritten and the model is stored in the root group.
+        :type name:     str
+
+        :param compression: Compression filter for the hopping matrices, as described in :meth:`to_hdf5`.
+        :type compression:  str
+        """
+        from ._hdf5 import _import_h5py
+        h5py = _import_h5py()
+        with h5py.File(hdf5_file, 'w' if name is None else 'a') as f:
+            group = f if name is None else f.create_group(name)
+            self.to_hdf5(group, compression=compression)
+
+    def to_shared_memory(self, *, filename=None):
+        """
+        Copies the hopping matrices into shared memory (or a memory-mapped file), and returns a lightweight handle which can be passed to other processes. There, :meth:`from_shared_memory` creates read-only models referencing the shared buffer, such that the hoppings are stored only once on each node.
+
+        :param filename:    Path of a memory-mapped file which is used instead of a shared memory block. This also works for Python versions without :mod:`multiprocessing.shared_memory`.
+        :type filename:     str
+
+        :returns:   :class:`.SharedModel`
+
+        .. note :: The shared buffer must be released with :meth:`.SharedModel.unlink` (or by using the handle as a context manager) once it is no longer needed.
+        """
+        arrays, metadata = self._to_arrays()
+        return SharedModel(arrays, metadata, filename=filename)
+
 
     @staticmethod
     def _mat_to_hr(R, mat):
@@ -509,37 +742,539 @@ class Model:
                 )
         return lines
 
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles the model through the flat arrays returned by :meth:`_to_arrays` instead of the dictionary of hopping matrices. For protocol 5 and higher, the arrays are passed as :class:`pickle.PickleBuffer` objects, such that they can be transferred out-of-band without copying.
+        """
+        arrays, metadata = self._to_arrays()
+        if protocol >= 5:
+            buffers = {
+                key: (pickle.PickleBuffer(arr), arr.dtype.str, arr.shape)
+                for key, arr in arrays.items()
+            }
+        else:
+            buffers = {
+                key: (arr, arr.dtype.str, arr.shape)
+                for key, arr in arrays.items()
+            }
+        return (self._from_pickle, (buffers, metadata))
+
+    @classmethod
+    def _from_pickle(cls, buffers, metadata):
+        """
+        Reconstructs a pickled model. Arrays are used without copying, unless the buffer they were transferred in is read-only.
+        """
+        arrays = dict()
+        for key, (buf, dtype, shape) in buffers.items():
+            if memoryview(buf).readonly:
+                arr = np.frombuffer(buf, dtype=dtype).copy()
+            else:
+                arr = np.frombuffer(buf, dtype=dtype)
+            arrays[key] = arr.reshape(shape)
+        return cls._from_arrays(arrays, metadata)
+
     def __repr__(self):
         return ' '.join('tbmodels.Model(hop={1}, pos={0.pos!r}, uc={0.uc!r}, occ={0.occ}, contains_cc=False)'.format(self, dict(self.hop)).replace('\n', ' ').replace('array', 'np.array').split())
 
     #---------------- BASIC FUNCTIONALITY ----------------------------------#
-    def hamilton(self, k):
+    def hamilton(self, k, *, dtype=None):
         """
         Creates the Hamilton matrix for a given k-point, using Convention II (see explanation in `the PythTB documentation  <http://www.physics.rutgers.edu/pythtb/_downloads/pythtb-formalism.pdf>`_ )
 
         :param k:   k-point
         :type k:    list
 
+        :param dtype:   Data type of the result. Defaults to the data type of the model.
+        :type dtype:    numpy.dtype
+
         :returns:   2D numpy array
         """
+        dtype = self.dtype if dtype is None else self._check_dtype(dtype)
+        return self._from_k_cache(
+            ('hamilton', dtype.name), k,
+            lambda k: self._hamilton(k).astype(dtype, copy=False)
+        )
+
+    def _hamilton(self, k):
+        """
+        Computes the Hamilton matrix without using the k-point cache.
+        """
         k = np.array(k)
-        H = sum(self._array_cast(hop) * np.exp(2j * np.pi * np.dot(R, k)) for R, hop in self.hop.items())
+        if self._sparse:
+            H = self._hamilton_sparse(k)
+        else:
+            H = self._hamilton_dense(k)
         H += H.conjugate().T
         return np.array(H)
 
-    def eigenval(self, k):
+    def _hamilton_dense(self, k):
+        """
+        Assembles the Hamilton matrix (without the complex conjugate terms) from dense hopping matrices.
+        """
+        phase_type = self.dtype.type
+        return sum(self._array_cast(hop) * phase_type(np.exp(2j * np.pi * np.dot(R, k))) for R, hop in self.hop.items())
+
+    def _hamilton_sparse(self, k):
+        """
+        Assembles the Hamilton matrix (without the complex conjugate terms) from sparse hopping matrices, by scattering the non-zero entries of all matrices into a dense array in one step.
+        """
+        R_array, data, idx, nnz = self._get_sparse_scatter()
+        data = data * np.repeat(np.exp(2j * np.pi * np.dot(R_array, k)), nnz)
+        num_el = self.size**2
+        H = np.empty(num_el, dtype=self.dtype)
+        H.real = np.bincount(idx, weights=data.real, minlength=num_el)
+        H.imag = np.bincount(idx, weights=data.imag, minlength=num_el)
+        return H.reshape(self.size, self.size)
+
+    def eigenval(self, k, *, dtype=None):
         """
         Returns the eigenvalues at a given k point, using Convention II (see explanation in `the PythTB documentation  <http://www.physics.rutgers.edu/pythtb/_downloads/pythtb-formalism.pdf>`_ )
 
         :param k:   k-point
         :type k:    list
 
+        :param dtype:   Data type of the Hamiltonian which is diagonalized. For ``complex64``, the single precision eigensolver is used. Defaults to the data type of the model.
+        :type dtype:    numpy.dtype
+
         :returns:   array of eigenvalues
         """
-        return la.eigvalsh(self.hamilton(k))
+        import scipy.linalg as la
+
+        dtype = self.dtype if dtype is None else self._check_dtype(dtype)
+        return self._from_k_cache(
+            ('eigenval', dtype.name), k,
+            # the uncached Hamiltonian is used, s.t. each k-point adds only one cache entry
+            lambda k: la.eigvalsh(self._hamilton(k).astype(dtype, copy=False))
+        )
+
+    #---- evaluation at multiple k-points ----#
+    #: Maximum number of entries of the Hamilton matrices which are computed in one block by :meth:`hamilton_batch` and :meth:`eigenval_batch`.
+    BATCH_BLOCK_SIZE = 2**22
+
+    def hamilton_batch(self, kpoints, *, dtype=None, num_threads=None):
+        """
+        Returns the Hamilton matrices for a list of k-points. The k-points are split into blocks, for which the Hamilton matrices are computed with a single matrix product over all lattice vectors. The blocks are evaluated in parallel threads.
+
+        :param kpoints: List of k-points.
+        :type kpoints:  list
+
+        :param dtype:   Data type of the result. Defaults to the data type of the model.
+        :type dtype:    numpy.dtype
+
+        :param num_threads: Number of threads. Defaults to the value set by :func:`tbmodels.parallel.set_num_threads`.
+        :type num_threads:  int
+
+        :returns:   Array of shape ``(len(kpoints), size, size)``.
+
+        .. note :: The k-point cache is not used by this method.
+        """
+        dtype = self.dtype if dtype is None else self._check_dtype(dtype)
+        kpoints = np.array(kpoints, dtype=float)
+        kpoints = kpoints.reshape(len(kpoints), self.dim)
+        res = np.empty((len(kpoints), self.size, self.size), dtype=dtype)
+        batch_operator = self._get_batch_operator()
+
+        def evaluate(block):
+            res[block] = self._hamilton_block(kpoints[block], batch_operator)
+        self._map_blocks(evaluate, len(kpoints), num_threads)
+        return res
 
+    def eigenval_batch(self, kpoints, *, dtype=None, num_threads=None):
+        """
+        Returns the eigenvalues for a list of k-points. The Hamilton matrices are computed as in :meth:`hamilton_batch`, and diagonalized in the same threads.
+
+        :param kpoints: List of k-points.
+        :type kpoints:  list
+
+        :param dtype:   Data type of the Hamiltonian which is diagonalized. Defaults to the data type of the model.
+        :type dtype:    numpy.dtype
+
+        :param num_threads: Number of threads. Defaults to the value set by :func:`tbmodels.parallel.set_num_threads`.
+        :type num_threads:  int
+
+        :returns:   Array of shape ``(len(kpoints), size)``.
+
+        .. note :: The k-point cache is not used by this method.
+        """
+        kpoints = np.array(kpoints, dtype=float)
+        kpoints = kpoints.reshape(len(kpoints), self.dim)
+        return self._eigenval_batch(kpoints, dtype, num_threads, self._get_batch_operator())
+
+    def _eigenval_batch(self, kpoints, dtype, num_threads, batch_operator):
+        """
+        Implementation of :meth:`eigenval_batch`, for a given output of :meth:`_get_batch_operator`.
+        """
+        dtype = self.dtype if dtype is None else self._check_dtype(dtype)
+        res = np.empty((len(kpoints), self.size), dtype=np.finfo(dtype).dtype)
+
+        def evaluate(block):
+            res[block] = np.linalg.eigvalsh(self._hamilton_block(kpoints[block], batch_operator).astype(dtype, copy=False))
+        self._map_blocks(evaluate, len(kpoints), num_threads)
+        return res
+
+    def eigenval_batch_to_hdf5(self, kpoints, hdf5_group, *, dtype=None, num_threads=None, compression=None):
+        """
+        Computes the eigenvalues for a list of k-points as in :meth:`eigenval_batch`, and appends them to the resizable datasets ``kpoints`` and ``eigenval`` of a HDF5 group, which are created if they do not exist. The k-points are processed in chunks, and the results of each chunk are written before the next one is computed, s.t. the full result does not need to fit into memory. This requires the optional ``h5py`` package.
+
+        :param kpoints: List of k-points.
+        :type kpoints:  list
+
+        :param hdf5_group:  HDF5 group (or file) to which the results are written.
+        :type hdf5_group:   h5py.Group
+
+        :param dtype:   Data type of the Hamiltonian which is diagonalized. Defaults to the data type of the model.
+        :type dtype:    numpy.dtype
+
+        :param num_threads: Number of threads. Defaults to the value set by :func:`tbmodels.parallel.set_num_threads`.
+        :type num_threads:  int
+
+        :param compression: Compression filter for the datasets, as described in :meth:`to_hdf5`.
+        :type compression:  str
+        """
+        from ._hdf5 import append_dataset
+        kpoints = np.array(kpoints, dtype=float)
+        kpoints = kpoints.reshape(len(kpoints), self.dim)
+        num_threads = parallel.get_num_threads() if num_threads is None else num_threads
+        chunk_size = self._get_chunk_size(num_threads)
+        batch_operator = self._get_batch_operator()
+        for block in parallel.chunk_slices(len(kpoints), -(-len(kpoints) // chunk_size)):
+            eigenval = self._eigenval_batch(kpoints[block], dtype, num_threads, batch_operator)
+            append_dataset(hdf5_group, 'eigenval', eigenval, compression=compression)
+            append_dataset(hdf5_group, 'kpoints', kpoints[block], compression=compression)
+
+    def eigenval_mesh_to_file(
+        self,
+        mesh,
+        target,
+        *,
+        eigenvectors=False,
+        resume=True,
+        dtype=None,
+        num_threads=None,
+        chunk_size=None,
+        compression=None
+    ):
+        """
+        Computes the eigenvalues (and optionally the eigenvectors) on a regular k-point mesh, and writes them to memory-mapped ``.npy`` files or to HDF5 datasets. The k-points are created and processed in chunks, and the results of each chunk are written before the next one is computed, s.t. neither the k-points nor the results need to fit into memory. Within a chunk, the Hamilton matrices are computed and diagonalized in blocks, as in :meth:`eigenval_batch`.
+
+        The results are stored as arrays ``eigenval`` of shape ``(num_k, size)`` and ``eigenvec`` of shape ``(num_k, size, size)``, where the eigenvectors are the columns of each matrix as in :func:`numpy.linalg.eigh`. The k-point with index ``i`` is ``numpy.unravel_index(i, mesh) / mesh``, s.t. reshaping the arrays to ``(*mesh, ...)`` gives the results on the mesh.
+
+        After each chunk, the number of completed k-points is stored with the results. If the calculation is interrupted, calling this method again with the same model and arguments continues after the last completed chunk.
+
+        :param mesh:    Number of k-points in each direction.
+        :type mesh:     list(int)
+
+        :param target:  Directory to which the files ``eigenval.npy``, ``eigenvec.npy`` and ``progress.json`` are written, or HDF5 group (or file) in which the datasets are created. The HDF5 storage requires the optional ``h5py`` package.
+        :type target:   str or h5py.Group
+
+        :param eigenvectors:    Determines whether the eigenvectors are stored in addition to the eigenvalues.
+        :type eigenvectors:     bool
+
+        :param resume:  Determines whether existing results in the target are continued. An error is raised if they were computed for a different model or with different arguments. If ``resume=False``, existing results are overwritten.
+        :type resume:   bool
+
+        :param dtype:   Data type of the Hamiltonian which is diagonalized. Defaults to the data type of the model.
+        :type dtype:    numpy.dtype
+
+        :param num_threads: Number of threads. Defaults to the value set by :func:`tbmodels.parallel.set_num_threads`.
+        :type num_threads:  int
+
+        :param chunk_size:  Number of k-points which are computed before the results are written. By default, each thread processes one block of k-points per chunk.
+        :type chunk_size:   int
+
+        :param compression: Compression filter for the HDF5 datasets, as described in :meth:`to_hdf5`.
+        :type compression:  str
+        """
+        from ._mesh_storage import get_storage
+
+        mesh = self._check_mesh(mesh)
+        num_k = int(np.prod(mesh))
+        dtype = self.dtype if dtype is None else self._check_dtype(dtype)
+        num_threads = parallel.get_num_threads() if num_threads is None else num_threads
+        if chunk_size is None:
+            chunk_size = self._get_chunk_size(num_threads)
+        elif chunk_size < 1:
+            raise ValueError('The chunk size must be positive, but is {}.'.format(chunk_size))
+
+        shapes = dict(eigenval=(num_k, self.size))
+        dtypes = dict(eigenval=np.finfo(dtype).dtype)
+        if eigenvectors:
+            shapes['eigenvec'] = (num_k, self.size, self.size)
+            dtypes['eigenvec'] = np.dtype(dtype)
+        metadata = dict(
+            fingerprint=self.fingerprint(),
+            mesh=mesh.tolist(),
+            eigenvectors=bool(eigenvectors),
+            dtype=np.dtype(dtype).str
+        )
+        storage = get_storage(target)
+        num_completed = storage.open(metadata, shapes, dtypes, resume=resume, compression=compression)
+        batch_operator = self._get_batch_operator()
+        try:
+            for start in range(num_completed, num_k, chunk_size):
+                stop = min(start + chunk_size, num_k)
+                kpoints = self._mesh_kpoints(mesh, np.arange(start, stop))
+                results = {
+                    name: np.empty((stop - start, ) + shape[1:], dtype=dtypes[name])
+                    for name, shape in shapes.items()
+                }
+
+                def evaluate(block):
+                    H = self._hamilton_block(kpoints[block], batch_operator).astype(dtype, copy=False)
+                    if eigenvectors:
+                        results['eigenval'][block], results['eigenvec'][block] = np.linalg.eigh(H)
+                    else:
+                        results['eigenval'][block] = np.linalg.eigvalsh(H)
+                self._map_blocks(evaluate, stop - start, num_threads)
+                storage.write(start, results)
+        finally:
+            storage.close()
+
+    def _get_chunk_size(self, num_threads):
+        """
+        Returns the number of k-points which are processed at once by methods writing their results to a file, s.t. each thread processes one block of k-points.
+        """
+        return num_threads * max(1, self.BATCH_BLOCK_SIZE // max(1, self.size**2))
+
+    def _check_mesh(self, mesh):
+        """
+        Converts a regular k-point mesh to an integer array, and checks that it matches the dimension of the model.
+        """
+        mesh = np.array(mesh, dtype=int).reshape(-1)
+        if mesh.shape != (self.dim, ) or np.any(mesh < 1):
+            raise ValueError('The mesh must contain a positive number of k-points for each of the {} dimensions, but is {}.'.format(self.dim, mesh.tolist()))
+        return mesh
+
+    @staticmethod
+    def _mesh_kpoints(mesh, indices):
+        """
+        Returns the k-points of a regular mesh for the given flat indices, in C order of the mesh. This allows creating parts of large meshes without creating the full list of k-points.
+        """
+        indices = np.asarray(indices, dtype=int).reshape(-1)
+        if len(mesh) == 0:
+            return np.zeros((len(indices), 0))
+        return np.array(np.unravel_index(indices, tuple(mesh)), dtype=float).T.reshape(len(indices), len(mesh)) / mesh
+
+    def _map_blocks(self, func, num_k, num_threads):
+        """
+        Splits the k-points into blocks which are processed in parallel threads. There are at least as many blocks as threads, and each block contains at most :attr:`BATCH_BLOCK_SIZE` matrix entries.
+        """
+        num_threads = parallel.get_num_threads() if num_threads is None else num_threads
+        k_per_block = max(1, self.BATCH_BLOCK_SIZE // max(1, self.size**2))
+        num_blocks = max(num_threads, -(-num_k // k_per_block))
+        parallel.thread_map(func, parallel.chunk_slices(num_k, num_blocks), num_threads=num_threads)
+
+    def _hamilton_block(self, kpoints, batch_operator):
+        """
+        Computes the Hamilton matrices for a block of k-points, given the output of :meth:`_get_batch_operator`. The operator is passed in s.t. it is created only once for all blocks.
+        """
+        R_array, operator = batch_operator
+        phases = np.exp(2j * np.pi * np.dot(kpoints, R_array.T)).astype(self.dtype)
+        if self._sparse:
+            H = (operator @ phases.T).T
+        else:
+            H = np.dot(phases, operator)
+        H = H.reshape(len(kpoints), self.size, self.size)
+        H += H.conjugate().transpose(0, 2, 1)
+        return H
+
+    def _get_batch_operator(self):
+        """
+        Returns the lattice vectors and the operator which maps the phases :math:`e^{2 \\pi i k \\cdot R}` to the (flattened) Hamilton matrix without the complex conjugate terms. For dense models, this is the array of stacked hopping matrices of shape ``(len(R_array), size**2)``, for sparse models the transposed sparse matrix.
+        """
+        if self._sparse:
+            import scipy.sparse
+
+            R_array, data, idx, nnz = self._get_sparse_scatter()
+            R_idx = np.repeat(np.arange(len(R_array)), nnz)
+            operator = scipy.sparse.csr_matrix(
+                (data.astype(self.dtype), (idx, R_idx)),
+                shape=(self.size**2, len(R_array))
+            )
+        else:
+            R_array, hop_array = self._get_hop_stack()
+            operator = hop_array.astype(self.dtype).reshape(len(R_array), self.size**2)
+        return R_array, operator
+
+    #---- k-point cache ----#
+    def set_k_cache(self, maxsize=128, *, decimals=10):
+        """
+        Enables a cache for the results of :meth:`hamilton` and :meth:`eigenval`, such that repeated evaluations at the same k-point are not re-computed. The cache is cleared when the model is modified through :meth:`add_hop`, :meth:`add_on_site` or :meth:`set_sparse`.
+
+        :param maxsize: Maximum number of cached results. The least recently used results are discarded. Setting ``maxsize=0`` disables the cache.
+        :type maxsize:  int
+
+        :param decimals:    Number of decimals to which the k-points are rounded to determine whether they are equal.
+        :type decimals:     int
+
+        .. warning :: Changes made by directly modifying the :attr:`hop` attribute are not detected, and the cache must be cleared manually with :meth:`clear_k_cache`.
+        """
+        if maxsize == 0:
+            self._k_cache = None
+        else:
+            self._k_cache = LRUCache(maxsize)
+            self._k_cache_decimals = decimals
+
+    def clear_k_cache(self):
+        """
+        Removes all results from the k-point cache.
+        """
+        if getattr(self, '_k_cache', None) is not None:
+            self._k_cache.clear()
+        self._clear_derived()
+
+    def _get_derived(self, key, compute):
+        """
+        Returns data derived from the hoppings for the given key, calling ``compute()`` only if it has not been computed since the model was last modified. As for the k-point cache, modifications are detected only if they are done through the methods of the model.
+        """
+        derived_data = self.__dict__.setdefault('_derived_data', dict())
+        try:
+            return derived_data[key]
+        except KeyError:
+            res = compute()
+            derived_data[key] = res
+            return res
+
+    def _clear_derived(self):
+        """
+        Discards the data cached by :meth:`_get_derived`.
+        """
+        with contextlib.suppress(AttributeError):
+            self._derived_data.clear()
+
+    def k_cache_info(self):
+        """
+        Returns the statistics of the k-point cache as a named tuple ``(hits, misses, maxsize, currsize)``, or ``None`` if the cache is not enabled.
+        """
+        if getattr(self, '_k_cache', None) is None:
+            return None
+        return self._k_cache.info()
+
+    def _from_k_cache(self, name, k, compute):
+        """
+        Returns the result of ``compute(k)``, using the k-point cache if it is enabled.
+        """
+        if getattr(self, '_k_cache', None) is None:
+            return compute(k)
+        key = (name, tuple(np.round(np.array(k, dtype=float), self._k_cache_decimals) + 0.))
+        # copy s.t. modifying the result does not change the cached value
+        return np.copy(self._k_cache.get(key, lambda: compute(k)))
+
+    def irreducible_kpoints(self, mesh, *, shift=None):
+        """
+        Returns the k-points and weights of the irreducible part of a regular k-point mesh, using the symmetries of the model. See :func:`.irreducible_kpoints` for a description of the parameters.
+
+        :returns:   A tuple ``(kpoints, weights)``.
+        """
+        return irreducible_kpoints(mesh, self.symmetries, shift=shift)
+
+    def mesh_average(self, func, mesh, *, shift=None, use_symmetries=True):
+        """
+        Computes the average of a function over a regular k-point mesh in the Brillouin zone. If ``use_symmetries`` is set, the function is evaluated only on the irreducible k-points.
+
+        :param func:    Function which is averaged. It takes a k-point as its argument and returns a number or array. The function must be invariant under the symmetries of the model, as is the case e.g. for functions of the eigenvalues.
+        :type func:     collections.abc.Callable
+
+        :param mesh:    Number of k-points in each direction.
+        :type mesh:     list(int)
+
+        :param shift:   Shift of the mesh, in units of the mesh spacing.
+        :type shift:    list(float)
+
+        :param use_symmetries:  Determines whether the symmetries of the model are used to reduce the mesh.
+        :type use_symmetries:   bool
+        """
+        kpoints, weights = irreducible_kpoints(
+            mesh,
+            self.symmetries if use_symmetries else (),
+            shift=shift
+        )
+        return sum(w * np.array(func(k)) for k, w in zip(kpoints, weights))
+
+
+    #-------------------COMPARING MODELS--------------------------------#
+    def fingerprint(self, decimals=10):
+        """
+        Returns a hash of the model's content, which can be used to identify models e.g. when memoizing results. The hash depends on the hopping terms, positions, unit cell and occupation number, but not on whether the model is stored in sparse or dense format.
+
+        :param decimals:    Number of decimals to which the floating point values are rounded before hashing.
+        :type decimals:     int
+
+        :returns:   str
+
+        .. note :: Models which differ only by values close to the rounding precision can have different fingerprints. Use :meth:`allclose` for a tolerance-based comparison.
+        """
+        def _canonical(arr):
+            # adding 0. turns -0. into 0.
+            return np.ascontiguousarray(np.round(arr, decimals) + 0.)
+
+        res = hashlib.sha256()
+        res.update(json.dumps([self.size, self.dim, self.occ]).encode('utf-8'))
+        res.update(_canonical(np.array(self.pos, dtype=float)).tobytes())
+        if self.uc is None:
+            res.update(b'uc=None')
+        else:
+            res.update(_canonical(np.array(self.uc, dtype=float)).tobytes())
+        for R in sorted(self.hop.keys()):
+            mat = self.hop[R]
+            if self._sparse:
+                mat = sp.csr(mat)
+                mat.sum_duplicates()
+                mat.sort_indices()
+                values = _canonical(mat.data.astype(complex))
+                rows = np.repeat(np.arange(self.size), np.diff(mat.indptr))
+                cols = mat.indices
+            else:
+                rows, cols = np.nonzero(_canonical(mat.astype(complex)))
+                values = _canonical(mat[rows, cols].astype(complex))
+            nonzero = values != 0
+            if not np.any(nonzero):
+                continue
+            res.update(np.array(R, dtype=np.int64).tobytes())
+            for arr in [rows[nonzero], cols[nonzero]]:
+                res.update(np.array(arr, dtype=np.int64).tobytes())
+            res.update(values[nonzero].tobytes())
+        return res.hexdigest()
+
+    def allclose(self, other, tol=1e-8):
+        """
+        Checks whether two models are equal up to a given (absolute) tolerance, by comparing their hopping terms, positions, unit cell and occupation number. The sparsity of the models is not taken into account.
+
+        :param other:   Model to compare to.
+        :type other:    Model
+
+        :param tol:     Absolute tolerance for the comparison.
+        :type tol:      float
+
+        :returns:   bool
+        """
+        if not isinstance(other, Model):
+            raise ValueError('Invalid argument type for Model.allclose: {}'.format(type(other)))
+        if (self.size, self.dim, self.occ) != (other.size, other.dim, other.occ):
+            return False
+        if (self.uc is None) != (other.uc is None):
+            return False
+        if self.uc is not None and not np.allclose(self.uc, other.uc, rtol=0, atol=tol):
+            return False
+        if not np.allclose(self.pos, other.pos, rtol=0, atol=tol):
+            return False
+
+        R_array_1, hop_array_1 = self._get_hop_stack()
+        R_array_2, hop_array_2 = other._get_hop_stack()
+        R_array = np.unique(np.concatenate([R_array_1, R_array_2]), axis=0)
+        delta = np.zeros((len(R_array), self.size, self.size), dtype=complex)
+        delta[self._get_R_index(R_array, R_array_1)] += hop_array_1
+        delta[self._get_R_index(R_array, R_array_2)] -= hop_array_2
+        return bool(np.all(np.abs(delta) <= tol))
 
     #-------------------MODIFYING THE MODEL ----------------------------#
+    def freeze(self):
+        """
+        Returns an immutable copy of the model, as a :class:`.FrozenModel`.
+        """
+        from ._frozen_model import FrozenModel
+        return FrozenModel(self)
+
     def add_hop(self, overlap, orbital_1, orbital_2, R):
         r"""
         Adds a hopping term of a given overlap between an orbital in the home unit cell (``orbital_1``) and another orbital (``orbital_2``) located in the unit cell pointed to by ``R``.
@@ -565,18 +1300,9 @@ class Model:
             The positions given in the constructor of :class:`Model` are automatically mapped into the home unit cell. This has to be taken into account when determining ``R``.
 
         """
-        R = tuple(R)
-        mat = np.zeros((self.size, self.size), dtype=complex)
-        nonzero_idx = np.nonzero(R)[0]
-        if len(nonzero_idx) == 0:
-            mat[orbital_1, orbital_2] += overlap / 2.
-            mat[orbital_2, orbital_1] += overlap.conjugate() / 2.
-        elif R[nonzero_idx[0]] > 0:
-            mat[orbital_1, orbital_2] += overlap
-        else:
-            R = tuple(-x for x in R)
-            mat[orbital_2, orbital_1] += overlap.conjugate()
-        self.hop[R] += self._matrix_type(mat)
+        self._check_writable()
+        self._add_hops([overlap], [orbital_1], [orbital_2], [R])
+        self.clear_k_cache()
 
     def add_on_site(self, on_site):
         """
@@ -587,25 +1313,124 @@ class Model:
         """
         if self.size != len(on_site):
             raise ValueError('The number of on-site energy terms should be {}, but is {}.'.format(self.size, len(on_site)))
-        for orbital, energy in enumerate(on_site):
-            self.add_hop(energy / 2., orbital, orbital, self._zero_vec)
+        self._check_writable()
+        orbitals = np.arange(self.size)
+        self._add_hops(
+            np.array(on_site) / 2.,
+            orbitals,
+            orbitals,
+            np.zeros((self.size, self.dim), dtype=int)
+        )
+        self.clear_k_cache()
+
+    def add_hops(self, overlaps, orbital_1, orbital_2, R_array):
+        """
+        Adds multiple hopping terms at once. This is equivalent to calling :meth:`add_hop` for each term, but the terms are grouped by their lattice vector and added to each hopping matrix in a single step.
+
+        :param overlaps:    Strengths of the hopping terms.
+        :type overlaps:     array
+
+        :param orbital_1:   Indices of the first orbitals.
+        :type orbital_1:    array
+
+        :param orbital_2:   Indices of the second orbitals.
+        :type orbital_2:    array
+
+        :param R_array:     Lattice vectors pointing to the unit cells where the second orbitals lie, as an array of shape ``(len(overlaps), dim)``.
+        :type R_array:      array
+
+        .. note :: If the model uses ``sparse='auto'``, the storage format is re-evaluated after the terms are added.
+        """
+        self._check_writable()
+        self._add_hops(overlaps, orbital_1, orbital_2, R_array)
+        nnz_bounds = self.__dict__.get('_derived_data', dict()).get('nnz_bounds', None)
+        self.clear_k_cache()
+        if getattr(self, '_sparse_auto', False):
+            self._update_sparse_auto(nnz_bounds, len(np.atleast_1d(overlaps)))
+
+    def _add_hops(self, overlaps, orbital_1, orbital_2, R_array):
+        """
+        Implementation of :meth:`add_hops`, without clearing the k-point cache.
+        """
+        overlaps = np.array(overlaps, dtype=complex).reshape(-1)
+        orbital_1 = np.array(orbital_1, dtype=int).reshape(-1)
+        orbital_2 = np.array(orbital_2, dtype=int).reshape(-1)
+        R_array = np.array(R_array, dtype=int).reshape(-1, self.dim)
+        num_hop = len(overlaps)
+        if not len(orbital_1) == len(orbital_2) == len(R_array) == num_hop:
+            raise ValueError('Inconsistent number of overlaps ({}), orbitals ({}, {}) and lattice vectors ({}).'.format(num_hop, len(orbital_1), len(orbital_2), len(R_array)))
+        for orbitals in [orbital_1, orbital_2]:
+            if np.any((orbitals < 0) | (orbitals >= self.size)):
+                raise ValueError('Orbital indices must be between 0 and {}.'.format(self.size - 1))
+        if num_hop == 0:
+            return
+
+        # map the terms to the lattice vectors with a positive first non-zero index
+        if self.dim == 0:
+            first_nonzero = np.zeros(num_hop, dtype=int)
+        else:
+            first_nonzero = R_array[np.arange(num_hop), np.argmax(R_array != 0, axis=1)]
+        is_negative = first_nonzero < 0
+        is_zero = first_nonzero == 0
+        R_array = np.where(is_negative[:, None], -R_array, R_array)
+        rows = np.where(is_negative, orbital_2, orbital_1)
+        cols = np.where(is_negative, orbital_1, orbital_2)
+        values = np.where(is_negative, overlaps.conjugate(), overlaps)
+        # the terms for R=0 are split into two halves
+        values[is_zero] /= 2.
+        rows, cols = (
+            np.concatenate([rows, cols[is_zero]]),
+            np.concatenate([cols, rows[is_zero]])
+        )
+        values = np.concatenate([values, values[is_zero].conjugate()])
+        R_array = np.concatenate([R_array, R_array[is_zero]])
+
+        for R, part in self._group_by_R(R_array):
+            if self._sparse:
+                new_mat = sp.csr(
+                    (values[part].astype(self.dtype), (rows[part], cols[part])),
+                    shape=(self.size, self.size)
+                )
+                # new matrices are assigned directly instead of being added to an empty matrix
+                mat = self.hop.get(R)
+                self.hop[R] = new_mat if mat is None else mat + new_mat
+            else:
+                np.add.at(self.hop[R], (rows[part], cols[part]), values[part].astype(self.dtype))
+
+    def _check_writable(self):
+        """Raises an error if the model is read-only, such as the models created by :meth:`from_shared_memory`."""
+        if getattr(self, '_read_only', False):
+            raise ValueError('The model is read-only and cannot be modified.')
 
     def _empty_matrix(self):
         """Returns an empty matrix, either sparse or dense according to the current setting. The size is determined by the system's size"""
-        return self._matrix_type(np.zeros((self.size, self.size), dtype=complex))
+        if self._sparse:
+            # the sparse matrix is created from its shape, s.t. no dense matrix is allocated
+            return sp.csr((self.size, self.size), dtype=self.dtype)
+        return np.zeros((self.size, self.size), dtype=self.dtype)
 
     def set_sparse(self, sparse=True):
         """
         Defines whether sparse or dense matrices should be used to represent the system, and changes the system accordingly if needed.
 
-        :param sparse:  Flag to determine whether the system is set to be sparse (``True``) or dense (``False``).
-        :type sparse:   bool
+        :param sparse:  Flag to determine whether the system is set to be sparse (``True``) or dense (``False``). If ``sparse='auto'``, the sparse format is chosen for systems with at least :attr:`AUTO_SPARSE_MIN_SIZE` orbitals and a fraction of non-zero hopping entries below :attr:`AUTO_SPARSE_MAX_DENSITY`. The choice is re-evaluated when :meth:`set_sparse` is called again with ``'auto'``, and the models created from arithmetic operations inherit the ``'auto'`` setting.
+        :type sparse:   bool or str
         """
+        if sparse == 'auto':
+            self._sparse_auto = True
+            sparse = self._choose_sparse()
+        elif isinstance(sparse, str):
+            raise ValueError("Invalid value '{}' for 'sparse', must be True, False or 'auto'.".format(sparse))
+        else:
+            self._sparse_auto = False
+            sparse = bool(sparse)
+
         # check if the right sparsity is alredy set
         # when using from __init__, self._sparse is not set
         with contextlib.suppress(AttributeError):
             if sparse == self._sparse:
                 return
+        self._check_writable()
 
         self._sparse = sparse
         if sparse:
@@ -617,6 +1442,198 @@ class Model:
         with contextlib.suppress(AttributeError):
             for k, v in self.hop.items():
                 self.hop[k] = self._matrix_type(v)
+        self.clear_k_cache()
+
+    #: Minimum number of orbitals for which ``sparse='auto'`` selects the sparse format.
+    AUTO_SPARSE_MIN_SIZE = 100
+    #: Maximum fraction of non-zero hopping entries for which ``sparse='auto'`` selects the sparse format.
+    AUTO_SPARSE_MAX_DENSITY = 0.1
+
+    def get_density(self):
+        """
+        Returns the fraction of non-zero entries in the hopping matrices.
+
+        :returns:   float
+        """
+        if len(self.hop) == 0:
+            return 0.
+        return self._count_nonzero() / (len(self.hop) * self.size**2)
+
+    def _count_nonzero(self):
+        """
+        Returns the number of non-zero entries in the hopping matrices.
+        """
+        if self._sparse:
+            return sum(mat.count_nonzero() for mat in self.hop.values())
+        return sum(np.count_nonzero(mat) for mat in self.hop.values())
+
+    def sparse_info(self):
+        """
+        Returns a dictionary describing the storage format of the model, containing the keys ``sparse`` (the current format), ``auto`` (whether the format was chosen automatically), ``density`` (fraction of non-zero hopping entries) and ``size``.
+        """
+        return dict(
+            sparse=self._sparse,
+            auto=getattr(self, '_sparse_auto', False),
+            density=self.get_density(),
+            size=self.size
+        )
+
+    def _choose_sparse(self):
+        """
+        Determines the sparsity for ``sparse='auto'``. While the hoppings are not yet set (in the constructor), the sparse format is used because it is safe for large inputs.
+        """
+        if not hasattr(self, 'hop') or not hasattr(self, '_sparse'):
+            return True
+        return bool(
+            self.size >= self.AUTO_SPARSE_MIN_SIZE and
+            self.get_density() < self.AUTO_SPARSE_MAX_DENSITY
+        )
+
+    def _update_sparse_auto(self, nnz_bounds, num_added):
+        """
+        Re-evaluates the storage format for ``sparse='auto'`` after ``num_added`` terms were added by :meth:`add_hops`, given the bounds ``(low, high)`` on the number of non-zero entries before the terms were added. Since each term changes at most two entries, the non-zero entries are counted only if the added terms can change the choice of format. Otherwise, building a model with many calls to :meth:`add_hops` would count the entries of all hopping matrices for each call.
+        """
+        if self.size < self.AUTO_SPARSE_MIN_SIZE or len(self.hop) == 0:
+            self.set_sparse('auto')
+            return
+        max_nnz = self.AUTO_SPARSE_MAX_DENSITY * len(self.hop) * self.size**2
+        if nnz_bounds is not None:
+            low = max(0, nnz_bounds[0] - 2 * num_added)
+            high = nnz_bounds[1] + 2 * num_added
+        if nnz_bounds is None or low < max_nnz <= high:
+            low = high = self._count_nonzero()
+        self.set_sparse(bool(high < max_nnz))
+        self._sparse_auto = True
+        self.__dict__.setdefault('_derived_data', dict())['nnz_bounds'] = (low, high)
+
+    def _get_sparse_setting(self):
+        """
+        Returns the value of the ``sparse`` argument which reproduces the current setting.
+        """
+        if getattr(self, '_sparse_auto', False):
+            return 'auto'
+        return self._sparse
+
+    def _to_arrays(self):
+        """
+        Returns the model as a tuple ``(arrays, metadata)`` of a dictionary of flat (contiguous) arrays containing the hopping terms, and a dictionary of the remaining (small) attributes. Dense hoppings are stored as one stacked array, sparse hoppings as the concatenated CSR arrays.
+        """
+        keys = sorted(self.hop.keys())
+        arrays = dict(R=np.array(keys, dtype=int).reshape(len(keys), self.dim))
+        if self._sparse:
+            matrices = [sp.csr(self.hop[R], dtype=self.dtype) for R in keys]
+            arrays['data'] = np.concatenate([mat.data for mat in matrices] + [np.zeros(0, dtype=self.dtype)])
+            arrays['indices'] = np.concatenate([mat.indices for mat in matrices] + [np.zeros(0, dtype=np.int32)])
+            arrays['indptr'] = np.array([mat.indptr for mat in matrices], dtype=arrays['indices'].dtype).reshape(len(keys), self.size + 1)
+            arrays['offsets'] = np.concatenate([[0], np.cumsum([mat.nnz for mat in matrices], dtype=int)])
+        else:
+            arrays['hop'] = np.array([self.hop[R] for R in keys], dtype=self.dtype).reshape(len(keys), self.size, self.size)
+        if self._k_cache is None:
+            k_cache = None
+        else:
+            k_cache = dict(maxsize=self._k_cache.maxsize, decimals=self._k_cache_decimals)
+        metadata = dict(
+            size=self.size,
+            dim=self.dim,
+            occ=self.occ,
+            pos=self.pos,
+            uc=self.uc,
+            symmetries=self.symmetries,
+            sparse=self._sparse,
+            sparse_auto=getattr(self, '_sparse_auto', False),
+            dtype=self.dtype.name,
+            k_cache=k_cache
+        )
+        return arrays, metadata
+
+    @classmethod
+    def _from_arrays(cls, arrays, metadata):
+        """
+        Creates a model from the output of :meth:`_to_arrays`. The hopping matrices are views of the given arrays.
+        """
+        res = cls(
+            size=metadata['size'],
+            dim=metadata['dim'],
+            occ=metadata['occ'],
+            pos=metadata['pos'],
+            uc=metadata['uc'],
+            symmetries=metadata['symmetries'],
+            sparse=metadata['sparse'],
+            dtype=metadata['dtype']
+        )
+        res._sparse_auto = metadata['sparse_auto']
+        R_list = arrays['R'].tolist()
+        if res._sparse:
+            shape = (res.size, res.size)
+            data, indices, indptr, offsets = arrays['data'], arrays['indices'], arrays['indptr'], arrays['offsets']
+            for i, R in enumerate(R_list):
+                csr_arrays = dict(
+                    data=data[offsets[i]:offsets[i + 1]],
+                    indices=indices[offsets[i]:offsets[i + 1]],
+                    indptr=indptr[i]
+                )
+                mat = sp.csr(
+                    (csr_arrays['data'], csr_arrays['indices'], csr_arrays['indptr']),
+                    shape=shape,
+                    copy=False
+                )
+                # scipy copies views which are much smaller than their base array,
+                # so the views are set again to keep referencing the given buffers
+                for name, arr in csr_arrays.items():
+                    if getattr(mat, name).dtype == arr.dtype:
+                        setattr(mat, name, arr)
+                res.hop[tuple(R)] = mat
+        else:
+            for R, mat in zip(R_list, arrays['hop']):
+                res.hop[tuple(R)] = mat
+        if metadata['k_cache'] is not None:
+            res.set_k_cache(**metadata['k_cache'])
+        return res
+
+    def _get_sparse_scatter(self):
+        """
+        Returns the non-zero entries of the sparse hopping matrices as a tuple ``(R_array, data, idx, nnz)``, containing the lattice vectors, the concatenated values and their (flattened) indices in the Hamilton matrix, and the number of values for each lattice vector. The result is kept until the model is modified.
+        """
+        return self._get_derived('sparse_scatter', self._compute_sparse_scatter)
+
+    def _compute_sparse_scatter(self):
+        """
+        Computes the non-zero entries of the sparse hopping matrices returned by :meth:`_get_sparse_scatter`.
+        """
+        keys = list(self.hop.keys())
+        matrices = [self.hop[R] for R in keys]
+        R_array = np.array(keys, dtype=int).reshape(len(keys), self.dim)
+        nnz = np.array([mat.nnz for mat in matrices], dtype=int)
+        data = np.concatenate([mat.data for mat in matrices] + [np.zeros(0, dtype=complex)])
+        row_offset = np.arange(self.size) * self.size
+        idx = np.concatenate(
+            [np.repeat(row_offset, np.diff(mat.indptr)) + mat.indices for mat in matrices] +
+            [np.zeros(0, dtype=int)]
+        )
+        return R_array, data, idx, nnz
+
+    def _get_hop_stack(self, full=False):
+        """
+        Returns the hopping terms as a tuple ``(R_array, hop_array)`` of the (sorted) lattice vectors and the stacked dense hopping matrices of shape ``(len(R_array), size, size)``.
+
+        If ``full`` is set, the hoppings for -R (the Hermitian conjugates) are included, such that the Hamiltonian is given by :math:`H(k) = \\sum_R H_R e^{2 \\pi i k \\cdot R}`.
+        """
+        keys = sorted(self.hop.keys())
+        hop_array = np.array(
+            [self._array_cast(self.hop[R]) for R in keys],
+            dtype=complex
+        ).reshape(len(keys), self.size, self.size)
+        R_array = np.array(keys, dtype=int).reshape(len(keys), self.dim)
+        if not full:
+            return R_array, hop_array
+
+        hop_array_cc = hop_array.conjugate().transpose(0, 2, 1)
+        is_zero = np.all(R_array == 0, axis=1)
+        hop_array = hop_array + np.where(is_zero[:, None, None], hop_array_cc, 0)
+        R_array = np.concatenate([R_array, -R_array[~is_zero]])
+        hop_array = np.concatenate([hop_array, hop_array_cc[~is_zero]])
+        order = np.lexsort(R_array.T[::-1])
+        return R_array[order], hop_array[order]
 
     # If Python 3.4 support is dropped this could be made more straightforwardly
     # However, for now the default pickle protocol (and thus multiprocessing)
@@ -629,6 +1646,735 @@ class Model:
             return x
 
     #-------------------CREATING DERIVED MODELS-------------------------#
+    #---- symmetrization ----#
+    def symmetrize(self, symmetry_operations, *, full_group=False):
+        """
+        Returns a symmetrized model, by averaging the hopping terms over the images of the model under a group of symmetry operations.
+
+        :param symmetry_operations: Symmetry operations used for the symmetrization.
+        :type symmetry_operations:  list(SymmetryOperation)
+
+        :param full_group:  Specifies whether the given operations form the full symmetry group (``full_group=True``), in which case the model is averaged over exactly these operations. Otherwise, the operations are treated as generators, and the model is averaged over the group they generate.
+        :type full_group:   bool
+
+        .. note :: The representation of an operation must map each orbital onto orbitals whose positions are (up to a lattice vector) the image of the original position under the real-space operation.
+        """
+        symmetry_operations = list(symmetry_operations)
+        for op in symmetry_operations:
+            if not isinstance(op, SymmetryOperation):
+                raise ValueError('Invalid type {} for symmetry operation, must be SymmetryOperation.'.format(type(op)))
+        if len(symmetry_operations) == 0:
+            return copy.deepcopy(self)
+
+        if full_group:
+            group = symmetry_operations
+        else:
+            group = _generate_group(symmetry_operations)
+
+        R_array, hop_array = self._get_hop_stack(full=True)
+        R_array, hop_array = self._average_operations(R_array, hop_array, group)
+
+        # remove the numerical noise breaking hermiticity
+        minus_idx = self._get_R_index(R_array, -R_array)
+        hop_array = 0.5 * (hop_array + hop_array[minus_idx].conjugate().transpose(0, 2, 1))
+
+        return Model(
+            hop={tuple(R): mat for R, mat in zip(R_array, hop_array)},
+            pos=self.pos,
+            occ=self.occ,
+            uc=self.uc,
+            contains_cc=True,
+            sparse=self._get_sparse_setting(),
+            symmetries=self.symmetries + [op for op in symmetry_operations if op not in self.symmetries],
+            dtype=self.dtype
+        )
+
+    def _average_operations(self, R_array, hop_array, symmetry_operations):
+        """
+        Averages the full (stacked) hopping terms over the images under the given symmetry operations. The lattice vectors of all images are determined first, s.t. each image can be added to a running total as soon as it is computed.
+        """
+        mappings = [self._get_operation_mapping(op) for op in symmetry_operations]
+        # the hopping matrices are flattened for each operation, which
+        # requires a contiguous array to avoid copies
+        hop_array = np.ascontiguousarray(hop_array)
+        new_R_array = np.unique(
+            np.concatenate([
+                np.dot(R_array, op.rotation_matrix.T) + shift
+                for op, (_, offset_classes, _) in zip(symmetry_operations, mappings)
+                for shift in (offset_classes[:, None, :] - offset_classes[None, :, :]).reshape(-1, self.dim)
+            ]),
+            axis=0
+        )
+        new_hop_array = np.zeros((len(new_R_array), self.size, self.size), dtype=complex)
+        for op, mapping in zip(symmetry_operations, mappings):
+            self._add_operation_image(new_R_array, new_hop_array, R_array, hop_array, op, mapping)
+        new_hop_array /= len(symmetry_operations)
+        return new_R_array, new_hop_array
+
+    def _get_operation_mapping(self, symmetry_operation):
+        """
+        Determines how a symmetry operation maps the orbitals. Returns the orbital onto which each orbital is mapped, the distinct unit cell offsets of the images, and the indices of the orbitals with each of these offsets.
+        """
+        rot = symmetry_operation.rotation_matrix
+        repr_mat = symmetry_operation.repr_matrix
+        # each orbital is mapped to the orbitals at the position S * pos + t,
+        # which is shifted by a lattice vector w.r.t. the home unit cell.
+        new_pos = np.dot(self.pos, rot.T) + symmetry_operation.translation_vector
+        target = np.argmax(np.abs(repr_mat), axis=0)
+        offset_float = new_pos - self.pos[target]
+        offset = np.array(np.round(offset_float), dtype=int)
+        nonzero_row, nonzero_col = np.nonzero(np.abs(repr_mat) > 1e-8)
+        if not np.allclose(offset_float, offset, atol=1e-6) or not np.allclose(
+            self.pos[nonzero_row], self.pos[target[nonzero_col]], atol=1e-6
+        ):
+            raise ValueError('The representation of the symmetry operation is not consistent with the orbital positions.')
+        offset_classes, class_idx = np.unique(offset, axis=0, return_inverse=True)
+        class_idx = class_idx.reshape(-1)
+        orbitals = [np.nonzero(class_idx == c)[0] for c in range(len(offset_classes))]
+        return target, offset_classes, orbitals
+
+    def _add_operation_image(self, new_R_array, new_hop_array, R_array, hop_array, symmetry_operation, mapping):
+        """
+        Applies a symmetry operation to the full (stacked) hopping terms, and adds the result to the hopping matrices ``new_hop_array`` for the (sorted) lattice vectors ``new_R_array``.
+        """
+        target, offset_classes, orbitals = mapping
+        repr_mat = symmetry_operation.repr_matrix
+        rotated_R = np.dot(R_array, symmetry_operation.rotation_matrix.T)
+        if symmetry_operation.repr_has_cc:
+            hop_array = hop_array.conjugate()
+        if np.count_nonzero(np.abs(repr_mat) > 1e-8) == self.size:
+            # common case: the representation only permutes the orbitals
+            # and multiplies them by a phase
+            phase = repr_mat[target, np.arange(self.size)]
+            inverse = np.argsort(target)
+            # the orbital pairs are permuted with a single gather on the
+            # flattened matrices, which is much faster than indexing each axis
+            pair_idx = (inverse[:, None] * self.size + inverse[None, :]).reshape(-1)
+            pair_phase = np.outer(phase[inverse], phase[inverse].conjugate()).reshape(-1)
+            hop_flat = hop_array.reshape(len(hop_array), -1)
+            if len(orbitals) == 1:
+                image = np.take(hop_flat, pair_idx, axis=1)
+                image *= pair_phase
+                self._add_rows(new_hop_array, self._get_R_index(new_R_array, rotated_R), image.reshape(hop_array.shape))
+                return
+            # the hopping from orbital i to orbital j in unit cell R is
+            # mapped to S * R + offset[j] - offset[i], where the offsets
+            # are given by the class of the image orbitals
+            class_idx = np.empty(self.size, dtype=int)
+            for c, orbitals_c in enumerate(orbitals):
+                class_idx[target[orbitals_c]] = c
+            pair_class = (class_idx[:, None] * len(orbitals) + class_idx[None, :]).reshape(-1)
+            new_hop_flat = new_hop_array.reshape(len(new_hop_array), -1)
+            for c_1 in range(len(orbitals)):
+                for c_2 in range(len(orbitals)):
+                    dest_idx = np.nonzero(pair_class == c_1 * len(orbitals) + c_2)[0]
+                    image = np.take(hop_flat, pair_idx[dest_idx], axis=1)
+                    image *= pair_phase[dest_idx]
+                    new_R = rotated_R + offset_classes[c_2] - offset_classes[c_1]
+                    for i, row in enumerate(self._get_R_index(new_R_array, new_R)):
+                        new_hop_flat[row, dest_idx] += image[i]
+            return
+        for c_1, orbitals_1 in enumerate(orbitals):
+            for c_2, orbitals_2 in enumerate(orbitals):
+                if len(orbitals) == 1:
+                    block = hop_array
+                else:
+                    block = np.take(np.take(hop_array, orbitals_1, axis=1), orbitals_2, axis=2)
+                new_R = rotated_R + offset_classes[c_2] - offset_classes[c_1]
+                self._add_rows(new_hop_array, self._get_R_index(new_R_array, new_R), np.matmul(
+                    np.matmul(repr_mat[:, orbitals_1], block),
+                    repr_mat[:, orbitals_2].conjugate().T
+                ))
+
+    @staticmethod
+    def _add_rows(array, row_idx, values):
+        """
+        Adds ``values`` to the rows ``row_idx`` of ``array`` in-place. Adding the rows one by one is faster than a fancy-indexed addition, which copies the selected rows twice.
+        """
+        for i, row in enumerate(row_idx):
+            array[row] += values[i]
+
+    @staticmethod
+    def _group_by_R(R_array):
+        """
+        Groups the rows of an array of lattice vectors. Returns a list of tuples ``(R, indices)``, where ``R`` is the lattice vector (as a tuple) and ``indices`` the indices of the rows equal to it.
+        """
+        num_R, dim = R_array.shape
+        if num_R == 0:
+            return []
+        if dim == 0:
+            return [((), np.arange(num_R))]
+        # map each lattice vector to a single integer, which is much faster
+        # to sort than the rows of the array
+        R_min = R_array.min(axis=0)
+        extent = R_array.max(axis=0) - R_min + 1
+        if np.prod(extent.astype(float)) < 2**62:
+            keys = np.ravel_multi_index((R_array - R_min).T, extent)
+            unique_keys, R_idx = np.unique(keys, return_inverse=True)
+            R_unique = np.array(np.unravel_index(unique_keys, extent)).T + R_min
+        else:
+            R_unique, R_idx = np.unique(R_array, axis=0, return_inverse=True)
+        R_idx = R_idx.reshape(-1)
+        order = np.argsort(R_idx, kind='stable')
+        bounds = np.searchsorted(R_idx[order], np.arange(len(R_unique) + 1))
+        return [
+            (tuple(R), order[bounds[i]:bounds[i + 1]])
+            for i, R in enumerate(R_unique.tolist())
+        ]
+
+    @staticmethod
+    def _get_R_index(R_array_sorted, R_array):
+        """
+        Returns the indices of the lattice vectors ``R_array`` in the (lexicographically sorted, unique) array ``R_array_sorted``.
+        """
+        _, idx = np.unique(
+            np.concatenate([R_array_sorted, R_array]),
+            axis=0,
+            return_inverse=True
+        )
+        idx = idx.reshape(-1)
+        # the unique array is R_array_sorted itself, because it contains all R
+        return idx[len(R_array_sorted):]
+
+    #---- finite clusters ----#
+    def finite_cluster(self, shape_fn, bounding_box, *, return_positions=False, return_matrix=False):
+        """
+        Creates a finite cluster (e.g. a flake, quantum dot or nanowire segment) cut out of the periodic model. The orbitals of all unit cells within the bounding box are selected by the shape function, and all hoppings between selected orbitals are kept. The result is a zero-dimensional model in sparse format. Since only half of the zero term is stored in the hopping matrix for ``R=()``, the Hamiltonian of the cluster is the sum of this matrix and its hermitian conjugate. For large clusters, the Hamiltonian should be obtained as a sparse matrix by setting ``return_matrix``, since :meth:`.hamilton` returns a dense matrix.
+
+        :param shape_fn:    Function which determines whether an orbital belongs to the cluster. It is called once with an array of shape ``(N, dim)`` containing the positions of all orbitals in the bounding box, and must return a boolean array of length ``N``. The positions are given in cartesian coordinates if the unit cell of the model is set, and in reduced coordinates otherwise.
+        :type shape_fn:     collections.abc.Callable
+
+        :param bounding_box:    Range of unit cells which are considered, given as a list of ``(start, stop)`` tuples for each lattice direction. The unit cells :math:`R` with ``start <= R_i < stop`` are included.
+        :type bounding_box:     list
+
+        :param return_positions:    If set, the positions of the cluster orbitals (in the coordinates passed to ``shape_fn``) are returned in addition to the model.
+        :type return_positions:     bool
+
+        :param return_matrix:   If set, the (hermitian) Hamiltonian of the cluster is returned in addition to the model, as a :class:`scipy.sparse.csr_matrix`.
+        :type return_matrix:    bool
+
+        :returns:   :class:`.Model`, or a tuple ``(model, positions, matrix)`` which contains the positions and the Hamiltonian only if ``return_positions`` and ``return_matrix`` are set, respectively.
+        """
+        bounding_box = np.array(bounding_box, dtype=int)
+        if bounding_box.shape != (self.dim, 2):
+            raise ValueError('The bounding box must contain a (start, stop) range for each of the {} lattice directions, but has shape {}.'.format(self.dim, bounding_box.shape))
+        start = bounding_box[:, 0]
+        box_shape = bounding_box[:, 1] - start
+        if np.any(box_shape <= 0):
+            raise ValueError('The bounding box {} is empty.'.format(bounding_box.tolist()))
+        import scipy.sparse
+
+        # ---- SELECT THE ORBITALS ----
+        cells = np.indices(box_shape).reshape(self.dim, -1).T + start
+        positions = (cells[:, None, :] + self.pos[None, :, :]).reshape(-1, self.dim)
+        if self.uc is not None:
+            positions = np.dot(positions, self.uc)
+        mask = np.array(shape_fn(positions), dtype=bool).reshape(-1)
+        if mask.shape != (len(positions),):
+            raise ValueError('The shape function must return one value for each of the {} positions, but returned {}.'.format(len(positions), len(mask)))
+        num_orbitals = int(np.count_nonzero(mask))
+        new_index = np.full(len(positions), -1, dtype=int)
+        new_index[mask] = np.arange(num_orbitals)
+
+        # ---- ASSEMBLE THE HOPPINGS ----
+        # the hopping from orbital i in cell c to orbital j in cell c + R
+        # connects the orbitals c * size + i and (c + R) * size + j
+        rows, cols, data = [], [], []
+        cell_idx = np.arange(len(cells))
+        for R, mat in self.hop.items():
+            mat = scipy.sparse.coo_matrix(mat)
+            target = cells + np.array(R, dtype=int) - start
+            valid = np.all((target >= 0) & (target < box_shape), axis=1)
+            source_cells = cell_idx[valid]
+            target_cells = np.ravel_multi_index(target[valid].T, box_shape) if len(source_cells) else source_cells
+            source = new_index[(source_cells[:, None] * self.size + mat.row[None, :]).reshape(-1)]
+            dest = new_index[(target_cells[:, None] * self.size + mat.col[None, :]).reshape(-1)]
+            keep = (source >= 0) & (dest >= 0)
+            rows.append(source[keep])
+            cols.append(dest[keep])
+            data.append(np.tile(mat.data, len(source_cells))[keep])
+        hop_mat = scipy.sparse.coo_matrix(
+            (
+                np.concatenate(data + [np.zeros(0, dtype=self.dtype)]).astype(self.dtype),
+                (np.concatenate(rows + [np.zeros(0, dtype=int)]), np.concatenate(cols + [np.zeros(0, dtype=int)]))
+            ),
+            shape=(num_orbitals, num_orbitals)
+        ).tocsr()
+
+        # the assembled hoppings contain half of the on-site terms, s.t.
+        # adding the hermitian conjugate gives the full Hamiltonian
+        ham = sp.csr(hop_mat + hop_mat.conjugate().transpose())
+        res = Model(size=num_orbitals, dim=0, sparse=True, dtype=self.dtype)
+        # the stored zero term is half of the Hamiltonian
+        res.hop[res._zero_vec] = sp.csr(0.5 * ham)
+        if not (return_positions or return_matrix):
+            return res
+        output = [res]
+        if return_positions:
+            output.append(positions[mask])
+        if return_matrix:
+            output.append(ham)
+        return tuple(output)
+
+    #---- orbital subspaces ----#
+    def slice_orbitals(self, orbitals, *, occ=None):
+        """
+        Returns a model containing only the selected orbitals, and the hoppings between them. The hopping matrices are sliced all at once for dense models, and by selecting the rows and columns of each matrix for sparse models.
+
+        :param orbitals:    Indices of the orbitals which are kept, in the order in which they appear in the new model.
+        :type orbitals:     list(int)
+
+        :param occ:     Occupation number of the new model. Since the occupation of the selected orbitals is not known in general, it is not set by default.
+        :type occ:      int
+
+        .. note :: The symmetries of the model are not kept, since the subspace is in general not invariant under them.
+        """
+        orbitals = self._check_orbitals(orbitals)
+        res = self._empty_subspace_model(orbitals, occ=occ)
+        if self._sparse:
+            for R, mat in self.hop.items():
+                res.hop[R] = sp.csr(mat[orbitals][:, orbitals])
+        else:
+            R_array, hop_array = self._get_hop_stack()
+            sliced = hop_array[:, orbitals[:, None], orbitals].astype(self.dtype)
+            for R, mat in zip(R_array.tolist(), sliced):
+                res.hop[tuple(R)] = mat
+        if getattr(self, '_sparse_auto', False):
+            res.set_sparse('auto')
+        return res
+
+    def downfold(self, orbitals, mesh, *, energy=0., occ=None, h_cutoff=0., num_threads=None):
+        r"""
+        Returns an effective model for the selected orbitals, where the remaining orbitals are folded out by energy-independent Löwdin partitioning. With :math:`A` the selected and :math:`B` the remaining orbitals, the effective Hamiltonian is given by
+
+        .. math ::
+
+            H_\text{eff}(k) = H_{AA}(k) + H_{AB}(k) \left(E - H_{BB}(k)\right)^{-1} H_{BA}(k)
+
+        where :math:`E` is the reference energy. This is a good approximation for the bands close to :math:`E` if the energies of the :math:`B` orbitals are far from it. The effective Hamiltonian is evaluated on a regular k-point mesh (in blocks, as in :meth:`hamilton_batch`), and transformed back to real space with a fast Fourier transform. The resulting hoppings are exact at the k-points of the mesh. Since the hoppings of the effective model decay with distance, but are not strictly short-ranged, the mesh should be larger than the range of the hoppings which are needed.
+
+        :param orbitals:    Indices of the orbitals which are kept, in the order in which they appear in the new model.
+        :type orbitals:     list(int)
+
+        :param mesh:    Number of k-points in each direction. This determines the lattice vectors of the effective model, which are contained in the range ``-mesh // 2 <= R_i <= mesh // 2``.
+        :type mesh:     list(int)
+
+        :param energy:  Reference energy :math:`E`, which must not be an eigenvalue of :math:`H_{BB}(k)`.
+        :type energy:   float
+
+        :param occ:     Occupation number of the new model, which is not set by default.
+        :type occ:      int
+
+        :param h_cutoff:    Hopping matrices for which the absolute value of all entries is below this cutoff are dropped (except for the on-site terms).
+        :type h_cutoff:     float
+
+        :param num_threads: Number of threads. Defaults to the value set by :func:`tbmodels.parallel.set_num_threads`.
+        :type num_threads:  int
+
+        .. note :: The symmetries of the model are not kept.
+        """
+        orbitals = self._check_orbitals(orbitals)
+        mesh = self._check_mesh(mesh)
+        folded = np.setdiff1d(np.arange(self.size), orbitals)
+        if len(folded) == 0:
+            return self.slice_orbitals(orbitals, occ=occ)
+
+        # ---- EFFECTIVE HAMILTONIAN ON THE MESH ----
+        num_k = int(np.prod(mesh))
+        kpoints = self._mesh_kpoints(mesh, np.arange(num_k))
+        size = len(orbitals)
+        H_eff = np.empty((num_k, size, size), dtype=complex)
+        identity = np.eye(len(folded))
+        batch_operator = self._get_batch_operator()
+
+        def evaluate(block):
+            H = self._hamilton_block(kpoints[block], batch_operator)
+            H_AB = H[:, orbitals[:, None], folded]
+            H_BB = H[:, folded[:, None], folded]
+            H_BA = H[:, folded[:, None], orbitals]
+            H_eff[block] = H[:, orbitals[:, None], orbitals] + np.matmul(
+                H_AB, np.linalg.solve(energy * identity - H_BB, H_BA)
+            )
+        self._map_blocks(evaluate, num_k, num_threads)
+
+        # ---- TRANSFORM TO REAL SPACE ----
+        # H(k) = sum_R H_R exp(2 pi i k.R), which is inverted by a FFT on the mesh
+        H_R = H_eff.reshape(tuple(mesh) + (size, size))
+        if self.dim > 0:
+            H_R = np.fft.fftn(H_R, axes=tuple(range(self.dim))) / num_k
+        # for even meshes, the terms at R_i = +- mesh_i / 2 are equivalent and split equally
+        R_max = mesh // 2
+        num_R = int(np.prod(2 * R_max + 1))
+        R_array = (np.indices(2 * R_max + 1).reshape(self.dim, num_R).T - R_max).reshape(num_R, self.dim)
+        weights = np.prod(np.where((mesh % 2 == 0) & (np.abs(R_array) == R_max), 0.5, 1.), axis=1)
+        hop = dict()
+        for R, weight in zip(R_array, weights):
+            # enforce hoppings[-R] = hoppings[R].H, which holds only up to rounding errors
+            mat = 0.5 * weight * (H_R[tuple(R % mesh)] + H_R[tuple(-R % mesh)].conjugate().T)
+            if np.any(R != 0) and np.max(np.abs(mat)) < h_cutoff:
+                continue
+            hop[tuple(R.tolist())] = mat
+
+        return Model(
+            hop=hop,
+            pos=self.pos[orbitals],
+            occ=occ,
+            uc=self.uc,
+            contains_cc=True,
+            sparse=self._get_sparse_setting(),
+            dtype=self.dtype
+        )
+
+    def _check_orbitals(self, orbitals):
+        """
+        Converts a list of orbital indices to an integer array, and checks that the indices are valid and unique.
+        """
+        orbitals = np.array(orbitals, dtype=int).reshape(-1)
+        if np.any(orbitals < 0) or np.any(orbitals >= self.size):
+            raise ValueError('Invalid orbital indices {}, the model has {} orbitals.'.format(orbitals.tolist(), self.size))
+        if len(np.unique(orbitals)) != len(orbitals):
+            raise ValueError('The orbital indices {} are not unique.'.format(orbitals.tolist()))
+        return orbitals
+
+    def _empty_subspace_model(self, orbitals, *, occ):
+        """
+        Creates an empty model for the given orbitals, with the same unit cell and storage format.
+        """
+        return Model(
+            size=len(orbitals),
+            dim=self.dim,
+            pos=self.pos[orbitals],
+            occ=occ,
+            uc=self.uc,
+            sparse=self._sparse,
+            dtype=self.dtype
+        )
+
+    #---- tensor products ----#
+    def kron(self, other, *, occ=None):
+        """
+        Returns the tensor product of the model with a matrix or another model. For a (Hermitian) matrix :math:`M`, the hopping matrices of the new model are :math:`H_R \\otimes M`. For another model, the Hamiltonian of the new model is :math:`H(k) = H_1(k) \\otimes H_2(k)`, where the hoppings are given by the products of the hopping matrices whose lattice vectors add up to :math:`R`.
+
+        The orbital ``i * n + j`` of the new model corresponds to orbital ``i`` of this model and orbital (or matrix index) ``j`` of the other factor, where ``n`` is the size of the other factor. The positions of the orbitals are taken from this model, i.e. the other factor describes an internal degree of freedom such as spin. The storage format (sparse or dense) of this model is kept, and sparse hoppings are multiplied without creating dense matrices.
+
+        :param other:   Matrix or model with which the tensor product is formed. A model must have the same dimension as this model.
+        :type other:    array or Model
+
+        :param occ:     Occupation number of the new model, which is not set by default.
+        :type occ:      int
+
+        .. note :: The symmetries of the model are not kept.
+        """
+        import scipy.sparse
+
+        if isinstance(other, Model):
+            if other.dim != self.dim:
+                raise ValueError('The dimensions of the models ({}, {}) do not match.'.format(self.dim, other.dim))
+            other_size = other.size
+            other_hop = other._get_full_hop()
+        else:
+            if scipy.sparse.issparse(other):
+                other = sp.csr(other)
+            else:
+                other = np.array(other)
+            other_size = other.shape[0]
+            if other.shape != (other_size, other_size):
+                raise ValueError('The matrix must be square, but has shape {}.'.format(other.shape))
+            if abs(other - other.conjugate().transpose()).max() > 1e-12:
+                raise ValueError('The matrix must be hermitian.')
+            other_hop = {self._zero_vec: other}
+
+        if self._sparse:
+            def product(mat1, mat2):
+                return scipy.sparse.kron(mat1, mat2, format='csr')
+        else:
+            def product(mat1, mat2):
+                if scipy.sparse.issparse(mat2):
+                    mat2 = mat2.toarray()
+                return np.kron(mat1, mat2)
+
+        # the hoppings are computed only for positive R, and the zero term is halved
+        new_hop = dict()
+        for R1, mat1 in self._get_full_hop().items():
+            for R2, mat2 in other_hop.items():
+                R = tuple(x1 + x2 for x1, x2 in zip(R1, R2))
+                if not self._is_positive_R(R):
+                    continue
+                mat = product(mat1, mat2)
+                if R in new_hop:
+                    new_hop[R] = new_hop[R] + mat
+                else:
+                    new_hop[R] = mat
+
+        res = Model(
+            size=self.size * other_size,
+            dim=self.dim,
+            pos=np.repeat(self.pos, other_size, axis=0),
+            occ=occ,
+            uc=self.uc,
+            sparse=self._sparse,
+            dtype=self.dtype
+        )
+        for R, mat in new_hop.items():
+            if R == self._zero_vec:
+                mat = 0.5 * mat
+            res.hop[R] = res._matrix_type(mat, dtype=self.dtype)
+        if getattr(self, '_sparse_auto', False):
+            res.set_sparse('auto')
+        return res
+
+    def add_spin(self):
+        """
+        Returns the spinful version of the model, where each orbital is replaced by a spin-up and a spin-down orbital at the same position, with spin-independent hoppings. This is the tensor product (see :meth:`kron`) with the 2x2 identity matrix, s.t. the orbital ``2 * i`` (``2 * i + 1``) is the spin-up (spin-down) component of orbital ``i``. The occupation number is doubled.
+        """
+        return self.kron(np.eye(2), occ=None if self.occ is None else 2 * self.occ)
+
+    def _get_full_hop(self):
+        """
+        Returns the hopping matrices including the terms for -R, s.t. the Hamiltonian is given by :math:`H(k) = \\sum_R H_R e^{2 \\pi i k \\cdot R}`.
+        """
+        res = dict()
+        for R, mat in self.hop.items():
+            mat_cc = mat.conjugate().transpose()
+            if R == self._zero_vec:
+                res[R] = mat + mat_cc
+            else:
+                res[R] = mat
+                res[tuple(-x for x in R)] = mat_cc
+        return res
+
+    @staticmethod
+    def _is_positive_R(R):
+        """
+        Checks whether the first non-zero index of a lattice vector is positive, or the lattice vector is zero.
+        """
+        for x in R:
+            if x != 0:
+                return x > 0
+        return True
+
+    #---- magnetic fields ----#
+    def with_magnetic_field(self, flux, *, gauge='landau', axes=(0, 1), supercell_size=None, max_denominator=1000):
+        """
+        Returns the model in a homogeneous magnetic field, which is included through Peierls phases on the hoppings. The field is perpendicular to the plane spanned by the two lattice vectors given by ``axes``, and is specified by its flux through the unit cell. For a field :math:`B` (in Tesla) and a unit cell given in Angstrom, the flux is :math:`B \\cdot (a_1 \\times a_2) / \\Phi_0`, with :math:`\\Phi_0 = h / e = 413566.77\\,\\text{T}\\,\\text{Å}^2`.
+
+        For a flux :math:`p / q`, the magnetic supercell contains :math:`q` unit cells along the first of the two lattice vectors. The Peierls phases are computed for straight hoppings between the orbital positions, in the Landau gauge where the vector potential points along the second lattice vector. An additional phase on the orbitals of each supercell makes the Hamiltonian periodic for arbitrary orbital positions.
+
+        The supercell hoppings and their phases per unit flux are cached, s.t. sweeping the flux with a fixed ``supercell_size`` only rescales the phases.
+
+        :param flux:    Magnetic flux through the unit cell, in units of the flux quantum :math:`h / e`. Floats are converted to the closest fraction with a denominator of at most ``max_denominator``.
+        :type flux:     float or fractions.Fraction
+
+        :param gauge:   Gauge of the vector potential. Currently, only the Landau gauge (``'landau'``) is implemented.
+        :type gauge:    str
+
+        :param axes:    Indices of the two lattice vectors spanning the plane perpendicular to the field.
+        :type axes:     tuple(int)
+
+        :param supercell_size:  Number of unit cells in the magnetic supercell, which must be a multiple of the denominator of the flux. By default, the smallest possible supercell is used.
+        :type supercell_size:   int
+
+        :param max_denominator: Largest denominator used to represent the flux as a fraction.
+        :type max_denominator:  int
+
+        .. note :: The symmetries of the model are not kept, and the occupation number is multiplied by the size of the supercell.
+        """
+        if gauge != 'landau':
+            raise ValueError("Invalid gauge '{}', only 'landau' is implemented.".format(gauge))
+        axes = tuple(int(x) for x in axes)
+        if self.dim < 2:
+            raise ValueError('A magnetic field can be applied only to models with at least two dimensions, but the model has dimension {}.'.format(self.dim))
+        if len(axes) != 2 or axes[0] == axes[1] or not all(0 <= x < self.dim for x in axes):
+            raise ValueError('Invalid axes {}, must be two different lattice directions between 0 and {}.'.format(axes, self.dim - 1))
+        if not isinstance(flux, fractions.Fraction):
+            fraction = fractions.Fraction(flux).limit_denominator(max_denominator)
+            if abs(float(fraction) - flux) > 1e-10:
+                raise ValueError('The flux {} cannot be represented as a fraction with a denominator of at most {}.'.format(flux, max_denominator))
+            flux = fraction
+        if supercell_size is None:
+            supercell_size = flux.denominator
+        elif supercell_size < 1 or supercell_size % flux.denominator != 0:
+            raise ValueError('The supercell size {} is not a multiple of the denominator of the flux {}.'.format(supercell_size, flux))
+
+        R_array, orbital_1, orbital_2, values, phases = self._get_derived(
+            ('peierls', supercell_size, axes),
+            lambda: self._get_peierls_terms(supercell_size, axes)
+        )
+
+        new_pos = np.tile(np.array(self.pos, dtype=float), (supercell_size, 1))
+        new_pos[:, axes[0]] = (new_pos[:, axes[0]] + np.repeat(np.arange(supercell_size), self.size)) / supercell_size
+        if self.uc is None:
+            new_uc = None
+        else:
+            new_uc = np.array(self.uc)
+            new_uc[axes[0]] *= supercell_size
+        res = Model(
+            size=supercell_size * self.size,
+            dim=self.dim,
+            pos=new_pos,
+            occ=None if self.occ is None else supercell_size * self.occ,
+            uc=new_uc,
+            sparse=self._sparse,
+            dtype=self.dtype
+        )
+        res._add_hops(values * np.exp(1j * float(flux) * phases), orbital_1, orbital_2, R_array)
+        if getattr(self, '_sparse_auto', False):
+            res.set_sparse('auto')
+        return res
+
+    def _get_peierls_terms(self, supercell_size, axes):
+        """
+        Returns the hopping terms of the magnetic supercell as a tuple ``(R_array, orbital_1, orbital_2, values, phases)``, where ``phases`` are the Peierls phases for a flux of one flux quantum per unit cell.
+        """
+        R_terms, orbital_1, orbital_2, values = self._get_hop_terms()
+        ax_1, ax_2 = axes
+        cells = np.arange(supercell_size)[:, None]
+        # the hopping goes from cell c within the supercell to cell c + R
+        target = cells + R_terms[:, ax_1]
+        new_R = np.repeat(R_terms[None, :, :], supercell_size, axis=0)
+        new_R[:, :, ax_1] = target // supercell_size
+
+        # reduced coordinates of the start and end points of the hoppings
+        start_1 = self.pos[orbital_1, ax_1] + cells
+        end_1 = self.pos[orbital_2, ax_1] + target
+        start_2 = self.pos[orbital_1, ax_2]
+        end_2 = self.pos[orbital_2, ax_2] + R_terms[:, ax_2]
+        # Landau gauge A = (0, x_1), and a gauge transformation for the orbitals in
+        # supercell n which compensates the change of the phases under translations
+        phases = 2 * np.pi * (
+            0.5 * (start_1 + end_1) * (end_2 - start_2) -
+            supercell_size * new_R[:, :, ax_1] * end_2
+        )
+        return (
+            new_R.reshape(-1, self.dim),
+            (cells * self.size + orbital_1).reshape(-1),
+            ((target % supercell_size) * self.size + orbital_2).reshape(-1),
+            np.tile(values, supercell_size),
+            phases.reshape(-1)
+        )
+
+    def _get_hop_terms(self):
+        """
+        Returns the non-zero hopping terms as a tuple ``(R_array, orbital_1, orbital_2, values)``, with one entry (and one row of ``R_array``) for each term.
+        """
+        if self._sparse:
+            R_array, data, idx, nnz = self._get_sparse_scatter()
+            orbital_1, orbital_2 = np.divmod(idx, self.size)
+            return np.repeat(R_array, nnz, axis=0), orbital_1, orbital_2, data
+        R_array, hop_array = self._get_hop_stack()
+        R_idx, orbital_1, orbital_2 = np.nonzero(hop_array)
+        return R_array[R_idx], orbital_1, orbital_2, hop_array[R_idx, orbital_1, orbital_2]
+
+    #---- compression ----#
+    def compress(self, *, abs_tol=0., max_distance=None, rel_band_error=None, mesh=None, return_error=False, num_threads=None):
+        """
+        Returns a model where small and long-range hopping terms are removed, which speeds up the evaluation of the Hamiltonian. This is useful in particular for models created from Wannier90 output, which often contain many lattice vectors with negligible hoppings. Hopping matrices which do not contain any remaining terms are dropped.
+
+        The band error is the largest deviation of the eigenvalues from the eigenvalues of the original model, on a regular k-point mesh.
+
+        :param abs_tol: Hopping terms whose absolute value is smaller than or equal to ``abs_tol`` are removed.
+        :type abs_tol:  float
+
+        :param max_distance:    Hopping terms connecting orbitals which are further apart than ``max_distance`` are removed. The distance is computed in cartesian coordinates if the unit cell of the model is set, and in reduced coordinates otherwise.
+        :type max_distance:     float
+
+        :param rel_band_error:  If set, entire hopping matrices are removed in addition, starting with the one containing the smallest terms, as long as the band error stays below ``rel_band_error`` times the total band width. The number of removed matrices is determined by bisection. The hopping matrix for ``R=0`` is always kept.
+        :type rel_band_error:   float
+
+        :param mesh:    Number of k-points in each direction of the mesh used to compute the band error. Defaults to 8 k-points in each direction.
+        :type mesh:     list(int)
+
+        :param return_error:    If set, the band error of the resulting model is returned in addition to the model.
+        :type return_error:     bool
+
+        :param num_threads: Number of threads used for computing the eigenvalues, as in :meth:`eigenval_batch`.
+        :type num_threads:  int
+
+        :returns:   :class:`.Model`, or a tuple ``(model, band_error)`` if ``return_error`` is set.
+
+        .. note :: The symmetries of the model are kept, even though removing terms close to the tolerance can break them slightly. They can be restored with :meth:`symmetrize`.
+        """
+        if abs_tol < 0:
+            raise ValueError('The tolerance abs_tol must be non-negative, but is {}.'.format(abs_tol))
+        if max_distance is not None and max_distance < 0:
+            raise ValueError('The distance max_distance must be non-negative, but is {}.'.format(max_distance))
+        if rel_band_error is not None and rel_band_error < 0:
+            raise ValueError('The relative band error rel_band_error must be non-negative, but is {}.'.format(rel_band_error))
+
+        # ---- REMOVE SINGLE TERMS ----
+        R_terms, orbital_1, orbital_2, values = self._get_hop_terms()
+        is_zero = ~np.any(R_terms != 0, axis=1)
+        # the matrix for R=0 is stored as half of the hermitian on-site matrix
+        magnitude = np.abs(values) * np.where(is_zero, 2., 1.)
+        keep = magnitude > abs_tol
+        if max_distance is not None:
+            vectors = self.pos[orbital_2] + R_terms - self.pos[orbital_1]
+            if self.uc is not None:
+                vectors = np.dot(vectors, self.uc)
+            keep &= np.linalg.norm(vectors, axis=1) <= max_distance
+        R_terms, orbital_1, orbital_2, values = R_terms[keep], orbital_1[keep], orbital_2[keep], values[keep]
+
+        def create_model(selected=slice(None)):
+            res = Model(
+                size=self.size,
+                dim=self.dim,
+                pos=self.pos,
+                occ=self.occ,
+                uc=self.uc,
+                symmetries=self.symmetries,
+                sparse=self._sparse,
+                dtype=self.dtype
+            )
+            res._add_hops(values[selected], orbital_1[selected], orbital_2[selected], R_terms[selected])
+            if getattr(self, '_sparse_auto', False):
+                res.set_sparse('auto')
+            return res
+
+        if rel_band_error is None and not return_error:
+            return create_model()
+
+        mesh = self._check_mesh((8, ) * self.dim if mesh is None else mesh)
+        kpoints = self._mesh_kpoints(mesh, np.arange(int(np.prod(mesh))))
+        reference = self.eigenval_batch(kpoints, num_threads=num_threads)
+
+        def band_error(model):
+            return float(np.max(
+                np.abs(model.eigenval_batch(kpoints, num_threads=num_threads) - reference),
+                initial=0.
+            ))
+
+        # ---- REMOVE ENTIRE HOPPING MATRICES ----
+        selected = slice(None)
+        if rel_band_error is not None and len(values):
+            tolerance = rel_band_error * (np.max(reference, initial=0.) - np.min(reference, initial=0.))
+            R_unique, R_idx = np.unique(R_terms, axis=0, return_inverse=True)
+            R_idx = R_idx.reshape(-1)
+            block_magnitude = np.zeros(len(R_unique))
+            np.maximum.at(block_magnitude, R_idx, magnitude[keep])
+            candidates = [
+                i for i in np.argsort(block_magnitude, kind='stable')
+                if np.any(R_unique[i] != 0)
+            ]
+
+            def without_blocks(num_removed):
+                return ~np.isin(R_idx, candidates[:num_removed])
+
+            # bisection for the largest number of removed matrices, assuming
+            # that the error increases with the number of removed matrices
+            lower, upper = 0, len(candidates)
+            while lower < upper:
+                num_removed = (lower + upper + 1) // 2
+                if band_error(create_model(without_blocks(num_removed))) <= tolerance:
+                    lower = num_removed
+                else:
+                    upper = num_removed - 1
+            selected = without_blocks(lower)
+
+        res = create_model(selected)
+        if return_error:
+            return res, band_error(res)
+        return res
+
     #---- arithmetic operations ----#
     def __add__(self, model):
         """
@@ -677,9 +2423,12 @@ class Model:
             raise ValueError('Error when adding Models: positions don\'t match.\nModel 1:\n{0.pos}\n\nModel 2:\n{1.pos}'.format(self, model))
 
         # ---- MAIN PART ----
-        new_hop = copy.deepcopy(self.hop)
+        # copying the defaultdict would also copy the model through its default factory
+        new_hop = co.defaultdict(self._empty_matrix, copy.deepcopy(dict(self.hop)))
         for R, hop_mat in model.hop.items():
             new_hop[R] += hop_mat
+        # only the symmetries common to both models are kept
+        new_symmetries = [op for op in self.symmetries if op in model.symmetries]
         # -------------------
         return Model(
             hop=new_hop,
@@ -687,7 +2436,9 @@ class Model:
             occ=self.occ,
             uc=self.uc,
             contains_cc=False,
-            sparse=self._sparse
+            sparse=self._get_sparse_setting(),
+            symmetries=new_symmetries,
+            dtype=self.dtype
         )
 
     def __sub__(self, model):
@@ -717,7 +2468,9 @@ class Model:
             occ=self.occ,
             uc=self.uc,
             contains_cc=False,
-            sparse=self._sparse
+            sparse=self._get_sparse_setting(),
+            symmetries=self.symmetries,
+            dtype=self.dtype
         )
 
     def __rmul__(self, x):
@@ -731,3 +2484,43 @@ class Model:
         Divides hopping terms by x.
         """
         return self * (1. / x)
+
+monitoring.register(Model, [
+    '__init__',
+    'from_hop_list',
+    'from_hr',
+    'from_hr_file',
+    'from_json',
+    'from_json_file',
+    'from_msgpack',
+    'from_msgpack_file',
+    'from_hdf5',
+    'from_hdf5_file',
+    'from_shared_memory',
+    'to_hr',
+    'to_hr_file',
+    'to_json',
+    'to_json_file',
+    'to_msgpack',
+    'to_msgpack_file',
+    'to_hdf5',
+    'to_hdf5_file',
+    'to_shared_memory',
+    'hamilton',
+    'eigenval',
+    'hamilton_batch',
+    'eigenval_batch',
+    'eigenval_batch_to_hdf5',
+    'eigenval_mesh_to_file',
+    'add_hop',
+    'add_hops',
+    'add_on_site',
+    'symmetrize',
+    'finite_cluster',
+    'slice_orbitals',
+    'downfold',
+    'kron',
+    'add_spin',
+    'with_magnetic_field',
+    'compress',
+])
@@ -6,9 +6,10 @@
 # File:    helpers.py
 
 """
-This module contains a helper function to create a list of hoppings from a given matrix (:meth:`matrix_to_hop`), and functions for encoding / decoding to JSON - compatible datastructures (:meth:`encode`, :meth:`decode`).
+This module contains helper functions to create lists or arrays of hoppings from a given matrix (:meth:`matrix_to_hop`, :meth:`matrix_to_hop_array`) or from column arrays (:meth:`hop_array`), functions for encoding / decoding to JSON - compatible datastructures (:meth:`encode`, :meth:`decode`), and the hooks for storing arrays as msgpack extension types (:meth:`msgpack_default`, :meth:`msgpack_ext_hook`).
 """
 
+import struct
 import numbers
 import contextlib
 from functools import singledispatch
@@ -20,6 +21,7 @@ from fsc.export import export
 from ._ptools import sparse_matrix as sp
 
 from ._tb_model import Model
+from ._symmetry import SymmetryOperation
 
 @export
 def matrix_to_hop(mat, orbitals=None, R=(0, 0, 0), multiplier=1.):
@@ -36,6 +38,8 @@ def matrix_to_hop(mat, orbitals=None, R=(0, 0, 0), multiplier=1.):
 
     :param multiplier:  Multiplicative constant for the hopping strength.
     :type multiplier: float / complex
+
+    .. note :: For large matrices, :func:`matrix_to_hop_array` is much faster.
     """
     if orbitals is None:
         orbitals = list(range(len(mat)))
@@ -45,6 +49,68 @@ def matrix_to_hop(mat, orbitals=None, R=(0, 0, 0), multiplier=1.):
             hop.append([multiplier * x, orbitals[i], orbitals[j], np.array(R, dtype=int)])
     return hop
 
+@export
+def matrix_to_hop_array(mat, orbitals=None, R=(0, 0, 0), multiplier=1.):
+    r"""
+    Turns a square matrix into a structured array of hopping terms (see :func:`hop_array`), which can be passed to :meth:`.Model.from_hop_list`. In contrast to :func:`matrix_to_hop`, zero entries of the matrix are skipped, and the terms are created without iterating over the matrix. Each entry can be unpacked as ``t, orbital_1, orbital_2, R``.
+
+    :param mat: The matrix to be converted.
+
+    :param orbitals:    Indices of the orbitals that make up the basis w.r.t. which the matrix is defined. By default (``orbitals=None``), the first ``len(mat)`` orbitals are used.
+    :type orbitals:     list
+
+    :param R:   Lattice vector for all the hopping terms.
+    :type R:    list
+
+    :param multiplier:  Multiplicative constant for the hopping strength.
+    :type multiplier: float / complex
+    """
+    mat = np.array(mat)
+    if orbitals is None:
+        orbitals = np.arange(len(mat))
+    else:
+        orbitals = np.array(orbitals, dtype=int)
+    rows, cols = np.nonzero(mat)
+    return hop_array(
+        multiplier * mat[rows, cols],
+        orbitals[rows],
+        orbitals[cols],
+        np.broadcast_to(np.array(R, dtype=int), (len(rows), len(R)))
+    )
+
+@export
+def hop_array(t, orbital_1, orbital_2, R):
+    r"""
+    Creates a structured array of hopping terms from column arrays, with the fields ``t``, ``orbital_1``, ``orbital_2`` and ``R``. Such arrays can be combined with :func:`numpy.concatenate`, and are converted to a :class:`.Model` by :meth:`.Model.from_hop_list` without iterating over the terms.
+
+    :param t:   Strengths of the hoppings.
+    :type t:    array
+
+    :param orbital_1:   Indices of the first orbitals.
+    :type orbital_1:    array
+
+    :param orbital_2:   Indices of the second orbitals.
+    :type orbital_2:    array
+
+    :param R:   Lattice vectors of the unit cells containing the second orbitals, as an array of shape ``(len(t), dim)``.
+    :type R:    array
+    """
+    t = np.asarray(t).reshape(-1)
+    R = np.asarray(R, dtype=int)
+    if R.ndim != 2 or len(R) != len(t):
+        raise ValueError('The lattice vectors must be given as an array of shape (len(t), dim), but have shape {}.'.format(R.shape))
+    res = np.empty(len(t), dtype=[
+        ('t', complex),
+        ('orbital_1', int),
+        ('orbital_2', int),
+        ('R', int, (R.shape[1],))
+    ])
+    res['t'] = t
+    res['orbital_1'] = orbital_1
+    res['orbital_2'] = orbital_2
+    res['R'] = R
+    return res
+
 #-------------------------------ENCODING--------------------------------#
 
 @export
@@ -98,8 +164,20 @@ def _(obj):
         size=obj.size,
         dim=obj.dim,
         pos=obj.pos,
-        sparse=obj._sparse,
-        hop=_encode_hoppings_sparse(obj.hop) if obj._sparse else _encode_hoppings_dense(obj.hop)
+        sparse=obj._get_sparse_setting(),
+        dtype=obj.dtype.name,
+        hop=_encode_hoppings_sparse(obj.hop) if obj._sparse else _encode_hoppings_dense(obj.hop),
+        symmetries=obj.symmetries
+    )
+
+@encode.register(SymmetryOperation)
+def _(obj):
+    return dict(
+        __symmetry_operation__=True,
+        rotation_matrix=obj.rotation_matrix,
+        repr_matrix=obj.repr_matrix,
+        translation_vector=obj.translation_vector,
+        repr_has_cc=obj.repr_has_cc
     )
 
 def _encode_hoppings_sparse(hoppings):
@@ -121,6 +199,10 @@ def _decode_tb_model(obj):
     del obj['__tb_model__']
     return Model(contains_cc=False, **obj)
 
+def _decode_symmetry_operation(obj):
+    del obj['__symmetry_operation__']
+    return SymmetryOperation(**obj)
+
 def _decode_hoppings_sparse(obj):
     return {
         tuple(R): sp.csr(tuple(mat), shape=shape)
@@ -161,3 +243,66 @@ def decode(dct):
         return globals()['_decode_' + name](dct)
     else:
         return dct
+
+#--------------------------------MSGPACK--------------------------------#
+
+#: Code of the msgpack extension type which is used for numpy arrays.
+MSGPACK_NDARRAY_CODE = 42
+
+def _import_msgpack():
+    """
+    Imports the optional :py:mod:`msgpack` module.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError('The msgpack package is needed for the msgpack serialization. It can be installed with "pip install msgpack".')
+    return msgpack
+
+@export
+def msgpack_default(obj):
+    """
+    Encodes TBmodels types into msgpack - compatible types. In contrast to :meth:`encode`, numpy arrays are stored as raw buffers in a msgpack extension type, instead of being converted to lists. This can be used for the ``default`` keyword of :py:func:`msgpack.packb`, together with :meth:`msgpack_ext_hook` and :meth:`decode` for unpacking.
+
+    .. code::
+
+        import msgpack
+        import tbmodels
+
+        model = ... # create a tbmodels.Model object
+
+        data = msgpack.packb(model, default=tbmodels.helpers.msgpack_default, use_bin_type=True)
+        model2 = msgpack.unpackb(
+            data,
+            object_hook=tbmodels.helpers.decode,
+            ext_hook=tbmodels.helpers.msgpack_ext_hook,
+            raw=False
+        )
+
+    .. note ::
+
+        It is recommended to use :meth:`.Model.to_msgpack` or :meth:`.Model.to_msgpack_file` unless the hooks are needed explicitly.
+    """
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in 'biufc':
+        msgpack = _import_msgpack()
+        header = '{};{}'.format(obj.dtype.str, ','.join(str(x) for x in obj.shape)).encode('ascii')
+        return msgpack.ExtType(
+            MSGPACK_NDARRAY_CODE,
+            struct.pack('<I', len(header)) + header + np.ascontiguousarray(obj).tobytes()
+        )
+    return encode(obj)
+
+@export
+def msgpack_ext_hook(code, data):
+    """
+    Decodes the msgpack extension types created by :meth:`msgpack_default`. This can be used for the ``ext_hook`` keyword of :py:func:`msgpack.unpackb`.
+    """
+    if code != MSGPACK_NDARRAY_CODE:
+        msgpack = _import_msgpack()
+        return msgpack.ExtType(code, data)
+    header_size, = struct.unpack_from('<I', data)
+    header_end = 4 + header_size
+    dtype, shape = bytes(data[4:header_end]).decode('ascii').split(';')
+    shape = tuple(int(x) for x in shape.split(',')) if shape else ()
+    # copy s.t. the array is writeable and does not keep the message alive
+    return np.frombuffer(data, dtype=dtype, offset=header_end).reshape(shape).copy()
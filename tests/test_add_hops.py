@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import tracemalloc
+
+import pytest
+import numpy as np
+
+import tbmodels
+
+from parameters import KPT
+
+def _random_hops(size, num_hops, seed=0):
+    random_state = np.random.RandomState(seed)
+    overlaps = random_state.uniform(-1, 1, num_hops) + 1j * random_state.uniform(-1, 1, num_hops)
+    orbital_1 = random_state.randint(size, size=num_hops)
+    orbital_2 = random_state.randint(size, size=num_hops)
+    R_array = random_state.randint(-1, 2, size=(num_hops, 3))
+    return overlaps, orbital_1, orbital_2, R_array
+
+@pytest.mark.parametrize('size,num_hops', [(2, 1), (2, 50), (10, 500)])
+def test_consistency(models_close, size, num_hops, sparse):
+    hops = _random_hops(size, num_hops)
+    model1 = tbmodels.Model(size=size, dim=3, sparse=sparse)
+    for overlap, orbital_1, orbital_2, R in zip(*hops):
+        model1.add_hop(overlap, orbital_1, orbital_2, R)
+    model2 = tbmodels.Model(size=size, dim=3, sparse=sparse)
+    model2.add_hops(*hops)
+    models_close(model1, model2)
+    for k in KPT:
+        assert np.allclose(model1.hamilton(k), model2.hamilton(k))
+
+def test_existing_hoppings(get_model, models_close, sparse):
+    hops = _random_hops(2, 20)
+    model1 = get_model(0.1, 0.2, sparse=sparse)
+    model2 = get_model(0.1, 0.2, sparse=sparse)
+    for overlap, orbital_1, orbital_2, R in zip(*hops):
+        model1.add_hop(overlap, orbital_1, orbital_2, R)
+    model2.add_hops(*hops)
+    models_close(model1, model2)
+
+def test_empty(get_model, models_equal):
+    model = get_model(0.1, 0.2)
+    model.add_hops([], [], [], np.zeros((0, 3)))
+    models_equal(model, get_model(0.1, 0.2))
+
+def test_k_cache(get_model):
+    model = get_model(0.1, 0.2)
+    model.set_k_cache()
+    H = model.hamilton(KPT[0])
+    model.add_hops(*_random_hops(2, 5))
+    assert not np.allclose(H, model.hamilton(KPT[0]))
+
+def test_sparse_no_dense_allocation():
+    size = 2000
+    model = tbmodels.Model(size=size, dim=3, sparse=True)
+    hops = _random_hops(size, 1000)
+    tracemalloc.start()
+    try:
+        model.add_hops(*hops)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # a single dense matrix would take size**2 * 16 bytes
+    assert peak < size**2
+    assert len(model.hop) == 14
+
+def test_auto_sparse():
+    model = tbmodels.Model(size=200, dim=3, sparse='auto')
+    model.add_hops(np.ones(200), np.arange(200), np.arange(200), np.zeros((200, 3)))
+    assert model.sparse_info()['sparse']
+    random_state = np.random.RandomState(0)
+    num_hops = 20000
+    model.add_hops(
+        np.ones(num_hops),
+        random_state.randint(200, size=num_hops),
+        random_state.randint(200, size=num_hops),
+        np.zeros((num_hops, 3))
+    )
+    assert not model.sparse_info()['sparse']
+
+def test_auto_sparse_incremental(monkeypatch):
+    size = 200
+    model = tbmodels.Model(size=size, dim=3, sparse='auto')
+    num_counts = []
+    count_nonzero = model._count_nonzero
+
+    def counter():
+        num_counts.append(None)
+        return count_nonzero()
+    monkeypatch.setattr(model, '_count_nonzero', counter)
+    random_state = np.random.RandomState(0)
+    formats = []
+    for _ in range(500):
+        R_array = np.zeros((20, 3), dtype=int)
+        R_array[:, 0] = random_state.randint(2, size=20)
+        model.add_hops(np.ones(20), random_state.randint(size, size=20), random_state.randint(size, size=20), R_array)
+        reference = tbmodels.Model(hop=model.hop, contains_cc=False, sparse=False)
+        assert model._sparse == (reference.get_density() < tbmodels.Model.AUTO_SPARSE_MAX_DENSITY)
+        formats.append(model._sparse)
+    # the format changes, but the entries are not counted again for each call
+    assert formats[0] and not formats[-1]
+    assert len(num_counts) < 50
+
+@pytest.mark.parametrize('args', [
+    ([1.], [0], [0, 1], [[0, 0, 0]]),
+    ([1.], [0], [2], [[0, 0, 0]]),
+    ([1.], [-1], [0], [[0, 0, 0]]),
+    ([1.], [0], [1], [[0, 0]]),
+])
+def test_invalid(get_model, args):
+    model = get_model(0.1, 0.2)
+    with pytest.raises(ValueError):
+        model.add_hops(*args)
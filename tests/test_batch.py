@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+import tbmodels
+
+from parameters import T_VALUES, KPT
+
+@pytest.fixture(params=[1, 3])
+def num_threads(request):
+    return request.param
+
+@pytest.mark.parametrize('t1,t2', T_VALUES)
+def test_hamilton_batch(get_model, t1, t2, sparse, num_threads):
+    model = get_model(t1, t2, sparse=sparse)
+    res = model.hamilton_batch(KPT, num_threads=num_threads)
+    assert res.shape == (len(KPT), model.size, model.size)
+    for k, H in zip(KPT, res):
+        assert np.allclose(H, model.hamilton(k))
+
+@pytest.mark.parametrize('t1,t2', T_VALUES)
+def test_eigenval_batch(get_model, t1, t2, sparse, num_threads):
+    model = get_model(t1, t2, sparse=sparse)
+    res = model.eigenval_batch(KPT, num_threads=num_threads)
+    for k, eigenval in zip(KPT, res):
+        assert np.allclose(eigenval, model.eigenval(k))
+
+def test_frozen(get_model, sparse, num_threads):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    frozen = model.freeze()
+    assert np.allclose(
+        model.hamilton_batch(KPT, num_threads=num_threads),
+        frozen.hamilton_batch(KPT, num_threads=num_threads)
+    )
+
+def test_many_blocks(get_model, sparse, num_threads, monkeypatch):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    monkeypatch.setattr(model, 'BATCH_BLOCK_SIZE', 8)
+    kpoints = np.random.RandomState(0).uniform(size=(17, 3))
+    res = model.eigenval_batch(kpoints, num_threads=num_threads)
+    assert np.allclose(res, [model.eigenval(k) for k in kpoints])
+
+def test_complex64(get_model, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    res = model.hamilton_batch(KPT, dtype=np.complex64)
+    assert res.dtype == np.complex64
+    assert model.eigenval_batch(KPT, dtype=np.complex64).dtype == np.float32
+    assert np.allclose(res, model.hamilton_batch(KPT), atol=1e-6)
+
+def test_empty(get_model):
+    model = get_model(0.1, 0.2)
+    assert model.hamilton_batch([]).shape == (0, model.size, model.size)
+    model = tbmodels.Model(size=2, dim=3)
+    assert np.allclose(model.hamilton_batch(KPT), 0)
+
+def test_default_num_threads():
+    assert tbmodels.parallel.get_num_threads() == 1
+    try:
+        tbmodels.parallel.set_num_threads(4)
+        assert tbmodels.parallel.get_num_threads() == 4
+    finally:
+        tbmodels.parallel.set_num_threads(1)
+
+@pytest.mark.parametrize('num_threads', [0, -1, 1.5])
+def test_invalid_num_threads(num_threads):
+    with pytest.raises(ValueError):
+        tbmodels.parallel.set_num_threads(num_threads)
+
+@pytest.mark.parametrize('length,num_chunks', [(0, 3), (5, 1), (5, 3), (3, 5), (100, 7)])
+def test_chunk_slices(length, num_chunks):
+    slices = tbmodels.parallel.chunk_slices(length, num_chunks)
+    assert len(slices) <= max(1, num_chunks)
+    assert list(range(length)) == [i for slc in slices for i in range(length)[slc]]
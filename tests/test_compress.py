@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import tbmodels
+import numpy as np
+
+@pytest.fixture
+def chain_model(sparse):
+    """
+    Chain model with hoppings which decay with the distance.
+    """
+    model = tbmodels.Model(
+        on_site=[1e-4, 1],
+        dim=1,
+        pos=[[0], [0.5]],
+        uc=[[2.]],
+        occ=1,
+        sparse=sparse
+    )
+    model.add_hop(0.5, 0, 1, [0])
+    for i in range(1, 6):
+        model.add_hop(10.**-i, 0, 0, [i])
+        model.add_hop(0.1 * 10.**-i, 1, 0, [i])
+    return model
+
+@pytest.mark.parametrize('t1,t2', [(0.1, 0.2), (0.2, 0.3)])
+def test_no_compression(t1, t2, get_model, models_equal, sparse):
+    model = get_model(t1, t2, sparse=sparse)
+    res, error = model.compress(return_error=True)
+    models_equal(model, res)
+    assert np.isclose(error, 0)
+
+def test_abs_tol(chain_model, models_close, sparse):
+    res = chain_model.compress(abs_tol=1e-3)
+    # the small on-site energy is removed, but not the hopping within the unit cell
+    expected = tbmodels.Model(
+        on_site=[0, 1],
+        dim=1,
+        pos=[[0], [0.5]],
+        uc=[[2.]],
+        occ=1,
+        sparse=sparse
+    )
+    expected.add_hop(0.5, 0, 1, [0])
+    expected.add_hop(0.1, 0, 0, [1])
+    expected.add_hop(0.01, 0, 0, [2])
+    expected.add_hop(0.01, 1, 0, [1])
+    models_close(res, expected)
+    assert sorted(res.hop.keys()) == [(0, ), (1, ), (2, )]
+
+def test_abs_tol_terms(chain_model):
+    res = chain_model.compress(abs_tol=2e-3)
+    for R, mat in res.hop.items():
+        mat = np.array(mat.toarray() if chain_model._sparse else mat)
+        factor = 2 if R == (0, ) else 1
+        assert np.all((factor * np.abs(mat) > 2e-3) | (mat == 0))
+
+@pytest.mark.parametrize('max_distance,num_R', [(0, 1), (1.5, 2), (2.5, 2), (5, 4)])
+def test_max_distance(chain_model, max_distance, num_R):
+    res = chain_model.compress(max_distance=max_distance)
+    assert len(res.hop) == num_R
+    for R, mat in res.hop.items():
+        mat = np.array(mat.toarray() if chain_model._sparse else mat)
+        for i, j in zip(*np.nonzero(mat)):
+            assert 2 * abs(chain_model.pos[j][0] + R[0] - chain_model.pos[i][0]) <= max_distance
+
+def test_max_distance_reduced(sparse):
+    model = tbmodels.Model(size=1, dim=2, pos=[[0, 0]], sparse=sparse)
+    model.add_hop(1., 0, 0, [1, 0])
+    model.add_hop(0.5, 0, 0, [1, 1])
+    res = model.compress(max_distance=1.2)
+    assert list(res.hop.keys()) == [(1, 0)]
+
+def test_rel_band_error(chain_model):
+    res, error = chain_model.compress(rel_band_error=1e-2, return_error=True)
+    assert len(res.hop) < len(chain_model.hop)
+    eigenvals = chain_model.eigenval_batch(np.linspace(0, 1, 8, endpoint=False))
+    assert error <= 1e-2 * (np.max(eigenvals) - np.min(eigenvals))
+    assert np.isclose(
+        error,
+        np.max(np.abs(res.eigenval_batch(np.linspace(0, 1, 8, endpoint=False)) - eigenvals))
+    )
+    # the largest terms are always kept
+    assert (1, ) in res.hop
+
+def test_rel_band_error_zero(chain_model):
+    res = chain_model.compress(rel_band_error=0)
+    assert len(res.hop) == len(chain_model.hop)
+
+def test_mesh(chain_model):
+    _, error = chain_model.compress(abs_tol=1e-3, mesh=[2], return_error=True)
+    kpoints = [[0], [0.5]]
+    assert np.isclose(
+        error,
+        np.max(np.abs(chain_model.compress(abs_tol=1e-3).eigenval_batch(kpoints) - chain_model.eigenval_batch(kpoints)))
+    )
+
+def test_frozen(chain_model):
+    res = chain_model.freeze().compress(abs_tol=1e-3)
+    assert isinstance(res, tbmodels.Model)
+    for k in [[0.], [0.2]]:
+        assert np.allclose(res.hamilton(k), chain_model.compress(abs_tol=1e-3).hamilton(k))
+
+@pytest.mark.parametrize('kwargs', [
+    dict(abs_tol=-1),
+    dict(max_distance=-1),
+    dict(rel_band_error=-0.1),
+    dict(rel_band_error=0.1, mesh=[2, 2]),
+])
+def test_invalid(chain_model, kwargs):
+    with pytest.raises(ValueError):
+        chain_model.compress(**kwargs)
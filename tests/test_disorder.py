@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+import tbmodels
+
+from parameters import T_VALUES, KPT
+
+@pytest.fixture
+def ensemble_kwargs(request):
+    def inner(model, on_site=True, bond=True, num_realizations=5):
+        random_state = np.random.RandomState(42)
+        res = dict()
+        if on_site:
+            res['on_site'] = random_state.uniform(-1, 1, size=(num_realizations, model.size))
+        if bond:
+            num_bonds = len(tbmodels.DisorderEnsemble.get_bonds(model))
+            res['bond'] = random_state.uniform(-0.2, 0.2, size=(num_realizations, num_bonds)) + \
+                1j * random_state.uniform(-0.2, 0.2, size=(num_realizations, num_bonds))
+        return res
+    return inner
+
+@pytest.mark.parametrize('t1,t2', T_VALUES)
+@pytest.mark.parametrize('on_site,bond', [(True, False), (False, True), (True, True)])
+def test_consistency(get_model, ensemble_kwargs, t1, t2, on_site, bond, sparse):
+    model = get_model(t1, t2, sparse=sparse)
+    ensemble = tbmodels.DisorderEnsemble(model, **ensemble_kwargs(model, on_site=on_site, bond=bond))
+    for k in KPT:
+        H = ensemble.hamilton(k)
+        eigenval = ensemble.eigenval(k, num_threads=2)
+        for i in range(ensemble.num_realizations):
+            realization = ensemble.get_model(i)
+            assert np.allclose(H[i], realization.hamilton(k))
+            assert np.allclose(eigenval[i], realization.eigenval(k))
+
+def test_bonds(get_model):
+    model = get_model(0.1, 0.2)
+    bonds = tbmodels.DisorderEnsemble.get_bonds(model)
+    assert bonds.shape[1] == 5
+    for bond in bonds:
+        R = tuple(bond[:3])
+        assert R in model.hop
+        if R == (0, 0, 0):
+            assert bond[3] < bond[4]
+
+def test_anderson(get_model):
+    model = get_model(0.1, 0.2)
+    ensemble = tbmodels.DisorderEnsemble.anderson(model, 2., 100, seed=0)
+    assert ensemble.on_site.shape == (100, model.size)
+    assert np.all(np.abs(ensemble.on_site) <= 1.)
+    assert ensemble.bond is None
+
+def test_clean_model_unchanged(get_model):
+    model = get_model(0.1, 0.2)
+    H = model.hamilton(KPT[0])
+    ensemble = tbmodels.DisorderEnsemble.anderson(model, 2., 3, seed=0)
+    ensemble.get_model(0)
+    ensemble.eigenval(KPT[0])
+    assert np.allclose(H, model.hamilton(KPT[0]))
+
+def test_frozen_model(get_model, models_close, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    ensemble = tbmodels.DisorderEnsemble(
+        model.freeze(),
+        on_site=np.random.RandomState(0).uniform(size=(3, model.size))
+    )
+    for i in range(3):
+        realization = ensemble.get_model(i)
+        assert not isinstance(realization, tbmodels.FrozenModel)
+        expected = get_model(0.1, 0.2, sparse=sparse)
+        expected.add_on_site(ensemble.on_site[i])
+        models_close(realization, expected)
+        assert np.allclose(realization.hamilton(KPT[0]), ensemble.hamilton(KPT[0])[i])
+
+def test_dos(get_model):
+    model = get_model(0.1, 0.2)
+    ensemble = tbmodels.DisorderEnsemble.anderson(model, 1., 20, seed=0)
+    energies = np.linspace(-10, 10, 4001)
+    kpoints = tbmodels.monkhorst_pack([3, 3, 3])
+    dos = ensemble.dos(energies, kpoints, broadening=0.05)
+    assert np.isclose(np.sum(dos) * (energies[1] - energies[0]), 1.)
+    assert np.allclose(ensemble.dos(energies), ensemble.dos(energies, [[0, 0, 0]]))
+
+@pytest.mark.parametrize('kwargs', [
+    dict(),
+    dict(on_site=np.zeros((3, 5))),
+    dict(bond=np.zeros((3, 1))),
+])
+def test_invalid_shape(get_model, kwargs):
+    model = get_model(0.1, 0.2)
+    with pytest.raises(ValueError):
+        tbmodels.DisorderEnsemble(model, **kwargs)
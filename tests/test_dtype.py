@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+
+import pytest
+import tbmodels
+import numpy as np
+
+from parameters import T_VALUES, KPT
+
+@pytest.mark.parametrize('t', T_VALUES)
+def test_single_precision(t, get_model):
+    model1 = get_model(*t)
+    model2 = get_model(*t, dtype=np.complex64)
+    for mat in model2.hop.values():
+        assert np.array(mat).dtype == np.complex64
+    for k in KPT:
+        ham = model2.hamilton(k)
+        assert ham.dtype == np.complex64
+        assert np.allclose(ham, model1.hamilton(k), atol=1e-6)
+        eigval = model2.eigenval(k)
+        assert eigval.dtype == np.float32
+        assert np.allclose(eigval, model1.eigenval(k), atol=1e-5)
+
+def test_default(get_model):
+    model = get_model(0.1, 0.2)
+    assert model.dtype == np.complex128
+    assert model.hamilton(KPT[0]).dtype == np.complex128
+
+def test_evaluation_dtype(get_model):
+    model = get_model(0.1, 0.2)
+    model.set_k_cache()
+    assert model.hamilton(KPT[0], dtype=np.complex64).dtype == np.complex64
+    assert model.hamilton(KPT[0]).dtype == np.complex128
+    assert model.eigenval(KPT[0], dtype='complex64').dtype == np.float32
+    assert model.eigenval(KPT[0]).dtype == np.float64
+
+def test_add_hop(get_model):
+    model = get_model(0.1, 0.2, dtype=np.complex64)
+    model.add_hop(0.3j, 0, 1, (1, 0, 0))
+    model.add_on_site((0.1, 0.2))
+    for mat in model.hop.values():
+        assert np.array(mat).dtype == np.complex64
+
+def test_derived(get_model, models_equal):
+    model = get_model(0.1, 0.2, dtype=np.complex64)
+    assert (2 * model).dtype == np.complex64
+    assert (model + model).dtype == np.complex64
+    models_equal(model, tbmodels.Model.from_json(model.to_json()))
+    assert tbmodels.Model.from_json(model.to_json()).dtype == np.complex64
+    assert pickle.loads(pickle.dumps(model)).dtype == np.complex64
+
+@pytest.mark.parametrize('dtype', [float, np.float32, int])
+def test_invalid(get_model, dtype):
+    with pytest.raises(ValueError):
+        get_model(0.1, 0.2, dtype=dtype)
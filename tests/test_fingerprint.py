@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+
+import pytest
+import tbmodels
+import numpy as np
+
+from parameters import T_VALUES
+
+@pytest.mark.parametrize('t', T_VALUES)
+def test_equal(t, get_model):
+    model1 = get_model(*t)
+    model2 = pickle.loads(pickle.dumps(model1))
+    assert model1.fingerprint() == model2.fingerprint()
+    assert model1.allclose(model2)
+
+@pytest.mark.parametrize('t', T_VALUES)
+def test_sparse_dense(t, get_model):
+    model1 = get_model(*t, sparse=True)
+    model2 = get_model(*t, sparse=False)
+    assert model1.fingerprint() == model2.fingerprint()
+    assert model1.allclose(model2)
+
+def test_empty_hoppings(get_model):
+    model1 = get_model(0.1, 0.2)
+    model2 = get_model(0.1, 0.2)
+    # accessing the defaultdict creates an empty hopping matrix
+    model2.hop[(5, 0, 0)]
+    assert model1.fingerprint() == model2.fingerprint()
+    assert model1.allclose(model2)
+
+@pytest.mark.parametrize('kwargs', [
+    dict(uc=np.eye(3)),
+    dict(occ=2),
+    dict(pos=[[0, 0, 0], [0.5, 0.5, 0.1]]),
+    dict(on_site=[1, -1.1]),
+])
+def test_different(get_model, kwargs):
+    model1 = get_model(0.1, 0.2)
+    model2 = get_model(0.1, 0.2, **kwargs)
+    assert model1.fingerprint() != model2.fingerprint()
+    assert not model1.allclose(model2)
+
+def test_different_hopping(get_model):
+    model1 = get_model(0.1, 0.2)
+    model2 = get_model(0.1, 0.2)
+    model2.add_hop(1e-3, 0, 1, (2, 0, 0))
+    assert model1.fingerprint() != model2.fingerprint()
+    assert not model1.allclose(model2)
+    assert model1.allclose(model2, tol=1e-2)
+
+def test_precision(get_model):
+    model1 = get_model(0.1, 0.2)
+    model2 = get_model(0.1, 0.2 + 1e-12)
+    assert model1.fingerprint() == model2.fingerprint()
+    assert model1.fingerprint(decimals=14) != model2.fingerprint(decimals=14)
+    assert model1.allclose(model2)
+    assert not model1.allclose(model2, tol=1e-14)
+
+def test_allclose_invalid(get_model):
+    with pytest.raises(ValueError):
+        get_model(0.1, 0.2).allclose(2)
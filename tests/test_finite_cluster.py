@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import pytest
+import numpy as np
+import scipy.sparse
+
+import tbmodels
+
+from parameters import T_VALUES
+
+def _cluster_reference(model, shape_fn, bounding_box):
+    """Builds the cluster Hamiltonian with explicit loops over the orbitals."""
+    R_array, hop_array = model._get_hop_stack(full=True)
+    hop_full = {tuple(R): mat for R, mat in zip(R_array, hop_array)}
+    sites = []
+    for cell in itertools.product(*[range(start, stop) for start, stop in bounding_box]):
+        for i, p in enumerate(model.pos):
+            position = np.array(cell) + p
+            if model.uc is not None:
+                position = np.dot(position, model.uc)
+            if shape_fn(position[None, :])[0]:
+                sites.append((np.array(cell), i))
+    H = np.zeros((len(sites), len(sites)), dtype=complex)
+    for a, (cell_1, i) in enumerate(sites):
+        for b, (cell_2, j) in enumerate(sites):
+            mat = hop_full.get(tuple(cell_2 - cell_1))
+            if mat is not None:
+                H[a, b] = mat[i, j]
+    return H
+
+def _sphere(positions):
+    return np.linalg.norm(positions - 1.5, axis=1) < 1.6
+
+@pytest.mark.parametrize('t1,t2', T_VALUES)
+def test_reference(get_model, t1, t2, sparse):
+    model = get_model(t1, t2, sparse=sparse, uc=np.eye(3))
+    bounding_box = [(0, 3), (0, 3), (0, 4)]
+    cluster = model.finite_cluster(_sphere, bounding_box)
+    assert cluster.dim == 0
+    assert cluster._sparse
+    assert np.allclose(cluster.hamilton([]), _cluster_reference(model, _sphere, bounding_box))
+
+@pytest.mark.parametrize('t1,t2', T_VALUES)
+def test_matrix(get_model, t1, t2, sparse):
+    model = get_model(t1, t2, sparse=sparse, uc=np.eye(3))
+    bounding_box = [(0, 3), (0, 3), (0, 4)]
+    cluster, matrix = model.finite_cluster(_sphere, bounding_box, return_matrix=True)
+    assert scipy.sparse.isspmatrix_csr(matrix)
+    assert np.allclose(matrix.toarray(), _cluster_reference(model, _sphere, bounding_box))
+    assert np.allclose(cluster.hamilton([]), matrix.toarray())
+
+def test_chain():
+    model = tbmodels.Model(size=1, dim=1, on_site=[0.5], pos=[[0.]], uc=[[2.]])
+    model.add_hop(-1., 0, 0, [1])
+    cluster, positions = model.finite_cluster(
+        lambda x: np.ones(len(x), dtype=bool), [(-5, 5)], return_positions=True
+    )
+    assert np.allclose(positions, 2 * np.arange(-5, 5)[:, None])
+    _, matrix = model.finite_cluster(lambda x: np.ones(len(x), dtype=bool), [(-5, 5)], return_matrix=True)
+    assert np.allclose(matrix.diagonal(), 0.5)
+    assert np.allclose(matrix.diagonal(1), -1.)
+    assert np.allclose(matrix.diagonal(-1), -1.)
+    assert matrix.nnz == 10 + 2 * 9
+    assert np.allclose(
+        cluster.eigenval([]),
+        np.sort(0.5 - 2 * np.cos(np.pi * np.arange(1, 11) / 11))
+    )
+
+def test_reduced_coordinates(get_model):
+    model = get_model(0.1, 0.2)
+    cluster, positions = model.finite_cluster(
+        lambda x: x[:, 0] < 1.2, [(0, 3), (0, 1), (0, 1)], return_positions=True
+    )
+    assert cluster.size == 3
+    assert np.all(positions[:, 0] < 1.2)
+
+def test_return_all(get_model):
+    model = get_model(0.1, 0.2, uc=np.eye(3))
+    cluster, positions, matrix = model.finite_cluster(
+        _sphere, [(0, 3), (0, 3), (0, 4)], return_positions=True, return_matrix=True
+    )
+    assert len(positions) == cluster.size
+    assert matrix.shape == (cluster.size, cluster.size)
+
+def test_empty_selection(get_model):
+    model = get_model(0.1, 0.2)
+    cluster = model.finite_cluster(lambda x: np.zeros(len(x), dtype=bool), [(0, 2)] * 3)
+    assert cluster.size == 0
+
+@pytest.mark.parametrize('bounding_box', [
+    [(0, 2), (0, 2)],
+    [(0, 2), (0, 2), (1, 1)],
+])
+def test_invalid_bounding_box(get_model, bounding_box):
+    model = get_model(0.1, 0.2)
+    with pytest.raises(ValueError):
+        model.finite_cluster(_sphere, bounding_box)
+
+def test_invalid_shape_fn(get_model):
+    model = get_model(0.1, 0.2)
+    with pytest.raises(ValueError):
+        model.finite_cluster(lambda x: [True], [(0, 2)] * 3)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import numpy as np
+
+import tbmodels
+
+from parameters import T_VALUES, KPT
+
+@pytest.mark.parametrize('t1,t2', T_VALUES)
+def test_frozen_consistency(get_model, models_equal, t1, t2, sparse):
+    model = get_model(t1, t2, sparse=sparse)
+    frozen = model.freeze()
+    assert isinstance(frozen, tbmodels.FrozenModel)
+    models_equal(model, frozen)
+    for k in KPT:
+        assert np.allclose(model.hamilton(k), frozen.hamilton(k))
+        assert np.allclose(model.eigenval(k), frozen.eigenval(k))
+    assert model.fingerprint() == frozen.fingerprint()
+
+def test_independent_copy(get_model):
+    model = get_model(0.1, 0.2)
+    frozen = model.freeze()
+    model.add_hop(0.3, 0, 1, [1, 0, 0])
+    assert not np.allclose(model.hamilton(KPT[0]), frozen.hamilton(KPT[0]))
+    assert model.fingerprint() != frozen.fingerprint()
+
+def test_immutable(get_model, sparse):
+    frozen = get_model(0.1, 0.2, sparse=sparse).freeze()
+    with pytest.raises(ValueError):
+        frozen.add_hop(0.3, 0, 1, [1, 0, 0])
+    with pytest.raises(ValueError):
+        frozen.add_on_site([1., 2.])
+    for attr in ['hop', 'pos', 'uc', 'occ']:
+        with pytest.raises(AttributeError):
+            setattr(frozen, attr, None)
+    with pytest.raises(TypeError):
+        frozen.hop[(0, 0, 0)] = None
+    with pytest.raises(ValueError):
+        frozen.pos[0, 0] = 0.5
+    if not sparse:
+        with pytest.raises(ValueError):
+            frozen.hop[(0, 0, 0)][0, 0] = 1.
+
+def test_freeze_twice(get_model):
+    frozen = get_model(0.1, 0.2).freeze()
+    assert frozen.freeze() is frozen
+
+def test_cached_data(get_model):
+    frozen = get_model(0.1, 0.2).freeze()
+    assert frozen._get_hop_stack() is frozen._get_hop_stack()
+    R_array, hop_array = frozen._get_hop_stack(full=True)
+    assert not hop_array.flags.writeable
+
+@pytest.mark.parametrize('copy_fct', [
+    copy.copy,
+    copy.deepcopy,
+    lambda m: pickle.loads(pickle.dumps(m)),
+])
+def test_copy(get_model, models_equal, copy_fct, sparse):
+    frozen = get_model(0.1, 0.2, sparse=sparse).freeze()
+    frozen2 = copy_fct(frozen)
+    assert isinstance(frozen2, tbmodels.FrozenModel)
+    models_equal(frozen, frozen2)
+    with pytest.raises(ValueError):
+        frozen2.add_hop(0.3, 0, 1, [1, 0, 0])
+
+def test_derived_models(get_model, models_close, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    frozen = model.freeze()
+    models_close(model + model, frozen + frozen)
+    res = 2 * frozen
+    assert not isinstance(res, tbmodels.FrozenModel)
+    res.add_hop(0.3, 0, 1, [1, 0, 0])
+
+def test_threads(get_model, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    frozen = model.freeze()
+    kpoints = [np.random.RandomState(i).uniform(size=3) for i in range(20)]
+    with ThreadPoolExecutor(4) as executor:
+        res = list(executor.map(frozen.eigenval, kpoints))
+    for k, eigenval in zip(kpoints, res):
+        assert np.allclose(eigenval, model.eigenval(k))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+import pytest
+import tbmodels
+import numpy as np
+
+from parameters import KPT
+
+h5py = pytest.importorskip('h5py')
+
+KWARGS = [
+    dict(),
+    dict(pos=None, dim=3),
+    dict(uc=3 * np.eye(3)),
+    dict(pos=np.zeros((2, 3)), uc=np.eye(3)),
+    dict(sparse='auto'),
+    dict(dtype=np.complex64)
+]
+
+@pytest.fixture
+def hdf5_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield os.path.join(tmpdir, 'model.hdf5')
+
+@pytest.mark.parametrize('kwargs', KWARGS)
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_hdf5_consistency(get_model, models_equal, sparse, kwargs, compression, hdf5_file):
+    model1 = get_model(0.1, 0.2, **dict(dict(sparse=sparse), **kwargs))
+    with h5py.File(hdf5_file, 'w') as f:
+        model1.to_hdf5(f, compression=compression)
+    with h5py.File(hdf5_file, 'r') as f:
+        model2 = tbmodels.Model.from_hdf5(f)
+    models_equal(model1, model2)
+    assert model1._get_sparse_setting() == model2._get_sparse_setting()
+    assert model1.dtype == model2.dtype
+
+def test_hdf5_consistency_file(get_model, models_equal, hdf5_file):
+    model1 = get_model(0.1, 0.2)
+    model1.to_hdf5_file(hdf5_file)
+    model2 = tbmodels.Model.from_hdf5_file(hdf5_file)
+    models_equal(model1, model2)
+
+def test_multiple_models(get_model, models_equal, sparse, hdf5_file):
+    models = [get_model(t1, 0.2, sparse=sparse) for t1 in [0.1, 0.3, -0.5]]
+    for i, model in enumerate(models):
+        model.to_hdf5_file(hdf5_file, name='models/{}'.format(i))
+    for i, model in enumerate(models):
+        models_equal(model, tbmodels.Model.from_hdf5_file(hdf5_file, name='models/{}'.format(i)))
+
+def test_symmetries(get_model, hdf5_file):
+    model1 = get_model(0.1, 0.2)
+    model1.symmetries = [
+        tbmodels.SymmetryOperation(
+            rotation_matrix=-np.eye(3),
+            repr_matrix=np.array([[0, 1j], [-1j, 0]]),
+            repr_has_cc=True
+        )
+    ]
+    model1.to_hdf5_file(hdf5_file)
+    model2 = tbmodels.Model.from_hdf5_file(hdf5_file)
+    assert len(model2.symmetries) == 1
+    for attr in ['rotation_matrix', 'repr_matrix', 'translation_vector', 'repr_has_cc']:
+        assert np.all(getattr(model1.symmetries[0], attr) == getattr(model2.symmetries[0], attr))
+
+def test_frozen(get_model, models_equal, hdf5_file):
+    model1 = get_model(0.1, 0.2)
+    model1.to_hdf5_file(hdf5_file)
+    model2 = tbmodels.FrozenModel.from_hdf5_file(hdf5_file)
+    assert isinstance(model2, tbmodels.FrozenModel)
+    models_equal(model1, model2)
+
+@pytest.mark.parametrize('R', [[(0, 0, 1)], [(0, 0, -1)], [(0, 0, 0), (0, 1, 0)], [(5, 5, 5)]])
+def test_partial_R(get_model, sparse, R, hdf5_file):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    model.to_hdf5_file(hdf5_file)
+    res = tbmodels.Model.from_hdf5_file(hdf5_file, R=R)
+    expected = {vec for vec in model.hop.keys() if vec in R or tuple(-x for x in vec) in R}
+    assert set(res.hop.keys()) == expected
+    for vec in expected:
+        assert np.allclose(np.array(res.hop[vec]), np.array(model.hop[vec]))
+    assert res.occ == model.occ
+
+@pytest.mark.parametrize('orbitals', [[0], [1, 0], [0, 1]])
+def test_partial_orbitals(get_model, sparse, orbitals, hdf5_file):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    model.to_hdf5_file(hdf5_file)
+    res = tbmodels.Model.from_hdf5_file(hdf5_file, orbitals=orbitals)
+    assert res.size == len(orbitals)
+    assert res.occ is None
+    assert np.allclose(res.pos, model.pos[orbitals])
+    for k in KPT:
+        assert np.allclose(res.hamilton(k), model.hamilton(k)[np.ix_(orbitals, orbitals)])
+
+def test_invalid_orbitals(get_model, hdf5_file):
+    model = get_model(0.1, 0.2)
+    model.to_hdf5_file(hdf5_file)
+    with pytest.raises(ValueError):
+        tbmodels.Model.from_hdf5_file(hdf5_file, orbitals=[2])
+
+def test_invalid_group(hdf5_file):
+    with h5py.File(hdf5_file, 'w') as f:
+        f.create_group('empty')
+    with pytest.raises(ValueError):
+        tbmodels.Model.from_hdf5_file(hdf5_file, name='empty')
+
+def test_eigenval_batch(get_model, sparse, hdf5_file):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    model.BATCH_BLOCK_SIZE = 8
+    kpoints = np.random.uniform(-0.5, 0.5, size=(13, 3))
+    with h5py.File(hdf5_file, 'w') as f:
+        model.eigenval_batch_to_hdf5(kpoints[:5], f)
+        model.eigenval_batch_to_hdf5(kpoints[5:], f, compression='gzip')
+    with h5py.File(hdf5_file, 'r') as f:
+        assert np.allclose(f['kpoints'][()], kpoints)
+        assert np.allclose(f['eigenval'][()], model.eigenval_batch(kpoints))
+
+def test_eigenval_batch_invalid_shape(get_model, hdf5_file):
+    model = get_model(0.1, 0.2)
+    with h5py.File(hdf5_file, 'w') as f:
+        f.create_dataset('eigenval', data=np.zeros((2, 3)), maxshape=(None, 3))
+        with pytest.raises(ValueError):
+            model.eigenval_batch_to_hdf5(KPT, f)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+import pytest
+import tbmodels
+import numpy as np
+
+from parameters import KPT
+
+HR_FILE = './samples/wannier90_hr.dat'
+
+def cache_entries(cache_dir):
+    return sorted(f for f in os.listdir(cache_dir) if f.endswith('.pickle'))
+
+@pytest.mark.parametrize('hash_content', [True, False])
+def test_cache_hit(models_equal, sparse, hash_content):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model1 = tbmodels.Model.from_hr_file(HR_FILE, occ=28, sparse=sparse, cache_dir=cache_dir, cache_hash_content=hash_content)
+        entries = cache_entries(cache_dir)
+        assert len(entries) == 1
+        model2 = tbmodels.Model.from_hr_file(HR_FILE, occ=28, sparse=sparse, cache_dir=cache_dir, cache_hash_content=hash_content)
+        assert cache_entries(cache_dir) == entries
+        model3 = tbmodels.Model.from_hr_file(HR_FILE, occ=28, sparse=sparse)
+    models_equal(model1, model2)
+    models_equal(model1, model3)
+
+def test_different_arguments():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model1 = tbmodels.Model.from_hr_file(HR_FILE, occ=28, cache_dir=cache_dir)
+        model2 = tbmodels.Model.from_hr_file(HR_FILE, occ=28, h_cutoff=0.1, cache_dir=cache_dir)
+        model3 = tbmodels.Model.from_hr_file(HR_FILE, occ=28, pos=np.zeros((model1.size, 3)), cache_dir=cache_dir)
+        assert len(cache_entries(cache_dir)) == 3
+    assert any(not np.allclose(model1.hamilton(k), model2.hamilton(k)) for k in KPT)
+
+def test_modified_file():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        hr_file = os.path.join(cache_dir, 'hr.dat')
+        shutil.copy(HR_FILE, hr_file)
+        model1 = tbmodels.Model.from_hr_file(hr_file, cache_dir=cache_dir)
+        (2 * model1).to_hr_file(hr_file)
+        model2 = tbmodels.Model.from_hr_file(hr_file, cache_dir=cache_dir)
+        assert len(cache_entries(cache_dir)) == 2
+    for k in KPT:
+        assert np.allclose(2 * model1.hamilton(k), model2.hamilton(k), atol=1e-5)
+
+def test_size_limit(models_equal):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tbmodels.Model.from_hr_file(HR_FILE, occ=1, cache_dir=cache_dir)
+        entry_size = os.path.getsize(os.path.join(cache_dir, cache_entries(cache_dir)[0]))
+        for occ in [2, 3, 4]:
+            model1 = tbmodels.Model.from_hr_file(HR_FILE, occ=occ, cache_dir=cache_dir, cache_size_limit=2.5 * entry_size)
+        entries = cache_entries(cache_dir)
+        assert len(entries) == 2
+        # the most recent entry is still cached
+        model2 = tbmodels.Model.from_hr_file(HR_FILE, occ=4, cache_dir=cache_dir, cache_size_limit=2.5 * entry_size)
+        assert cache_entries(cache_dir) == entries
+    models_equal(model1, model2)
+
+def test_corrupt_entry(models_equal):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model1 = tbmodels.Model.from_hr_file(HR_FILE, cache_dir=cache_dir)
+        entry, = cache_entries(cache_dir)
+        with open(os.path.join(cache_dir, entry), 'wb') as f:
+            f.write(b'invalid')
+        model2 = tbmodels.Model.from_hr_file(HR_FILE, cache_dir=cache_dir)
+    models_equal(model1, model2)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+import tbmodels
+
+def _imported_modules(statement):
+    """
+    Returns the modules which are imported by the statement, in a fresh interpreter.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.abspath(tbmodels.__file__)))] +
+        ([env['PYTHONPATH']] if 'PYTHONPATH' in env else [])
+    )
+    output = subprocess.check_output(
+        [sys.executable, '-c', statement + '; import sys; print(" ".join(sys.modules))'],
+        env=env
+    )
+    return set(output.decode().split())
+
+def test_import_lazy():
+    modules = _imported_modules('import tbmodels')
+    assert 'numpy' not in modules
+    assert 'scipy' not in modules
+    assert 'tbmodels._tb_model' not in modules
+
+@pytest.mark.parametrize('statement', [
+    'import tbmodels; tbmodels.Model(on_site=[1, -1], dim=3).hamilton([0, 0, 0])',
+    'import tbmodels; tbmodels.Model(size=2, dim=3, sparse=True)',
+    'import tbmodels; tbmodels.helpers',
+])
+def test_no_scipy_linalg(statement):
+    modules = _imported_modules(statement)
+    assert 'scipy.linalg' not in modules
+    assert 'scipy.sparse.csgraph' not in modules
+
+def test_no_threadpoolctl():
+    modules = _imported_modules('import tbmodels; tbmodels.parallel; tbmodels.DisorderEnsemble')
+    assert 'tbmodels._ptools.parallel' in modules
+    assert 'threadpoolctl' not in modules
+
+def test_all():
+    for name in tbmodels.__all__:
+        assert hasattr(tbmodels, name)
+    assert set(tbmodels.__all__) <= set(dir(tbmodels))
+
+def test_star_import():
+    namespace = dict()
+    exec('from tbmodels import *', namespace)
+    assert namespace['Model'] is tbmodels.Model
+    assert namespace['helpers'] is tbmodels.helpers
+
+def test_invalid_attribute():
+    with pytest.raises(AttributeError):
+        tbmodels.invalid_attribute
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+
+import pytest
+import numpy as np
+
+from parameters import T_VALUES, KPT
+
+@pytest.mark.parametrize('t', T_VALUES)
+def test_consistency(t, get_model):
+    model1 = get_model(*t)
+    model2 = get_model(*t)
+    model2.set_k_cache()
+    for _ in range(2):
+        for k in KPT:
+            assert np.allclose(model1.hamilton(k), model2.hamilton(k))
+            assert np.allclose(model1.eigenval(k), model2.eigenval(k))
+    info = model2.k_cache_info()
+    assert info.hits == 2 * len(KPT)
+    assert info.currsize == 2 * len(KPT)
+
+def test_disabled(get_model):
+    model = get_model(0.1, 0.2)
+    assert model.k_cache_info() is None
+    model.set_k_cache()
+    model.set_k_cache(0)
+    model.hamilton(KPT[0])
+    assert model.k_cache_info() is None
+
+def test_maxsize(get_model):
+    model = get_model(0.1, 0.2)
+    model.set_k_cache(2)
+    for k in KPT:
+        model.hamilton(k)
+    model.hamilton(KPT[0])
+    info = model.k_cache_info()
+    assert info.currsize == 2
+    assert info.hits == 0
+    model.hamilton(KPT[0])
+    assert model.k_cache_info().hits == 1
+
+def test_eigenval_revisit(get_model):
+    model = get_model(0.1, 0.2)
+    model.set_k_cache(len(KPT))
+    for _ in range(2):
+        for k in KPT:
+            model.eigenval(k)
+    info = model.k_cache_info()
+    assert info.hits == len(KPT)
+    assert info.misses == len(KPT)
+    assert info.currsize == len(KPT)
+
+def test_rounding(get_model):
+    model = get_model(0.1, 0.2)
+    model.set_k_cache(decimals=6)
+    model.eigenval([0.1, 0.2, 0.3])
+    model.eigenval([0.1 + 1e-9, 0.2, 0.3])
+    assert model.k_cache_info().hits == 1
+
+def test_result_copy(get_model):
+    model = get_model(0.1, 0.2)
+    model.set_k_cache()
+    ham = model.hamilton(KPT[0])
+    ham[:] = 0
+    assert not np.allclose(model.hamilton(KPT[0]), 0)
+
+@pytest.mark.parametrize('modify', [
+    lambda m: m.add_hop(0.3, 0, 1, (1, 0, 0)),
+    lambda m: m.add_on_site((1, 2)),
+    lambda m: m.set_sparse(not m._sparse),
+])
+def test_invalidate(get_model, modify):
+    model = get_model(0.1, 0.2)
+    model.set_k_cache()
+    model.hamilton(KPT[1])
+    modify(model)
+    assert model.k_cache_info().currsize == 0
+    model_ref = get_model(0.1, 0.2)
+    modify(model_ref)
+    assert np.allclose(model.hamilton(KPT[1]), model_ref.hamilton(KPT[1]))
+
+@pytest.mark.parametrize('modify', [
+    lambda m: m.add_hop(0.3, 0, 1, (1, 0, 0)),
+    lambda m: m.add_on_site((1, 2)),
+])
+def test_sparse_scatter(get_model, monkeypatch, modify):
+    model = get_model(0.1, 0.2, sparse=True)
+    calls = []
+    compute = model._compute_sparse_scatter
+    monkeypatch.setattr(model, '_compute_sparse_scatter', lambda: calls.append(None) or compute())
+    for k in KPT:
+        model.hamilton(k)
+    assert len(calls) == 1
+    modify(model)
+    model_ref = get_model(0.1, 0.2, sparse=True)
+    modify(model_ref)
+    for k in KPT:
+        assert np.allclose(model.hamilton(k), model_ref.hamilton(k))
+    assert len(calls) == 2
+
+def test_pickle(get_model):
+    model = get_model(0.1, 0.2)
+    model.set_k_cache()
+    model.hamilton(KPT[0])
+    model2 = pickle.loads(pickle.dumps(model))
+    assert np.allclose(model.hamilton(KPT[0]), model2.hamilton(KPT[0]))
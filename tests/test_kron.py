@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import tbmodels
+import numpy as np
+import scipy.sparse
+
+from parameters import KPT
+
+SIGMA = [
+    np.eye(2),
+    np.array([[0, 1], [1, 0]]),
+    np.array([[0, -1j], [1j, 0]]),
+    np.array([[1, 0], [0, -1]])
+]
+
+@pytest.mark.parametrize('matrix', SIGMA + [np.diag([1, 2, 3])])
+def test_kron_matrix(get_model, sparse, matrix):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    res = model.kron(matrix)
+    assert res.size == model.size * len(matrix)
+    assert res._sparse == sparse
+    assert np.allclose(res.pos, np.repeat(model.pos, len(matrix), axis=0))
+    for k in KPT:
+        assert np.allclose(res.hamilton(k), np.kron(model.hamilton(k), matrix))
+
+def test_kron_sparse_matrix(get_model, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    res = model.kron(scipy.sparse.csr_matrix(SIGMA[1]))
+    for k in KPT:
+        assert np.allclose(res.hamilton(k), np.kron(model.hamilton(k), SIGMA[1]))
+
+@pytest.mark.parametrize('sparse_other', [True, False])
+def test_kron_model(get_model, sparse, sparse_other):
+    model1 = get_model(0.1, 0.2, sparse=sparse)
+    model2 = get_model(-0.3, 0.4, sparse=sparse_other, pos=[[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+    res = model1.kron(model2)
+    assert res.size == 4
+    assert res._sparse == sparse
+    assert np.allclose(res.pos, np.repeat(model1.pos, 2, axis=0))
+    for k in KPT:
+        assert np.allclose(res.hamilton(k), np.kron(model1.hamilton(k), model2.hamilton(k)))
+
+def test_kron_occ(get_model):
+    model = get_model(0.1, 0.2, occ=1)
+    assert model.kron(SIGMA[3]).occ is None
+    assert model.kron(SIGMA[3], occ=2).occ == 2
+
+def test_kron_invalid(get_model):
+    model = get_model(0.1, 0.2)
+    with pytest.raises(ValueError):
+        model.kron(np.ones((2, 3)))
+    with pytest.raises(ValueError):
+        model.kron(np.array([[0, 1], [0, 0]]))
+    with pytest.raises(ValueError):
+        model.kron(tbmodels.Model(size=2, dim=2))
+
+def test_add_spin(get_model, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse, occ=1)
+    res = model.add_spin()
+    assert res.occ == 2
+    for k in KPT:
+        assert np.allclose(res.hamilton(k), np.kron(model.hamilton(k), np.eye(2)))
+        assert np.allclose(res.eigenval(k), np.repeat(model.eigenval(k), 2))
+
+def test_add_spin_sparse_storage():
+    model = tbmodels.Model(on_site=np.arange(200), dim=1, sparse=True)
+    model.add_hops(np.ones(200), np.arange(200), np.roll(np.arange(200), 1), np.ones((200, 1), dtype=int))
+    res = model.add_spin()
+    for R, mat in model.hop.items():
+        assert res.hop[R].nnz == 2 * mat.nnz
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+from fractions import Fraction
+
+import pytest
+import tbmodels
+import numpy as np
+
+@pytest.fixture
+def square_lattice(sparse):
+    def inner(pos=(0, 0), **kwargs):
+        model = tbmodels.Model(size=1, dim=2, pos=[pos], occ=1, sparse=sparse, **kwargs)
+        model.add_hop(1., 0, 0, [1, 0])
+        model.add_hop(1., 0, 0, [0, 1])
+        return model
+    return inner
+
+def plaquette_fluxes(model, flux, supercell_size=None):
+    """
+    Returns the set of fluxes through the plaquettes of a square lattice model in a magnetic field, computed from the hopping phases of a finite cluster.
+    """
+    res = model.with_magnetic_field(flux, supercell_size=supercell_size)
+    cluster, positions = res.finite_cluster(
+        lambda pos: np.ones(len(pos), dtype=bool),
+        [(0, 3), (0, 4)],
+        return_positions=True
+    )
+    H = cluster.hamilton(())
+    coordinates = np.round(
+        (positions - res.pos[0]) * [res.size, 1]
+    ).astype(int)
+    index = {tuple(x): i for i, x in enumerate(coordinates.tolist())}
+    fluxes = []
+    for x, y in index.keys():
+        loop = [(x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1), (x, y)]
+        if all(point in index for point in loop):
+            product = np.prod([H[index[a], index[b]] for a, b in zip(loop[:-1], loop[1:])])
+            fluxes.append(np.angle(product) / (2 * np.pi))
+    assert fluxes
+    return np.array(fluxes)
+
+@pytest.mark.parametrize('pos', [(0, 0), (0.3, 0.45), (0.7, 0.2)])
+@pytest.mark.parametrize('flux,supercell_size', [(1 / 3, None), (0.4, None), (Fraction(1, 3), 6), (-0.25, None)])
+def test_plaquette_flux(square_lattice, pos, flux, supercell_size):
+    fluxes = plaquette_fluxes(square_lattice(pos), flux, supercell_size=supercell_size)
+    assert np.allclose(np.exp(2j * np.pi * fluxes), np.exp(2j * np.pi * float(flux)))
+
+def test_hofstadter_half_flux(square_lattice):
+    res = square_lattice().with_magnetic_field(0.5)
+    assert res.size == 2
+    assert res.occ == 2
+    eigenvals = np.array([res.eigenval(k) for k in itertools.product(np.linspace(0, 1, 11), repeat=2)])
+    # E(k) = +- 2 sqrt(cos^2(kx) + cos^2(ky)) in the magnetic Brillouin zone
+    assert np.isclose(np.max(eigenvals), 2 * np.sqrt(2))
+
+def test_zero_flux(square_lattice):
+    model = square_lattice()
+    res = model.with_magnetic_field(0, supercell_size=3)
+    assert res.size == 3
+    for k in [(0.13, 0.27), (0.5, 0.)]:
+        expected = np.sort(np.concatenate([model.eigenval([(k[0] + n) / 3, k[1]]) for n in range(3)]))
+        assert np.allclose(res.eigenval(k), expected)
+
+@pytest.mark.parametrize('pos', [(0, 0), (0.3, 0.45)])
+def test_supercell_size(square_lattice, pos):
+    model = square_lattice(pos)
+    res_small = model.with_magnetic_field(1 / 3)
+    res_large = model.with_magnetic_field(1 / 3, supercell_size=6)
+    for k in [(0.13, 0.27), (0.5, 0.)]:
+        expected = np.sort(np.concatenate([res_small.eigenval([(k[0] + n) / 2, k[1]]) for n in range(2)]))
+        assert np.allclose(res_large.eigenval(k), expected)
+
+def test_flux_periodic(square_lattice):
+    # for orbitals away from the lattice points, the spectra differ by a shift in k
+    model = square_lattice()
+    for k in [(0.13, 0.27), (0.5, 0.)]:
+        assert np.allclose(
+            model.with_magnetic_field(1 / 3).eigenval(k),
+            model.with_magnetic_field(4 / 3).eigenval(k)
+        )
+
+def test_uc_and_pos(square_lattice):
+    res = square_lattice((0.5, 0.5), uc=[[1, 0], [0, 2]]).with_magnetic_field(0.25, axes=(1, 0))
+    assert np.allclose(res.uc, [[1, 0], [0, 8]])
+    assert np.allclose(res.pos, [[0.5, 0.125], [0.5, 0.375], [0.5, 0.625], [0.5, 0.875]])
+
+def test_3d(get_model, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    res = model.with_magnetic_field(0.5, axes=(2, 0))
+    assert res.size == 4
+    assert res.dim == 3
+    assert res._sparse == sparse
+    zero_field = model.with_magnetic_field(0, supercell_size=2, axes=(2, 0))
+    for k in [(0.1, 0.2, 0.3), (0, 0, 0)]:
+        expected = np.sort(np.concatenate([model.eigenval([k[0], k[1], (k[2] + n) / 2]) for n in range(2)]))
+        assert np.allclose(zero_field.eigenval(k), expected)
+
+def test_cache(square_lattice):
+    model = square_lattice((0.3, 0.45))
+    res_1 = model.with_magnetic_field(Fraction(1, 4), supercell_size=4)
+    cached = model._derived_data[('peierls', 4, (0, 1))]
+    res_2 = model.with_magnetic_field(Fraction(3, 4), supercell_size=4)
+    assert model._derived_data[('peierls', 4, (0, 1))] is cached
+    assert not np.allclose(res_1.eigenval([0.1, 0.2]), res_2.eigenval([0.3, 0.2]))
+    model.add_hop(0.5, 0, 0, [1, 1])
+    assert ('peierls', 4, (0, 1)) not in model._derived_data
+    res_3 = model.with_magnetic_field(Fraction(1, 4), supercell_size=4)
+    assert not np.allclose(res_1.eigenval([0.1, 0.2]), res_3.eigenval([0.1, 0.2]))
+
+def test_frozen(square_lattice):
+    model = square_lattice((0.3, 0.45))
+    res = model.freeze().with_magnetic_field(1 / 3)
+    assert np.allclose(res.eigenval([0.1, 0.2]), model.with_magnetic_field(1 / 3).eigenval([0.1, 0.2]))
+
+@pytest.mark.parametrize('kwargs', [
+    dict(flux=0.5, gauge='symmetric'),
+    dict(flux=0.5, axes=(0, 0)),
+    dict(flux=0.5, axes=(0, 2)),
+    dict(flux=0.5, supercell_size=3),
+    dict(flux=np.pi / 10),
+])
+def test_invalid(square_lattice, kwargs):
+    with pytest.raises(ValueError):
+        square_lattice().with_magnetic_field(**kwargs)
+
+def test_invalid_dim():
+    with pytest.raises(ValueError):
+        tbmodels.Model(on_site=[1], dim=1).with_magnetic_field(0.5)
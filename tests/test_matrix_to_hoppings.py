@@ -19,3 +19,50 @@ def test_consistency(get_model_clean, models_equal, sparse):
         
     model2 = tbmodels.Model.from_hop_list(size=2, hop_list=hoppings, contains_cc=False, occ=1, pos=((0.,) * 3, (0.5, 0.5, 0.)), sparse=sparse)
     models_equal(model1, model2)
+
+def test_structured_array(get_model_clean, models_equal, sparse):
+    model1 = get_model_clean(0.1, 0.2, sparse=sparse)
+    hoppings = np.concatenate([
+        tbmodels.helpers.matrix_to_hop_array(np.array(v), R=k)
+        for k, v in model1.hop.items()
+    ])
+    model2 = tbmodels.Model.from_hop_list(size=2, hop_list=hoppings, contains_cc=False, occ=1, pos=((0.,) * 3, (0.5, 0.5, 0.)), sparse=sparse)
+    models_equal(model1, model2)
+
+def test_hop_list():
+    hoppings = tbmodels.helpers.matrix_to_hop([[0, 1j], [0, 2]], orbitals=[3, 5], R=(1, 0), multiplier=2.)
+    assert isinstance(hoppings, list)
+    assert len(hoppings) == 4
+    hoppings = hoppings + tbmodels.helpers.matrix_to_hop([[1]])
+    assert len(hoppings) == 5
+    t, orbital_1, orbital_2, R = hoppings[1]
+    assert t == 2j
+    assert (orbital_1, orbital_2) == (3, 5)
+    assert tuple(R) == (1, 0)
+
+def test_skip_zeros():
+    hoppings = tbmodels.helpers.matrix_to_hop_array([[0, 1j], [0, 2]], orbitals=[3, 5], R=(1, 0), multiplier=2.)
+    assert len(hoppings) == 2
+    t, orbital_1, orbital_2, R = hoppings[0]
+    assert t == 2j
+    assert (orbital_1, orbital_2) == (3, 5)
+    assert tuple(R) == (1, 0)
+    assert np.all(hoppings['R'] == [[1, 0], [1, 0]])
+
+def test_hop_array(get_model, models_close, sparse):
+    hop_list = [
+        [0.1, 0, 1, (0, 0, 0)],
+        [0.2j, 1, 1, (1, 0, 0)],
+        [-0.3, 0, 1, (0, -1, 1)],
+    ]
+    t, orbital_1, orbital_2, R = zip(*hop_list)
+    hoppings = tbmodels.helpers.hop_array(t, orbital_1, orbital_2, R)
+    kwargs = dict(size=2, contains_cc=False, pos=((0.,) * 3, (0.5, 0.5, 0.)), sparse=sparse)
+    models_close(
+        tbmodels.Model.from_hop_list(hop_list=hop_list, **kwargs),
+        tbmodels.Model.from_hop_list(hop_list=hoppings, **kwargs)
+    )
+
+def test_hop_array_invalid_R():
+    with pytest.raises(ValueError):
+        tbmodels.helpers.hop_array([0.1, 0.2], [0, 1], [1, 0], [0, 0, 0])
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import tempfile
+import itertools
+
+import pytest
+import tbmodels
+import numpy as np
+
+MESH = (3, 4, 2)
+
+@pytest.fixture
+def mesh_kpoints():
+    # the k-points are ordered as the C-order of the mesh
+    return np.array(list(itertools.product(*[np.arange(n) / n for n in MESH])))
+
+@pytest.fixture
+def tmpdir_name():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield os.path.join(tmpdir, 'results')
+
+@pytest.fixture
+def hdf5_file():
+    h5py = pytest.importorskip('h5py')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with h5py.File(os.path.join(tmpdir, 'results.hdf5'), 'w') as f:
+            yield f
+
+@pytest.fixture(params=['npy', 'hdf5'])
+def target(request):
+    """
+    Returns the target and a function which reads the results from it.
+    """
+    if request.param == 'npy':
+        directory = request.getfixturevalue('tmpdir_name')
+        return directory, lambda name: np.load(os.path.join(directory, name + '.npy'))
+    group = request.getfixturevalue('hdf5_file').create_group('mesh')
+    return group, lambda name: group[name][()]
+
+def interrupt_after(model, num_calls):
+    """
+    Makes the Hamiltonian evaluation of a model fail after the given number of calls, and returns the list of evaluated k-points.
+    """
+    evaluated = []
+    hamilton_block = model._hamilton_block
+
+    def inner(kpoints, batch_operator):
+        if len(evaluated) >= num_calls:
+            raise RuntimeError('interrupted')
+        evaluated.append(kpoints)
+        return hamilton_block(kpoints, batch_operator)
+    model._hamilton_block = inner
+    return evaluated
+
+@pytest.mark.parametrize('chunk_size', [None, 1, 7])
+def test_eigenval(get_model, sparse, target, mesh_kpoints, chunk_size):
+    target, read = target
+    model = get_model(0.1, 0.2, sparse=sparse)
+    model.eigenval_mesh_to_file(MESH, target, chunk_size=chunk_size)
+    eigenval = read('eigenval')
+    assert eigenval.shape == (len(mesh_kpoints), model.size)
+    assert np.allclose(eigenval, model.eigenval_batch(mesh_kpoints))
+
+def test_eigenvec(get_model, target, mesh_kpoints):
+    target, read = target
+    model = get_model(0.1, 0.2)
+    model.eigenval_mesh_to_file(MESH, target, eigenvectors=True, chunk_size=5)
+    eigenval = read('eigenval')
+    eigenvec = read('eigenvec')
+    for k, val, vec in zip(mesh_kpoints, eigenval, eigenvec):
+        assert np.allclose(np.dot(model.hamilton(k), vec), vec * val)
+        assert np.allclose(np.dot(vec.conjugate().T, vec), np.eye(model.size))
+
+def test_dtype(get_model, target, mesh_kpoints):
+    target, read = target
+    model = get_model(0.1, 0.2)
+    model.eigenval_mesh_to_file(MESH, target, eigenvectors=True, dtype=np.complex64)
+    assert read('eigenval').dtype == np.float32
+    assert read('eigenvec').dtype == np.complex64
+    assert np.allclose(read('eigenval'), model.eigenval_batch(mesh_kpoints), atol=1e-5)
+
+def test_resume(get_model, target, mesh_kpoints):
+    target, read = target
+    model = get_model(0.1, 0.2)
+    interrupt_after(model, 3)
+    with pytest.raises(RuntimeError):
+        model.eigenval_mesh_to_file(MESH, target, chunk_size=4, num_threads=1)
+
+    model = get_model(0.1, 0.2)
+    evaluated = interrupt_after(model, len(mesh_kpoints))
+    model.eigenval_mesh_to_file(MESH, target, chunk_size=4, num_threads=1)
+    # only the chunks which were not completed are evaluated
+    assert np.allclose(np.concatenate(evaluated), mesh_kpoints[12:])
+    assert np.allclose(read('eigenval'), model.eigenval_batch(mesh_kpoints))
+
+    # a completed calculation is not repeated
+    evaluated.clear()
+    model.eigenval_mesh_to_file(MESH, target, chunk_size=4, num_threads=1)
+    assert not evaluated
+
+def test_no_resume(get_model, target, mesh_kpoints):
+    target, read = target
+    get_model(0.1, 0.2).eigenval_mesh_to_file(MESH, target)
+    model = get_model(0.3, 0.2)
+    model.eigenval_mesh_to_file(MESH, target, resume=False)
+    assert np.allclose(read('eigenval'), model.eigenval_batch(mesh_kpoints))
+
+@pytest.mark.parametrize('kwargs', [
+    dict(t1=0.3),
+    dict(mesh=(3, 4, 3)),
+    dict(eigenvectors=True),
+    dict(dtype=np.complex64),
+])
+def test_resume_mismatch(get_model, target, kwargs):
+    target, _ = target
+    kwargs = dict(kwargs)
+    get_model(0.1, 0.2).eigenval_mesh_to_file(MESH, target)
+    model = get_model(kwargs.pop('t1', 0.1), 0.2)
+    with pytest.raises(ValueError):
+        model.eigenval_mesh_to_file(kwargs.pop('mesh', MESH), target, **kwargs)
+
+def test_progress_file(get_model, tmpdir_name):
+    model = get_model(0.1, 0.2)
+    model.eigenval_mesh_to_file(MESH, tmpdir_name, chunk_size=5)
+    with open(os.path.join(tmpdir_name, 'progress.json'), 'r') as f:
+        progress = json.load(f)
+    assert progress['num_completed'] == np.prod(MESH)
+    assert progress['metadata']['mesh'] == list(MESH)
+    assert not os.path.exists(os.path.join(tmpdir_name, 'eigenvec.npy'))
+
+def test_two_dimensional(target):
+    target, read = target
+    model = tbmodels.Model(size=1, dim=2, pos=[[0, 0]], occ=1)
+    model.add_hop(1., 0, 0, [1, 0])
+    model.add_hop(1., 0, 0, [0, 1])
+    model.eigenval_mesh_to_file((4, 4), target)
+    eigenval = read('eigenval').reshape(4, 4)
+    kx, ky = np.meshgrid(np.arange(4) / 4, np.arange(4) / 4, indexing='ij')
+    assert np.allclose(eigenval, 2 * np.cos(2 * np.pi * kx) + 2 * np.cos(2 * np.pi * ky))
+
+@pytest.mark.parametrize('mesh', [(3, 4), (3, 0, 2)])
+def test_invalid_mesh(get_model, tmpdir_name, mesh):
+    with pytest.raises(ValueError):
+        get_model(0.1, 0.2).eigenval_mesh_to_file(mesh, tmpdir_name)
+
+def test_invalid_chunk_size(get_model, tmpdir_name):
+    with pytest.raises(ValueError):
+        get_model(0.1, 0.2).eigenval_mesh_to_file(MESH, tmpdir_name, chunk_size=0)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import time
+
+import pytest
+import tbmodels
+from tbmodels import monitoring
+
+from parameters import KPT
+
+@pytest.fixture
+def clean_monitoring():
+    monitoring.disable()
+    monitoring.reset()
+    yield
+    monitoring.disable()
+    monitoring.reset()
+
+def test_timer(clean_monitoring, capsys):
+    with monitoring.Timer('block') as timer:
+        time.sleep(0.01)
+    assert timer.elapsed >= 0.01
+    assert capsys.readouterr().out == ''
+    stat = monitoring.get_statistics()['block']
+    assert stat.calls == 1
+    assert stat.total_time == timer.elapsed
+
+def test_timer_verbose(clean_monitoring, capsys):
+    with monitoring.Timer('block', verbose=True):
+        pass
+    assert 'block' in capsys.readouterr().out
+    assert monitoring.get_statistics()['block'].calls == 1
+
+def test_timer_decorator(clean_monitoring):
+    @monitoring.Timer('fct')
+    def fct(x):
+        return 2 * x
+    assert fct(3) == 6
+    assert fct(4) == 8
+    assert monitoring.get_statistics()['fct'].calls == 2
+
+def test_methods(clean_monitoring, get_model):
+    monitoring.enable()
+    assert monitoring.is_enabled()
+    model = get_model(0.1, 0.2)
+    for k in KPT:
+        model.hamilton(k)
+        model.eigenval(k)
+    tbmodels.Model.from_json(model.to_json())
+    stats = monitoring.get_statistics()
+    assert stats['Model.eigenval'].calls == len(KPT)
+    assert stats['Model.hamilton'].calls == len(KPT)
+    assert stats['Model.__init__'].calls == 2
+    assert stats['Model.to_json'].calls == 1
+    assert stats['Model.from_json'].calls == 1
+    out = io.StringIO()
+    res = monitoring.report(file=out)
+    assert out.getvalue().strip() == res
+    assert 'Model.hamilton' in res
+
+def test_disable(clean_monitoring, get_model):
+    original = tbmodels.Model.__dict__['hamilton']
+    monitoring.enable()
+    assert tbmodels.Model.__dict__['hamilton'] is not original
+    monitoring.disable()
+    assert tbmodels.Model.__dict__['hamilton'] is original
+    get_model(0.1, 0.2).hamilton(KPT[0])
+    assert monitoring.get_statistics() == {}
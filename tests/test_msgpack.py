@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import tempfile
+
+import pytest
+import tbmodels
+import numpy as np
+
+from tbmodels.helpers import decode, msgpack_default, msgpack_ext_hook
+
+msgpack = pytest.importorskip('msgpack')
+
+KWARGS = [
+    dict(),
+    dict(pos=None, dim=3),
+    dict(uc=3 * np.eye(3)),
+    dict(pos=np.zeros((2, 3)), uc=np.eye(3)),
+    dict(sparse='auto'),
+    dict(dtype=np.complex64)
+]
+
+@pytest.mark.parametrize('kwargs', KWARGS)
+def test_msgpack_consistency(get_model, models_equal, sparse, kwargs):
+    model1 = get_model(0.1, 0.2, **dict(dict(sparse=sparse), **kwargs))
+    model2 = tbmodels.Model.from_msgpack(model1.to_msgpack())
+    models_equal(model1, model2)
+    assert model1._get_sparse_setting() == model2._get_sparse_setting()
+    assert model1.dtype == model2.dtype
+
+@pytest.mark.parametrize('kwargs', KWARGS)
+def test_msgpack_consistency_file(get_model, models_equal, kwargs):
+    model1 = get_model(0.1, 0.2, **kwargs)
+    with tempfile.NamedTemporaryFile() as tmpf:
+        model1.to_msgpack_file(tmpf.name)
+        model2 = tbmodels.Model.from_msgpack_file(tmpf.name)
+    models_equal(model1, model2)
+
+def test_msgpack_json_equal(get_model, models_equal):
+    model = get_model(0.1, 0.2)
+    models_equal(
+        tbmodels.Model.from_msgpack(model.to_msgpack()),
+        tbmodels.Model.from_json(model.to_json())
+    )
+
+def test_msgpack_symmetries(get_model, models_equal):
+    model1 = get_model(0.1, 0.2)
+    model1.symmetries = [
+        tbmodels.SymmetryOperation(
+            rotation_matrix=-np.eye(3),
+            repr_matrix=np.array([[0, 1j], [-1j, 0]]),
+            repr_has_cc=True
+        )
+    ]
+    model2 = tbmodels.Model.from_msgpack(model1.to_msgpack())
+    assert len(model2.symmetries) == 1
+    for attr in ['rotation_matrix', 'repr_matrix', 'translation_vector', 'repr_has_cc']:
+        assert np.all(getattr(model1.symmetries[0], attr) == getattr(model2.symmetries[0], attr))
+
+@pytest.mark.parametrize('arr', [
+    np.zeros((0, 3)),
+    np.array(1.5 + 2j),
+    np.arange(6, dtype='>i4').reshape(2, 3),
+    (np.arange(12) * 1j).reshape(3, 4)[:, ::2],
+    np.array([True, False])
+])
+def test_array_roundtrip(arr):
+    res = msgpack.unpackb(
+        msgpack.packb(arr, default=msgpack_default, use_bin_type=True),
+        ext_hook=msgpack_ext_hook
+    )
+    assert res.dtype == arr.dtype
+    assert res.shape == arr.shape
+    assert np.all(res == arr)
+    assert res.flags.writeable
+
+@pytest.mark.parametrize('obj', ['test_string', True, None, {'a': 2, 'b': 3}, 1 + 2j, np.int64(3)])
+def test_dumpload(obj):
+    res = msgpack.unpackb(
+        msgpack.packb(obj, default=msgpack_default, use_bin_type=True),
+        object_hook=decode,
+        ext_hook=msgpack_ext_hook,
+        raw=False
+    )
+    assert res == obj
+
+def test_unknown_ext_type():
+    res = msgpack_ext_hook(3, b'abc')
+    assert res == msgpack.ExtType(3, b'abc')
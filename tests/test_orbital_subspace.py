@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import pytest
+import tbmodels
+import numpy as np
+
+from parameters import KPT
+
+def effective_hamilton(model, k, orbitals, energy):
+    folded = [i for i in range(model.size) if i not in orbitals]
+    H = model.hamilton(k)
+    return H[np.ix_(orbitals, orbitals)] + np.dot(
+        H[np.ix_(orbitals, folded)],
+        np.linalg.solve(energy * np.eye(len(folded)) - H[np.ix_(folded, folded)], H[np.ix_(folded, orbitals)])
+    )
+
+@pytest.fixture
+def folding_model(sparse):
+    """
+    Model where the high-energy orbitals 2 and 3 have no hoppings among them, s.t. the effective model is short-ranged.
+    """
+    model = tbmodels.Model(
+        on_site=[0, 0.5, 10, 12],
+        dim=2,
+        pos=[[0, 0], [0.5, 0.5], [0.5, 0], [0, 0.5]],
+        occ=1,
+        sparse=sparse
+    )
+    model.add_hop(1., 0, 1, [1, 0])
+    model.add_hop(0.5, 0, 2, [0, 0])
+    model.add_hop(0.3j, 1, 3, [0, 1])
+    model.add_hop(0.2, 2, 1, [1, 1])
+    return model
+
+@pytest.mark.parametrize('orbitals', [[0], [1, 0], [0, 1]])
+def test_slice_orbitals(get_model, sparse, orbitals):
+    model = get_model(0.1, 0.2, sparse=sparse, occ=1)
+    res = model.slice_orbitals(orbitals)
+    assert res.size == len(orbitals)
+    assert res._sparse == sparse
+    assert res.occ is None
+    assert np.allclose(res.pos, model.pos[orbitals])
+    for k in KPT:
+        assert np.allclose(res.hamilton(k), model.hamilton(k)[np.ix_(orbitals, orbitals)])
+
+def test_slice_orbitals_occ(get_model):
+    res = get_model(0.1, 0.2).slice_orbitals([1], occ=1)
+    assert res.occ == 1
+
+def test_slice_orbitals_all(get_model, models_equal, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    models_equal(model, model.slice_orbitals([0, 1], occ=model.occ))
+
+@pytest.mark.parametrize('orbitals', [[2], [-1], [0, 0]])
+def test_slice_orbitals_invalid(get_model, orbitals):
+    with pytest.raises(ValueError):
+        get_model(0.1, 0.2).slice_orbitals(orbitals)
+
+@pytest.mark.parametrize('mesh', [(5, 5), (4, 6)])
+@pytest.mark.parametrize('orbitals', [[0, 1], [1, 0]])
+@pytest.mark.parametrize('energy', [0., 1.])
+def test_downfold_exact(folding_model, sparse, mesh, orbitals, energy):
+    res = folding_model.downfold(orbitals, mesh, energy=energy)
+    assert res.size == 2
+    assert res._sparse == sparse
+    assert np.allclose(res.pos, folding_model.pos[orbitals])
+    for k in itertools.product([0.1, 0.43, -0.3], [0.2, -0.17]):
+        assert np.allclose(res.hamilton(k), effective_hamilton(folding_model, k, orbitals, energy))
+
+def test_downfold_mesh(get_model, sparse):
+    # the effective model is exact at the k-points of the mesh
+    model = get_model(0.1, 0.2, sparse=sparse)
+    model.add_on_site([0, 5])
+    res = model.downfold([0], (3, 2, 4), energy=-1.)
+    for k in itertools.product([0, 1 / 3, 2 / 3], [0, 0.5], [0, 0.25, 0.5, 0.75]):
+        assert np.allclose(res.hamilton(k), effective_hamilton(model, k, [0], -1.))
+
+def test_downfold_cutoff(folding_model):
+    res = folding_model.downfold([0, 1], (5, 5), h_cutoff=1e-10)
+    assert len(res.hop) < 13
+    for k in KPT:
+        assert np.allclose(res.hamilton(k[:2]), effective_hamilton(folding_model, k[:2], [0, 1], 0.))
+
+def test_downfold_nothing(folding_model, models_equal):
+    models_equal(
+        folding_model.downfold([1, 0, 3, 2], (3, 3)),
+        folding_model.slice_orbitals([1, 0, 3, 2])
+    )
+
+def test_downfold_cluster(folding_model):
+    cluster = folding_model.finite_cluster(lambda pos: np.ones(len(pos), dtype=bool), [(0, 2), (0, 2)])
+    res = cluster.downfold([0, 1, 4, 5], ())
+    assert np.allclose(res.hamilton(()), effective_hamilton(cluster, (), [0, 1, 4, 5], 0.))
+
+@pytest.mark.parametrize('mesh', [(3, ), (3, 3, 3, 3), (0, 3)])
+def test_downfold_invalid_mesh(folding_model, mesh):
+    with pytest.raises(ValueError):
+        folding_model.downfold([0, 1], mesh)
@@ -27,3 +27,48 @@ def test_pickle_consistency(get_model, models_equal, kwargs):
     model2 = pickle.loads(pickle.dumps(model1))
     models_equal(model1, model2)
 
+
+@pytest.mark.parametrize('protocol', range(2, pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle_protocols(get_model, models_equal, sparse, protocol):
+    model1 = get_model(0.1, 0.2, sparse=sparse)
+    model2 = pickle.loads(pickle.dumps(model1, protocol=protocol))
+    models_equal(model1, model2)
+    for k in kpt:
+        assert np.allclose(model1.hamilton(k), model2.hamilton(k))
+
+@pytest.mark.skipif(pickle.HIGHEST_PROTOCOL < 5, reason='Out-of-band buffers require pickle protocol 5.')
+def test_pickle_out_of_band(get_model, models_equal, sparse):
+    model1 = get_model(0.1, 0.2, sparse=sparse)
+    buffers = []
+    data = pickle.dumps(model1, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) > 0
+    # the hopping data is not contained in the pickle stream
+    assert len(data) < sum(buf.raw().nbytes for buf in buffers)
+    model2 = pickle.loads(data, buffers=buffers)
+    models_equal(model1, model2)
+    # the hopping matrices reference the out-of-band buffers
+    arrays = [np.frombuffer(buf, dtype=np.uint8) for buf in buffers]
+    for mat in model2.hop.values():
+        if sparse:
+            for values in [mat.data, mat.indices]:
+                assert any(np.shares_memory(values, arr) for arr in arrays)
+        else:
+            assert any(np.shares_memory(mat, arr) for arr in arrays)
+    model2.add_hop(0.3, 0, 1, [1, 0, 0])
+    assert not np.allclose(model1.hamilton(kpt[0]), model2.hamilton(kpt[0]))
+
+def test_pickle_empty():
+    model1 = tbmodels.Model(size=2, dim=3)
+    model2 = pickle.loads(pickle.dumps(model1))
+    assert model2.size == 2
+    assert len(model2.hop) == 0
+    model2.add_hop(0.3, 0, 1, [1, 0, 0])
+
+@pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
+def test_pickle_attributes(get_model, dtype):
+    model1 = get_model(0.1, 0.2, sparse='auto', dtype=dtype)
+    model1.set_k_cache(10, decimals=5)
+    model2 = pickle.loads(pickle.dumps(model1))
+    assert model2.dtype == dtype
+    assert model2.sparse_info() == model1.sparse_info()
+    assert model2.k_cache_info().maxsize == 10
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import tempfile
+import multiprocessing
+
+import pytest
+import numpy as np
+
+import tbmodels
+
+from parameters import T_VALUES, KPT
+
+def _eigenval_worker(args):
+    shared_model, k = args
+    model = tbmodels.Model.from_shared_memory(shared_model)
+    return model.eigenval(k)
+
+@pytest.fixture(params=[False, True])
+def use_file(request):
+    return request.param
+
+@pytest.fixture
+def share(use_file):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'model.bin') if use_file else None
+        handles = []
+        def inner(model):
+            res = model.to_shared_memory(filename=filename)
+            handles.append(res)
+            return res
+        yield inner
+        for handle in handles:
+            handle.unlink()
+
+@pytest.mark.parametrize('t1,t2', T_VALUES)
+def test_shared_consistency(get_model, models_equal, share, t1, t2, sparse):
+    model = get_model(t1, t2, sparse=sparse)
+    shared_model = share(model)
+    model2 = tbmodels.Model.from_shared_memory(shared_model)
+    models_equal(model, model2)
+    for k in KPT:
+        assert np.allclose(model.hamilton(k), model2.hamilton(k))
+
+def test_read_only(get_model, share, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    model2 = tbmodels.Model.from_shared_memory(share(model))
+    with pytest.raises(ValueError):
+        model2.add_hop(0.1, 0, 1, [1, 0, 0])
+    with pytest.raises(ValueError):
+        model2.set_sparse(not sparse)
+    if not sparse:
+        with pytest.raises(ValueError):
+            model2.hop[(0, 0, 0)][0, 0] = 1.
+
+def test_no_copy(get_model, share, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    model2 = tbmodels.Model.from_shared_memory(share(model))
+    for mat in model2.hop.values():
+        if sparse:
+            assert not mat.data.flags.owndata
+            assert not mat.indices.flags.owndata
+        else:
+            assert not mat.flags.owndata
+
+def test_write_shared_buffer(get_model, share, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    shared_model = share(model)
+    model2 = tbmodels.Model.from_shared_memory(shared_model)
+    # attach to the buffer with write access, and double all hoppings
+    if shared_model.filename is None:
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name=shared_model.name)
+        buffer = shm.buf
+    else:
+        shm = None
+        buffer = np.memmap(shared_model.filename, dtype=np.uint8, mode='r+', shape=(shared_model.nbytes, ))
+    for key, dtype, shape, offset in shared_model._layout:
+        if key in ('hop', 'data'):
+            arr = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            arr *= 2
+            del arr
+    del buffer
+    if shm is not None:
+        shm.close()
+    for k in KPT:
+        assert np.allclose(model2.hamilton(k), 2 * model.hamilton(k))
+
+def test_pickle_handle(get_model, models_equal, share, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    shared_model = pickle.loads(pickle.dumps(share(model)))
+    model2 = tbmodels.Model.from_shared_memory(shared_model)
+    models_equal(model, model2)
+    model3 = pickle.loads(pickle.dumps(model2))
+    models_equal(model, model3)
+
+def test_derived_model(get_model, models_close, share):
+    model = get_model(0.1, 0.2)
+    model2 = tbmodels.Model.from_shared_memory(share(model))
+    models_close(2 * model, 2 * model2)
+    (model2 + model2).add_hop(0.1, 0, 1, [1, 0, 0])
+
+def test_complex64(get_model, share, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse, dtype=np.complex64)
+    model2 = tbmodels.Model.from_shared_memory(share(model))
+    assert model2.dtype == np.complex64
+    assert np.allclose(model.hamilton(KPT[0]), model2.hamilton(KPT[0]))
+
+def test_pool(get_model, share, sparse):
+    model = get_model(0.1, 0.2, sparse=sparse)
+    shared_model = share(model)
+    with multiprocessing.Pool(2) as pool:
+        res = pool.map(_eigenval_worker, [(shared_model, k) for k in KPT])
+    for k, eigenval in zip(KPT, res):
+        assert np.allclose(eigenval, model.eigenval(k))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import tbmodels
+import numpy as np
+
+from parameters import KPT
+
+def get_large_model(density, sparse='auto'):
+    size = tbmodels.Model.AUTO_SPARSE_MIN_SIZE
+    rng = np.random.RandomState(0)
+    mat = rng.normal(size=(size, size)) * (rng.uniform(size=(size, size)) < density)
+    return tbmodels.Model(hop={(1, 0, 0): mat, (0, 0, 0): mat + mat.T}, contains_cc=False, sparse=sparse)
+
+def test_small_model(get_model):
+    model = get_model(0.1, 0.2, sparse='auto')
+    info = model.sparse_info()
+    assert not info['sparse']
+    assert info['auto']
+    assert info['size'] == 2
+
+def test_dense_large_model():
+    model = get_large_model(density=0.5)
+    assert not model._sparse
+    assert model.sparse_info()['density'] > tbmodels.Model.AUTO_SPARSE_MAX_DENSITY
+
+def test_sparse_large_model():
+    model = get_large_model(density=0.01)
+    assert model._sparse
+    assert 0 < model.get_density() < tbmodels.Model.AUTO_SPARSE_MAX_DENSITY
+    model_dense = get_large_model(density=0.01, sparse=False)
+    assert model.get_density() == model_dense.get_density()
+    for k in KPT:
+        assert np.allclose(model.hamilton(k), model_dense.hamilton(k))
+
+def test_reevaluate():
+    model = get_large_model(density=0.5, sparse=True)
+    assert not model.sparse_info()['auto']
+    model.set_sparse('auto')
+    assert not model._sparse
+    assert model.sparse_info()['auto']
+
+def test_derived_models():
+    model = get_large_model(density=0.01)
+    assert (2 * model).sparse_info()['auto']
+    assert tbmodels.Model.from_json(model.to_json()).sparse_info()['auto']
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        tbmodels.Model(size=2, dim=3, sparse='yes')
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import pytest
+import tbmodels
+import numpy as np
+
+from parameters import KPT
+
+C4Z_SCALAR = tbmodels.SymmetryOperation([[0, -1, 0], [1, 0, 0], [0, 0, 1]], [[1]])
+C4X_SCALAR = tbmodels.SymmetryOperation([[1, 0, 0], [0, 0, -1], [0, 1, 0]], [[1]])
+INV_SCALAR = tbmodels.SymmetryOperation(-np.eye(3), [[1]])
+
+C4Z_P = tbmodels.SymmetryOperation([[0, -1, 0], [1, 0, 0], [0, 0, 1]], np.kron(np.eye(2), [[0, -1], [1, 0]]))
+INV_P = tbmodels.SymmetryOperation(-np.eye(3), -np.eye(4))
+TRS_P = tbmodels.SymmetryOperation(np.eye(3), np.eye(4), repr_has_cc=True)
+
+def get_random_model(size, dim=3, sparse=False, **kwargs):
+    rng = np.random.RandomState(42)
+    model = tbmodels.Model(size=size, dim=dim, sparse=sparse, **kwargs)
+    for R in itertools.product([-1, 0, 1], repeat=dim):
+        for i, j in itertools.product(range(size), repeat=2):
+            model.add_hop(rng.normal() + 1j * rng.normal(), i, j, R)
+    return model
+
+def check_symmetric(model, symmetry_operations):
+    for k in KPT:
+        k = np.array(k[:model.dim])
+        for op in symmetry_operations:
+            assert np.allclose(model.eigenval(k), model.eigenval(np.dot(op.k_matrix, k)))
+
+def test_cubic(sparse):
+    model = get_random_model(1, sparse=sparse)
+    symmetries = [C4Z_SCALAR, C4X_SCALAR, INV_SCALAR]
+    model_sym = model.symmetrize(symmetries)
+    check_symmetric(model_sym, symmetries)
+    assert model_sym.symmetries == symmetries
+    assert model_sym._sparse == sparse
+
+def test_sublattices(sparse):
+    model = get_random_model(4, sparse=sparse, pos=[[0, 0, 0]] * 2 + [[0.5, 0.5, 0]] * 2)
+    symmetries = [C4Z_P, INV_P, TRS_P]
+    model_sym = model.symmetrize(symmetries)
+    check_symmetric(model_sym, symmetries)
+    # symmetrizing twice does not change the model
+    model_sym_2 = model_sym.symmetrize(symmetries)
+    for k in KPT:
+        assert np.allclose(model_sym.hamilton(k), model_sym_2.hamilton(k))
+
+def test_full_group():
+    model = get_random_model(4, pos=[[0, 0, 0]] * 2 + [[0.5, 0.5, 0]] * 2)
+    identity = tbmodels.SymmetryOperation(np.eye(3), np.eye(4))
+    model_full = model.symmetrize([identity, INV_P], full_group=True)
+    model_gen = model.symmetrize([INV_P])
+    check_symmetric(model_full, [INV_P])
+    for k in KPT:
+        assert np.allclose(model_full.hamilton(k), model_gen.hamilton(k))
+
+def test_non_monomial():
+    # p_x, p_y orbitals on a hexagonal lattice, with a C3 rotation
+    angle = 2 * np.pi / 3
+    c3 = tbmodels.SymmetryOperation(
+        [[0, -1], [1, -1]],
+        [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]
+    )
+    model = get_random_model(2, dim=2, uc=[[1, 0], [0.5, np.sqrt(3) / 2]])
+    model_sym = model.symmetrize([c3])
+    check_symmetric(model_sym, [c3])
+
+def test_non_monomial_sublattices():
+    # p_x, p_y orbitals on the two sites of a honeycomb lattice, which are
+    # mapped onto themselves up to a lattice vector by the C3 rotation
+    angle = 2 * np.pi / 3
+    c3 = tbmodels.SymmetryOperation(
+        [[0, -1], [1, -1]],
+        np.kron(np.eye(2), [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    )
+    model = get_random_model(
+        4, dim=2, uc=[[1, 0], [0.5, np.sqrt(3) / 2]],
+        pos=[[0, 0]] * 2 + [[1. / 3, 2. / 3]] * 2
+    )
+    model_sym = model.symmetrize([c3])
+    check_symmetric(model_sym, [c3])
+    model_sym_2 = model_sym.symmetrize([c3])
+    for k in KPT:
+        assert np.allclose(model_sym.hamilton(k[:2]), model_sym_2.hamilton(k[:2]))
+
+def test_inconsistent_positions():
+    model = get_random_model(2, pos=[[0, 0, 0], [0.2, 0.1, 0]])
+    with pytest.raises(ValueError):
+        model.symmetrize([tbmodels.SymmetryOperation(-np.eye(3), np.eye(2))])
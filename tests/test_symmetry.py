@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import tbmodels
+import numpy as np
+
+C4Z = tbmodels.SymmetryOperation([[0, -1, 0], [1, 0, 0], [0, 0, 1]], [[1]])
+C4X = tbmodels.SymmetryOperation([[1, 0, 0], [0, 0, -1], [0, 1, 0]], [[1]])
+INV = tbmodels.SymmetryOperation(-np.eye(3), [[1]])
+
+@pytest.fixture
+def cubic_model(sparse):
+    model = tbmodels.Model(size=1, dim=3, on_site=[0.3], uc=np.eye(3), symmetries=[C4Z, C4X, INV], sparse=sparse)
+    for R in np.eye(3, dtype=int):
+        model.add_hop(-1., 0, 0, R)
+    for R in [(1, 1, 0), (1, -1, 0), (1, 0, 1), (1, 0, -1), (0, 1, 1), (0, 1, -1)]:
+        model.add_hop(0.2, 0, 0, R)
+    return model
+
+@pytest.mark.parametrize('mesh,shift,num_irred', [
+    ([8, 8, 8], None, 35),
+    ([8, 8, 8], [0.5] * 3, 20),
+    ([4, 4, 4], None, 10),
+])
+def test_irreducible_cubic(mesh, shift, num_irred):
+    kpoints, weights = tbmodels.irreducible_kpoints(mesh, [C4Z, C4X, INV], shift=shift)
+    assert len(kpoints) == num_irred
+    assert np.isclose(sum(weights), 1)
+
+def test_no_symmetries():
+    kpoints, weights = tbmodels.irreducible_kpoints([3, 4, 5])
+    assert np.allclose(kpoints, tbmodels.monkhorst_pack([3, 4, 5]))
+    assert np.allclose(weights, 1 / 60)
+
+def test_incommensurate_mesh():
+    kpoints, weights = tbmodels.irreducible_kpoints([4, 2, 1], [C4Z])
+    assert np.isclose(sum(weights), 1)
+    assert len(kpoints) == 7
+
+def test_mesh_average(cubic_model):
+    func = lambda k: cubic_model.eigenval(k)**2
+    res_sym = cubic_model.mesh_average(func, [6, 6, 6])
+    res_full = cubic_model.mesh_average(func, [6, 6, 6], use_symmetries=False)
+    assert np.allclose(res_sym, res_full)
+
+def test_json(cubic_model):
+    model = tbmodels.Model.from_json(cubic_model.to_json())
+    assert model.symmetries == [C4Z, C4X, INV]
+
+def test_arithmetic(cubic_model):
+    assert (2 * cubic_model).symmetries == cubic_model.symmetries
+    other = tbmodels.Model(size=1, dim=3, uc=np.eye(3), symmetries=[INV], sparse=cubic_model._sparse)
+    assert (cubic_model + other).symmetries == [INV]
+
+def test_invalid_repr_size():
+    with pytest.raises(ValueError):
+        tbmodels.Model(size=2, dim=3, symmetries=[C4Z])
+
+def test_invalid_rotation():
+    with pytest.raises(ValueError):
+        tbmodels.SymmetryOperation([[0.5, 0, 0], [0, 1, 0], [0, 0, 1]], [[1]])